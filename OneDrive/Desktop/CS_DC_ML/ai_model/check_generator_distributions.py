@@ -0,0 +1,165 @@
+"""
+Generator Distribution Check
+Compares generated NSL-KDD columns against rows from the original per-row generator
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from generate_nsl_kdd_data import NSLKDDDataGenerator
+
+CATEGORIES = ['normal', 'dos', 'probe', 'r2l', 'u2r']
+CATEGORICAL_COLUMNS = ['protocol_type', 'service', 'flag']
+
+def baseline_row(category, r):
+    """One row as the original per-row generator drew it, constants copied from that code
+
+    Kept independent of TRAFFIC_PROFILES on purpose: a typo in the profile table
+    has to show up as a mismatch here, not be reproduced by the reference.
+    """
+    services = ['http', 'ftp', 'smtp', 'ssh', 'telnet', 'dns', 'pop3', 'imap']
+
+    if category == 'normal':
+        duration = r.exponential(100) if r.random_sample() > 0.7 else 0
+        protocol = r.choice(['tcp', 'udp', 'icmp'], p=[0.8, 0.15, 0.05])
+        service = r.choice(services, p=[0.4, 0.1, 0.1, 0.1, 0.05, 0.1, 0.05, 0.1])
+        flag = r.choice(['SF', 'REJ', 'RSTR', 'RSTO', 'SH', 'S1', 'S2', 'S3'],
+                        p=[0.7, 0.05, 0.05, 0.05, 0.05, 0.02, 0.02, 0.06])
+        src_bytes = r.lognormal(8, 1) if r.random_sample() > 0.3 else 0
+        dst_bytes = r.lognormal(7, 1) if r.random_sample() > 0.4 else 0
+        serror_rate, rerror_rate = r.beta(1, 10), r.beta(1, 10)
+        count, srv_count = r.poisson(5), r.poisson(3)
+        same_srv_rate = r.beta(3, 2)
+        dst_host_count, dst_host_srv_count = r.poisson(10), r.poisson(5)
+        dst_host_same_srv_rate = r.beta(3, 2)
+        dst_host_serror_rate, dst_host_rerror_rate = r.beta(1, 10), r.beta(1, 10)
+
+        content = [0, 0, 0, r.poisson(0.5), 0, r.choice([0, 1], p=[0.3, 0.7]),
+                   0, 0, 0, 0, r.poisson(0.2), r.poisson(0.1),
+                   r.poisson(0.3), 0, 0, r.choice([0, 1], p=[0.8, 0.2])]
+        spread = (1, 5)
+    else:
+        if category == 'dos':
+            duration = r.exponential(1000)
+            protocol = r.choice(['tcp', 'udp', 'icmp'], p=[0.6, 0.2, 0.2])
+            service = r.choice(['http', 'echo', 'private'], p=[0.5, 0.3, 0.2])
+            flag = r.choice(['SF', 'REJ', 'RSTR'], p=[0.4, 0.3, 0.3])
+            src_bytes, dst_bytes = r.lognormal(10, 2), r.lognormal(5, 2)
+            count, srv_count = r.poisson(50), r.poisson(40)
+            same_srv_rate = r.beta(8, 1)
+            dst_host_count, dst_host_srv_count = r.poisson(100), r.poisson(80)
+            dst_host_same_srv_rate = r.beta(8, 1)
+            error = (3, 2)
+        elif category == 'probe':
+            duration = r.exponential(50)
+            protocol = r.choice(['tcp', 'icmp'], p=[0.7, 0.3])
+            service = r.choice(services)
+            flag = r.choice(['SF', 'REJ', 'RSTR'], p=[0.3, 0.4, 0.3])
+            src_bytes, dst_bytes = r.lognormal(6, 1), r.lognormal(4, 1)
+            count, srv_count = r.poisson(20), r.poisson(15)
+            same_srv_rate = r.beta(2, 3)
+            dst_host_count, dst_host_srv_count = r.poisson(30), r.poisson(20)
+            dst_host_same_srv_rate = r.beta(2, 3)
+            error = (2, 3)
+        elif category == 'r2l':
+            duration = r.exponential(200)
+            protocol = 'tcp'
+            service = r.choice(['ftp', 'telnet', 'smtp', 'pop3', 'imap'])
+            flag = 'SF'
+            src_bytes, dst_bytes = r.lognormal(7, 1), r.lognormal(8, 1)
+            count, srv_count = r.poisson(5), r.poisson(3)
+            same_srv_rate = r.beta(4, 1)
+            dst_host_count, dst_host_srv_count = r.poisson(10), r.poisson(5)
+            dst_host_same_srv_rate = r.beta(4, 1)
+            error = (1, 10)
+        else:
+            duration = r.exponential(500)
+            protocol = 'tcp'
+            service = r.choice(['http', 'ftp', 'telnet'])
+            flag = 'SF'
+            src_bytes, dst_bytes = r.lognormal(9, 2), r.lognormal(6, 2)
+            count, srv_count = r.poisson(3), r.poisson(2)
+            same_srv_rate = r.beta(3, 2)
+            dst_host_count, dst_host_srv_count = r.poisson(5), r.poisson(3)
+            dst_host_same_srv_rate = r.beta(3, 2)
+            error = (1, 5)
+        serror_rate, rerror_rate = r.beta(*error), r.beta(*error)
+        dst_host_serror_rate, dst_host_rerror_rate = r.beta(*error), r.beta(*error)
+
+        content = [0, 0, 0, r.poisson(2), r.poisson(1), r.choice([0, 1], p=[0.5, 0.5]),
+                   r.poisson(1), r.choice([0, 1], p=[0.9, 0.1]),
+                   r.choice([0, 1, 2], p=[0.8, 0.15, 0.05]), r.poisson(1),
+                   r.poisson(1), r.poisson(0.5), r.poisson(1), 0,
+                   r.choice([0, 1], p=[0.7, 0.3]), r.choice([0, 1], p=[0.6, 0.4])]
+        spread = (1, 3)
+
+    return [duration, protocol, service, flag, src_bytes, dst_bytes, *content,
+            count, srv_count, serror_rate, serror_rate, rerror_rate, rerror_rate,
+            same_srv_rate, 1 - same_srv_rate, r.beta(*spread),
+            dst_host_count, dst_host_srv_count, dst_host_same_srv_rate,
+            1 - dst_host_same_srv_rate, r.beta(*spread), r.beta(*spread),
+            dst_host_serror_rate, dst_host_serror_rate, dst_host_rerror_rate,
+            dst_host_rerror_rate]
+
+def baseline_sample(category, rows, columns, seed):
+    """Reference rows for one category from the per-row generator"""
+    r = np.random.RandomState(seed)
+    return pd.DataFrame([baseline_row(category, r) for _ in range(rows)], columns=columns)
+
+def check_category(df, reference, alpha):
+    """Two-sample test of every feature column against the reference rows; return failures"""
+    failures = []
+    for column in reference.columns:
+        if column in CATEGORICAL_COLUMNS:
+            observed = pd.concat([df[column].astype(str).value_counts(), reference[column].value_counts()],
+                                 axis=1).fillna(0).to_numpy()
+            if len(observed) > 1 and stats.chi2_contingency(observed).pvalue < alpha:
+                failures.append(f"{column}: chi-square mismatch {df[column].astype(str).value_counts().to_dict()}")
+            elif len(observed) == 1 and observed[:, 0].sum() != len(df):
+                failures.append(f"{column}: expected only {reference[column].iloc[0]!r}")
+            continue
+        values = df[column].to_numpy(dtype=np.float64)
+        expected = reference[column].to_numpy(dtype=np.float64)
+        p = stats.ks_2samp(values, expected).pvalue
+        if p < alpha:
+            failures.append(f"{column}: KS p={p:.2e}, mean {values.mean():.4g} vs {expected.mean():.4g}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Check generated NSL-KDD data against the original per-row generator")
+    parser.add_argument('--samples', type=int, default=200000, help="rows to generate")
+    parser.add_argument('--reference-rows', type=int, default=20000, help="per-row reference rows per category")
+    parser.add_argument('--seed', type=int, default=42, help="generator seed")
+    parser.add_argument('--alpha', type=float, default=1e-4, help="significance level per check")
+    args = parser.parse_args()
+
+    generator = NSLKDDDataGenerator(num_samples=args.samples, seed=args.seed)
+    df = generator.generate_dataset(normal_ratio=0.6)
+
+    failed = False
+    for i, category in enumerate(CATEGORIES):
+        rows = df[df['category'] == category]
+        reference = baseline_sample(category, args.reference_rows, generator.feature_columns, args.seed + i + 1)
+        failures = check_category(rows, reference, args.alpha)
+        status = "FAIL" if failures else "ok"
+        print(f"{category:<8} {len(rows):>8} rows  {status}")
+        for failure in failures:
+            print(f"    {failure}")
+        failed = failed or bool(failures)
+
+    # The per-row generator picked attack labels uniformly over the attack types
+    labels = df.loc[df['label'] != 'normal', 'label'].value_counts()
+    attack_types = [at for at in generator.attack_types if at != 'normal']
+    observed = labels.reindex(attack_types, fill_value=0).to_numpy()
+    p = stats.chisquare(observed).pvalue
+    print(f"attack label uniformity p={p:.3f}")
+    failed = failed or p < args.alpha
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
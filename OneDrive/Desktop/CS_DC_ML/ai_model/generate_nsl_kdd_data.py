@@ -3,14 +3,100 @@ NSL-KDD Style Dataset Generator
 Generates synthetic network traffic data for intrusion detection training
 """
 
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import LabelEncoder
 import random
 
+# Per-category sampling parameters. Choices are (values, probabilities) or a
+# fixed value, byte counts are lognormal (mean, sigma), counts are Poisson
+# rates, rates are Beta (a, b) and flags are probabilities of 0, 1, ...
+NORMAL_CONTENT = {
+    'hot': 0.5, 'num_failed_logins': 0, 'logged_in': [0.3, 0.7], 'num_compromised': 0,
+    'root_shell': None, 'su_attempted': None, 'num_root': 0, 'num_file_creations': 0.2,
+    'num_shells': 0.1, 'num_access_files': 0.3, 'is_host_login': None, 'is_guest_login': [0.8, 0.2]
+}
+
+ATTACK_CONTENT = {
+    'hot': 2, 'num_failed_logins': 1, 'logged_in': [0.5, 0.5], 'num_compromised': 1,
+    'root_shell': [0.9, 0.1], 'su_attempted': [0.8, 0.15, 0.05], 'num_root': 1, 'num_file_creations': 1,
+    'num_shells': 0.5, 'num_access_files': 1, 'is_host_login': [0.7, 0.3], 'is_guest_login': [0.6, 0.4]
+}
+
+SERVICES = ['http', 'ftp', 'smtp', 'ssh', 'telnet', 'dns', 'pop3', 'imap']
+
+TRAFFIC_PROFILES = {
+    'normal': {
+        # Normal traffic typically has reasonable values and low error rates
+        'duration': 100, 'duration_nonzero': 0.3,
+        'protocol_type': (['tcp', 'udp', 'icmp'], [0.8, 0.15, 0.05]),
+        'service': (SERVICES, [0.4, 0.1, 0.1, 0.1, 0.05, 0.1, 0.05, 0.1]),
+        'flag': (['SF', 'REJ', 'RSTR', 'RSTO', 'SH', 'S1', 'S2', 'S3'], [0.7, 0.05, 0.05, 0.05, 0.05, 0.02, 0.02, 0.06]),
+        'src_bytes': (8, 1), 'src_bytes_nonzero': 0.7,
+        'dst_bytes': (7, 1), 'dst_bytes_nonzero': 0.6,
+        'count': 5, 'srv_count': 3, 'dst_host_count': 10, 'dst_host_srv_count': 5,
+        'same_srv_rate': (3, 2), 'error_rate': (1, 10), 'host_spread_rate': (1, 5),
+        'content': NORMAL_CONTENT
+    },
+    'dos': {
+        # DoS attacks: high connection counts, similar services, higher error rates
+        'duration': 1000, 'duration_nonzero': 1.0,
+        'protocol_type': (['tcp', 'udp', 'icmp'], [0.6, 0.2, 0.2]),
+        'service': (['http', 'echo', 'private'], [0.5, 0.3, 0.2]),
+        'flag': (['SF', 'REJ', 'RSTR'], [0.4, 0.3, 0.3]),
+        'src_bytes': (10, 2), 'src_bytes_nonzero': 1.0,
+        'dst_bytes': (5, 2), 'dst_bytes_nonzero': 1.0,
+        'count': 50, 'srv_count': 40, 'dst_host_count': 100, 'dst_host_srv_count': 80,
+        'same_srv_rate': (8, 1), 'error_rate': (3, 2), 'host_spread_rate': (1, 3),
+        'content': ATTACK_CONTENT
+    },
+    'probe': {
+        # Probe attacks: scanning different services, moderate counts and error rates
+        'duration': 50, 'duration_nonzero': 1.0,
+        'protocol_type': (['tcp', 'icmp'], [0.7, 0.3]),
+        'service': (SERVICES, None),
+        'flag': (['SF', 'REJ', 'RSTR'], [0.3, 0.4, 0.3]),
+        'src_bytes': (6, 1), 'src_bytes_nonzero': 1.0,
+        'dst_bytes': (4, 1), 'dst_bytes_nonzero': 1.0,
+        'count': 20, 'srv_count': 15, 'dst_host_count': 30, 'dst_host_srv_count': 20,
+        'same_srv_rate': (2, 3), 'error_rate': (2, 3), 'host_spread_rate': (1, 3),
+        'content': ATTACK_CONTENT
+    },
+    'r2l': {
+        # Remote to local attacks
+        'duration': 200, 'duration_nonzero': 1.0,
+        'protocol_type': 'tcp',
+        'service': (['ftp', 'telnet', 'smtp', 'pop3', 'imap'], None),
+        'flag': 'SF',
+        'src_bytes': (7, 1), 'src_bytes_nonzero': 1.0,
+        'dst_bytes': (8, 1), 'dst_bytes_nonzero': 1.0,
+        'count': 5, 'srv_count': 3, 'dst_host_count': 10, 'dst_host_srv_count': 5,
+        'same_srv_rate': (4, 1), 'error_rate': (1, 10), 'host_spread_rate': (1, 3),
+        'content': ATTACK_CONTENT
+    },
+    'u2r': {
+        # User to root attacks (and any category without its own profile)
+        'duration': 500, 'duration_nonzero': 1.0,
+        'protocol_type': 'tcp',
+        'service': (['http', 'ftp', 'telnet'], None),
+        'flag': 'SF',
+        'src_bytes': (9, 2), 'src_bytes_nonzero': 1.0,
+        'dst_bytes': (6, 2), 'dst_bytes_nonzero': 1.0,
+        'count': 3, 'srv_count': 2, 'dst_host_count': 5, 'dst_host_srv_count': 3,
+        'same_srv_rate': (3, 2), 'error_rate': (1, 5), 'host_spread_rate': (1, 3),
+        'content': ATTACK_CONTENT
+    }
+}
+
 class NSLKDDDataGenerator:
-    def __init__(self, num_samples=50000):
+    def __init__(self, num_samples=50000, seed=None):
         self.num_samples = num_samples
+        # Shards derive their own streams from this sequence, see shard_seed
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.rng = np.random.default_rng(self.seed_sequence)
         self.feature_columns = [
             'duration', 'protocol_type', 'service', 'flag', 'src_bytes',
             'dst_bytes', 'land', 'wrong_fragment', 'urgent', 'hot',
@@ -27,7 +113,7 @@ class NSLKDDDataGenerator:
         ]
         
         self.protocol_types = ['tcp', 'udp', 'icmp']
-        self.services = ['http', 'ftp', 'smtp', 'ssh', 'telnet', 'dns', 'pop3', 'imap']
+        self.services = SERVICES
         self.flags = ['SF', 'REJ', 'RSTR', 'RSTO', 'SH', 'S1', 'S2', 'S3']
         
         self.attack_types = [
@@ -44,225 +130,215 @@ class NSLKDDDataGenerator:
             'guess_passwd': 'r2l', 'ftp_write': 'r2l', 'imap': 'r2l', 'phf': 'r2l', 'multihop': 'r2l', 'warezclient': 'r2l',
             'satan': 'probe', 'ipsweep': 'probe', 'portsweep': 'probe', 'nmap': 'probe'
         }
+        
+        # Explicit column types: fixed category sets so every chunk shares one
+        # dictionary, 32-bit counts and rates, 64-bit durations and byte counts
+        self.column_dtypes = {
+            'protocol_type': pd.CategoricalDtype(self.protocol_types),
+            'service': pd.CategoricalDtype(self.services + ['echo', 'private']),
+            'flag': pd.CategoricalDtype(self.flags),
+            'label': pd.CategoricalDtype(self.attack_types),
+            'category': pd.CategoricalDtype(['normal', 'dos', 'probe', 'r2l', 'u2r', 'unknown'])
+        }
+        for col in self.feature_columns:
+            if col in ('duration', 'src_bytes', 'dst_bytes'):
+                self.column_dtypes[col] = 'float64'
+            elif col.endswith('_rate'):
+                self.column_dtypes[col] = 'float32'
+            elif col not in self.column_dtypes:
+                self.column_dtypes[col] = 'int32'
 
     def generate_normal_traffic(self, num_samples):
         """Generate normal network traffic patterns"""
-        data = []
-        
-        for _ in range(num_samples):
-            # Normal traffic typically has reasonable values
-            duration = np.random.exponential(100) if np.random.random() > 0.7 else 0
-            protocol = np.random.choice(self.protocol_types, p=[0.8, 0.15, 0.05])
-            service = np.random.choice(self.services, p=[0.4, 0.1, 0.1, 0.1, 0.05, 0.1, 0.05, 0.1])
-            flag = np.random.choice(self.flags, p=[0.7, 0.05, 0.05, 0.05, 0.05, 0.02, 0.02, 0.06])
-            
-            src_bytes = np.random.lognormal(8, 1) if np.random.random() > 0.3 else 0
-            dst_bytes = np.random.lognormal(7, 1) if np.random.random() > 0.4 else 0
-            
-            # Normal connections usually have low error rates
-            serror_rate = np.random.beta(1, 10)
-            rerror_rate = np.random.beta(1, 10)
-            
-            # Count features for normal traffic
-            count = np.random.poisson(5)
-            srv_count = np.random.poisson(3)
-            
-            same_srv_rate = np.random.beta(3, 2)
-            diff_srv_rate = 1 - same_srv_rate
-            
-            # Host-level features
-            dst_host_count = np.random.poisson(10)
-            dst_host_srv_count = np.random.poisson(5)
-            
-            dst_host_same_srv_rate = np.random.beta(3, 2)
-            dst_host_diff_srv_rate = 1 - dst_host_same_srv_rate
-            
-            dst_host_serror_rate = np.random.beta(1, 10)
-            dst_host_rerror_rate = np.random.beta(1, 10)
-            
-            sample = [
-                duration, protocol, service, flag, src_bytes, dst_bytes,
-                0, 0, 0, np.random.poisson(0.5), 0, np.random.choice([0, 1], p=[0.3, 0.7]),
-                0, 0, 0, 0, np.random.poisson(0.2), np.random.poisson(0.1),
-                np.random.poisson(0.3), 0, 0, np.random.choice([0, 1], p=[0.8, 0.2]),
-                count, srv_count, serror_rate, serror_rate, rerror_rate, rerror_rate,
-                same_srv_rate, diff_srv_rate, np.random.beta(1, 5),
-                dst_host_count, dst_host_srv_count, dst_host_same_srv_rate,
-                1 - dst_host_same_srv_rate, np.random.beta(1, 5), np.random.beta(1, 5),
-                dst_host_serror_rate, dst_host_serror_rate, dst_host_rerror_rate,
-                dst_host_rerror_rate
-            ]
-            
-            data.append(sample)
-        
-        return data
+        return self.generate_category('normal', num_samples)
 
     def generate_attack_traffic(self, num_samples):
         """Generate attack traffic patterns"""
-        data = []
+        attack_types = np.array([at for at in self.attack_types if at != 'normal'])
+        labels = attack_types[self.rng.integers(len(attack_types), size=num_samples)]
+        categories = np.array([self.attack_categories.get(at, 'unknown') for at in labels])
+        
+        # Draw each category's rows in one batch, then put them back in label order
+        parts = []
+        for category in np.unique(categories):
+            rows = np.flatnonzero(categories == category)
+            # Anything without a dedicated profile gets the u2r profile, as before
+            part = self.generate_category(category if category in TRAFFIC_PROFILES else 'u2r', len(rows))
+            part.index = rows
+            parts.append(part)
+        
+        data = pd.concat(parts).sort_index() if parts else self.generate_category('normal', 0)
+        return data.reset_index(drop=True), labels.tolist()
+
+    def generate_category(self, category, num_samples):
+        """Generate num_samples rows for one traffic category, one NumPy draw per column"""
+        profile = TRAFFIC_PROFILES[category]
+        rng = self.rng
+        n = num_samples
+        
+        def choice(spec):
+            if isinstance(spec, str):
+                return np.full(n, spec, dtype=object)
+            values, p = spec
+            return np.asarray(values, dtype=object)[rng.choice(len(values), size=n, p=p)]
+        
+        def sometimes(values, probability):
+            # Zero-inflated columns: keep the draw with the given probability
+            if probability >= 1:
+                return values
+            return np.where(rng.random(n) < probability, values, 0.0)
+        
+        def beta(params):
+            return rng.beta(*params, size=n)
+        
+        def count(lam):
+            return rng.poisson(lam, size=n) if lam else np.zeros(n, dtype=np.int64)
+        
+        def flag(p):
+            return rng.choice(len(p), size=n, p=p) if p else np.zeros(n, dtype=np.int64)
+        
+        extras = profile['content']
+        serror_rate = beta(profile['error_rate'])
+        rerror_rate = beta(profile['error_rate'])
+        same_srv_rate = beta(profile['same_srv_rate'])
+        dst_host_same_srv_rate = beta(profile['same_srv_rate'])
+        dst_host_serror_rate = beta(profile['error_rate'])
+        dst_host_rerror_rate = beta(profile['error_rate'])
         
-        for _ in range(num_samples):
-            attack_type = np.random.choice([at for at in self.attack_types if at != 'normal'])
-            category = self.attack_categories.get(attack_type, 'unknown')
-            
-            if category == 'dos':
-                # DoS attacks: high connection counts, similar services
-                duration = np.random.exponential(1000)
-                protocol = np.random.choice(['tcp', 'udp', 'icmp'], p=[0.6, 0.2, 0.2])
-                service = np.random.choice(['http', 'echo', 'private'], p=[0.5, 0.3, 0.2])
-                flag = np.random.choice(['SF', 'REJ', 'RSTR'], p=[0.4, 0.3, 0.3])
-                
-                src_bytes = np.random.lognormal(10, 2)
-                dst_bytes = np.random.lognormal(5, 2)
-                
-                # High connection counts for DoS
-                count = np.random.poisson(50)
-                srv_count = np.random.poisson(40)
-                
-                same_srv_rate = np.random.beta(8, 1)  # Very high same service rate
-                diff_srv_rate = 1 - same_srv_rate
-                
-                dst_host_count = np.random.poisson(100)
-                dst_host_srv_count = np.random.poisson(80)
-                
-                dst_host_same_srv_rate = np.random.beta(8, 1)
-                dst_host_diff_srv_rate = 1 - dst_host_same_srv_rate
-                
-                # Higher error rates for DoS
-                serror_rate = np.random.beta(3, 2)
-                rerror_rate = np.random.beta(3, 2)
-                dst_host_serror_rate = np.random.beta(3, 2)
-                dst_host_rerror_rate = np.random.beta(3, 2)
-                
-            elif category == 'probe':
-                # Probe attacks: scanning patterns
-                duration = np.random.exponential(50)
-                protocol = np.random.choice(['tcp', 'icmp'], p=[0.7, 0.3])
-                service = np.random.choice(self.services)
-                flag = np.random.choice(['SF', 'REJ', 'RSTR'], p=[0.3, 0.4, 0.3])
-                
-                src_bytes = np.random.lognormal(6, 1)
-                dst_bytes = np.random.lognormal(4, 1)
-                
-                # Moderate connection counts
-                count = np.random.poisson(20)
-                srv_count = np.random.poisson(15)
-                
-                same_srv_rate = np.random.beta(2, 3)  # Lower same service rate (scanning different services)
-                diff_srv_rate = 1 - same_srv_rate
-                
-                dst_host_count = np.random.poisson(30)
-                dst_host_srv_count = np.random.poisson(20)
-                
-                dst_host_same_srv_rate = np.random.beta(2, 3)
-                dst_host_diff_srv_rate = 1 - dst_host_same_srv_rate
-                
-                # Moderate error rates
-                serror_rate = np.random.beta(2, 3)
-                rerror_rate = np.random.beta(2, 3)
-                dst_host_serror_rate = np.random.beta(2, 3)
-                dst_host_rerror_rate = np.random.beta(2, 3)
-                
-            elif category == 'r2l':
-                # Remote to local attacks
-                duration = np.random.exponential(200)
-                protocol = 'tcp'
-                service = np.random.choice(['ftp', 'telnet', 'smtp', 'pop3', 'imap'])
-                flag = 'SF'
-                
-                src_bytes = np.random.lognormal(7, 1)
-                dst_bytes = np.random.lognormal(8, 1)
-                
-                count = np.random.poisson(5)
-                srv_count = np.random.poisson(3)
-                
-                same_srv_rate = np.random.beta(4, 1)
-                diff_srv_rate = 1 - same_srv_rate
-                
-                dst_host_count = np.random.poisson(10)
-                dst_host_srv_count = np.random.poisson(5)
-                
-                dst_host_same_srv_rate = np.random.beta(4, 1)
-                dst_host_diff_srv_rate = 1 - dst_host_same_srv_rate
-                
-                serror_rate = np.random.beta(1, 10)
-                rerror_rate = np.random.beta(1, 10)
-                dst_host_serror_rate = np.random.beta(1, 10)
-                dst_host_rerror_rate = np.random.beta(1, 10)
-                
-            else:  # u2r or others
-                duration = np.random.exponential(500)
-                protocol = 'tcp'
-                service = np.random.choice(['http', 'ftp', 'telnet'])
-                flag = 'SF'
-                
-                src_bytes = np.random.lognormal(9, 2)
-                dst_bytes = np.random.lognormal(6, 2)
-                
-                count = np.random.poisson(3)
-                srv_count = np.random.poisson(2)
-                
-                same_srv_rate = np.random.beta(3, 2)
-                diff_srv_rate = 1 - same_srv_rate
-                
-                dst_host_count = np.random.poisson(5)
-                dst_host_srv_count = np.random.poisson(3)
-                
-                dst_host_same_srv_rate = np.random.beta(3, 2)
-                dst_host_diff_srv_rate = 1 - dst_host_same_srv_rate
-                
-                serror_rate = np.random.beta(1, 5)
-                rerror_rate = np.random.beta(1, 5)
-                dst_host_serror_rate = np.random.beta(1, 5)
-                dst_host_rerror_rate = np.random.beta(1, 5)
-            
-            sample = [
-                duration, protocol, service, flag, src_bytes, dst_bytes,
-                0, 0, 0, np.random.poisson(2), np.random.poisson(1), 
-                np.random.choice([0, 1], p=[0.5, 0.5]),
-                np.random.poisson(1), np.random.choice([0, 1], p=[0.9, 0.1]),
-                np.random.choice([0, 1, 2], p=[0.8, 0.15, 0.05]), np.random.poisson(1),
-                np.random.poisson(1), np.random.poisson(0.5), np.random.poisson(1), 0,
-                np.random.choice([0, 1], p=[0.7, 0.3]), np.random.choice([0, 1], p=[0.6, 0.4]),
-                count, srv_count, serror_rate, serror_rate, rerror_rate, rerror_rate,
-                same_srv_rate, diff_srv_rate, np.random.beta(1, 3),
-                dst_host_count, dst_host_srv_count, dst_host_same_srv_rate,
-                dst_host_diff_srv_rate, np.random.beta(1, 3), np.random.beta(1, 3),
-                dst_host_serror_rate, dst_host_serror_rate, dst_host_rerror_rate,
-                dst_host_rerror_rate
-            ]
-            
-            data.append(sample)
+        columns = {
+            'duration': sometimes(rng.exponential(profile['duration'], size=n), profile['duration_nonzero']),
+            'protocol_type': choice(profile['protocol_type']),
+            'service': choice(profile['service']),
+            'flag': choice(profile['flag']),
+            'src_bytes': sometimes(rng.lognormal(*profile['src_bytes'], size=n), profile['src_bytes_nonzero']),
+            'dst_bytes': sometimes(rng.lognormal(*profile['dst_bytes'], size=n), profile['dst_bytes_nonzero']),
+            'land': count(0),
+            'wrong_fragment': count(0),
+            'urgent': count(0),
+            'hot': count(extras['hot']),
+            'num_failed_logins': count(extras['num_failed_logins']),
+            'logged_in': flag(extras['logged_in']),
+            'num_compromised': count(extras['num_compromised']),
+            'root_shell': flag(extras['root_shell']),
+            'su_attempted': flag(extras['su_attempted']),
+            'num_root': count(extras['num_root']),
+            'num_file_creations': count(extras['num_file_creations']),
+            'num_shells': count(extras['num_shells']),
+            'num_access_files': count(extras['num_access_files']),
+            'num_outbound_cmds': count(0),
+            'is_host_login': flag(extras['is_host_login']),
+            'is_guest_login': flag(extras['is_guest_login']),
+            'count': count(profile['count']),
+            'srv_count': count(profile['srv_count']),
+            'serror_rate': serror_rate,
+            'srv_serror_rate': serror_rate,
+            'rerror_rate': rerror_rate,
+            'srv_rerror_rate': rerror_rate,
+            'same_srv_rate': same_srv_rate,
+            'diff_srv_rate': 1 - same_srv_rate,
+            'srv_diff_host_rate': beta(profile['host_spread_rate']),
+            'dst_host_count': count(profile['dst_host_count']),
+            'dst_host_srv_count': count(profile['dst_host_srv_count']),
+            'dst_host_same_srv_rate': dst_host_same_srv_rate,
+            'dst_host_diff_srv_rate': 1 - dst_host_same_srv_rate,
+            'dst_host_same_src_port_rate': beta(profile['host_spread_rate']),
+            'dst_host_srv_diff_host_rate': beta(profile['host_spread_rate']),
+            'dst_host_serror_rate': dst_host_serror_rate,
+            'dst_host_srv_serror_rate': dst_host_serror_rate,
+            'dst_host_rerror_rate': dst_host_rerror_rate,
+            'dst_host_srv_rerror_rate': dst_host_rerror_rate
+        }
         
-        return data, [attack_type] * num_samples
+        return pd.DataFrame(columns, columns=self.feature_columns)
 
-    def generate_dataset(self, normal_ratio=0.7):
+    def generate_labeled(self, num_normal, num_attack):
+        """Generate normal rows followed by attack rows, with label, category and explicit dtypes"""
+        normal_data = self.generate_normal_traffic(num_normal)
+        attack_data, attack_types = self.generate_attack_traffic(num_attack)
+        
+        # Combine data
+        df = pd.concat([normal_data, attack_data], ignore_index=True)
+        df['label'] = pd.Categorical(['normal'] * num_normal + attack_types, dtype=self.column_dtypes['label'])
+        
+        # Add attack category (mapped per category value, not per row)
+        df['category'] = df['label'].map(lambda x: self.attack_categories.get(x, 'unknown'))
+        
+        return df.astype(self.column_dtypes)
+
+    def generate_dataset(self, normal_ratio=0.7, chunk_size=100000, workers=1):
         """Generate complete dataset with normal and attack traffic"""
         num_normal = int(self.num_samples * normal_ratio)
         num_attack = self.num_samples - num_normal
         
-        print(f"Generating {num_normal} normal samples...")
-        normal_data = self.generate_normal_traffic(num_normal)
+        print(f"Generating {num_normal} normal samples and {num_attack} attack samples...")
+        return pd.concat(self.generate_chunks(chunk_size, normal_ratio, workers), ignore_index=True)
+
+    def shard_seed(self, index):
+        """Seed for shard `index`: the index-th child SeedSequence.spawn would produce"""
+        return np.random.SeedSequence(self.seed_sequence.entropy, spawn_key=self.seed_sequence.spawn_key + (index,))
+
+    def generate_chunks(self, chunk_size=100000, normal_ratio=0.7, workers=1):
+        """Yield the dataset in shuffled shards of at most chunk_size rows
         
-        print(f"Generating {num_attack} attack samples...")
-        attack_data, attack_types = self.generate_attack_traffic(num_attack)
+        Each shard has its own seed, so for a given seed and chunk_size the rows
+        are identical whether shards are generated serially or by `workers`
+        processes.
+        """
+        shards = []
+        for index, start in enumerate(range(0, self.num_samples, chunk_size)):
+            end = min(start + chunk_size, self.num_samples)
+            # Every shard gets its share of normal rows, so the stream is mixed throughout
+            chunk_normal = int(end * normal_ratio) - int(start * normal_ratio)
+            shards.append((self.shard_seed(index), chunk_normal, end - start - chunk_normal))
         
-        # Combine data
-        all_data = normal_data + attack_data
-        labels = ['normal'] * num_normal + attack_types
+        if workers <= 1:
+            for shard in shards:
+                yield generate_shard(*shard)
+            return
         
-        # Create DataFrame
-        df = pd.DataFrame(all_data, columns=self.feature_columns)
-        df['label'] = labels
+        # Keep only a few shards in flight so finished ones don't pile up in memory
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for shard in shards:
+                pending.append(executor.submit(generate_shard, *shard))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def stream_dataset(self, filepath='data/nsl_kdd_dataset.parquet', chunk_size=100000, normal_ratio=0.7, workers=1):
+        """Generate the dataset shard by shard straight into a Parquet file, one row group per shard"""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        os.makedirs(os.path.dirname(filepath) or '.', exist_ok=True)
+        label_counts = pd.Series(0, index=self.column_dtypes['label'].categories)
         
-        # Add attack category
-        df['category'] = df['label'].apply(lambda x: self.attack_categories.get(x, 'unknown'))
+        writer = None
+        try:
+            for i, chunk in enumerate(self.generate_chunks(chunk_size, normal_ratio, workers)):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(filepath, table.schema, compression='zstd')
+                # One row group per chunk keeps reads and writes at chunk granularity
+                writer.write_table(table)
+                label_counts += chunk['label'].value_counts()
+                print(f"Chunk {i + 1}: {len(chunk)} rows written")
+        finally:
+            if writer is not None:
+                writer.close()
         
-        return df
+        print(f"Dataset streamed to {filepath}")
+        print(f"Dataset rows: {self.num_samples}")
+        print(f"Class distribution:")
+        print(label_counts[label_counts > 0].sort_values(ascending=False))
 
     def save_dataset(self, df, filepath='data/nsl_kdd_dataset.csv'):
-        """Save dataset to CSV file"""
-        df.to_csv(filepath, index=False)
+        """Save dataset to a CSV or, by extension, Parquet file"""
+        if filepath.endswith('.parquet'):
+            df.to_parquet(filepath, index=False, compression='zstd')
+        else:
+            df.to_csv(filepath, index=False)
         print(f"Dataset saved to {filepath}")
         print(f"Dataset shape: {df.shape}")
         print(f"Class distribution:")
@@ -270,7 +346,33 @@ class NSLKDDDataGenerator:
         print(f"Category distribution:")
         print(df['category'].value_counts())
 
+def generate_shard(seed, num_normal, num_attack):
+    """Generate one shard from its own seed (module level so worker processes can run it)"""
+    generator = NSLKDDDataGenerator(num_samples=num_normal + num_attack, seed=seed)
+    shard = generator.generate_labeled(num_normal, num_attack)
+    # Interleave normal and attack rows so chunked readers see a mixed stream
+    return shard.iloc[generator.rng.permutation(len(shard))].reset_index(drop=True)
+
 if __name__ == "__main__":
-    generator = NSLKDDDataGenerator(num_samples=50000)
-    dataset = generator.generate_dataset(normal_ratio=0.6)
-    generator.save_dataset(dataset)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Generate a synthetic NSL-KDD style dataset")
+    parser.add_argument('--samples', type=int, default=50000, help="number of rows")
+    parser.add_argument('--normal-ratio', type=float, default=0.6, help="share of normal traffic")
+    parser.add_argument('--seed', type=int, default=None, help="random seed for reproducible output")
+    parser.add_argument('--output', default='data/nsl_kdd_dataset.parquet', help="output .parquet or .csv file")
+    parser.add_argument('--chunk-size', type=int, default=100000,
+                        help="rows per shard / Parquet row group (part of what --seed reproduces)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes generating shards in parallel (0 = one per CPU); output does not depend on it")
+    args = parser.parse_args()
+    
+    workers = args.workers or os.cpu_count()
+    generator = NSLKDDDataGenerator(num_samples=args.samples, seed=args.seed)
+    if args.output.endswith('.parquet'):
+        generator.stream_dataset(args.output, chunk_size=args.chunk_size, normal_ratio=args.normal_ratio,
+                                 workers=workers)
+    else:
+        dataset = generator.generate_dataset(normal_ratio=args.normal_ratio, chunk_size=args.chunk_size,
+                                             workers=workers)
+        generator.save_dataset(dataset, args.output)
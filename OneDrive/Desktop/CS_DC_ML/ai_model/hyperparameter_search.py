@@ -0,0 +1,197 @@
+"""
+Hyperparameter Search
+Random or successive-halving search over Random Forest settings, scored on
+F1 together with measured inference latency and model size
+"""
+
+import argparse
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, f1_score
+
+from pipeline_cache import StageCache
+from train_model import IntrusionDetectionModel, RF_PARAMS
+
+SEARCH_SPACE = {
+    'n_estimators': [10, 20, 50, 100, 200],
+    'max_depth': [5, 10, 15, 20, None],
+    'min_samples_leaf': [1, 2, 5, 10],
+    'max_features': ['sqrt', 'log2', 0.5, None]
+}
+
+# Training data for worker processes, set once per worker by init_worker
+_train = {}
+
+def init_worker(X_train, y_train):
+    _train['X'], _train['y'] = X_train, y_train
+
+def fit_candidate(params, n_rows):
+    """Fit one configuration on the first n_rows training rows (runs in a worker)"""
+    model = RandomForestClassifier(**{**RF_PARAMS, **params, 'n_jobs': 1})
+    model.fit(_train['X'][:n_rows], _train['y'][:n_rows])
+    return model
+
+def sample_configs(n, rng):
+    """n distinct random configurations from SEARCH_SPACE"""
+    seen, configs = set(), []
+    total = np.prod([len(values) for values in SEARCH_SPACE.values()])
+    while len(configs) < min(n, total):
+        config = {name: values[rng.integers(len(values))] for name, values in SEARCH_SPACE.items()}
+        key = json.dumps(config, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            configs.append(config)
+    return configs
+
+def measure_latency(model, X, single_calls=200, batch_size=1000, batch_calls=5):
+    """Median single-row predict_proba latency and per-row latency of a batch, in ms"""
+    rows = X[:single_calls]
+    single = []
+    for i in range(len(rows)):
+        start = time.perf_counter()
+        model.predict_proba(rows[i:i + 1])
+        single.append(time.perf_counter() - start)
+
+    batch = X[:batch_size]
+    batch_times = []
+    for _ in range(batch_calls):
+        start = time.perf_counter()
+        model.predict_proba(batch)
+        batch_times.append(time.perf_counter() - start)
+
+    return {
+        'single_p50_ms': float(np.median(single)) * 1000,
+        'single_p99_ms': float(np.percentile(single, 99)) * 1000,
+        'batch_per_row_us': float(np.median(batch_times)) / len(batch) * 1e6
+    }
+
+def score(model, X_test, y_test):
+    y_pred = model.predict(X_test)
+    return {
+        'accuracy': float(accuracy_score(y_test, y_pred)),
+        'f1_score': float(f1_score(y_test, y_pred, average='weighted', zero_division=0))
+    }
+
+def pareto_front(results):
+    """Results not dominated on (higher F1, lower single-row latency, smaller model)"""
+    def dominates(a, b):
+        no_worse = (a['f1_score'] >= b['f1_score'] and a['single_p50_ms'] <= b['single_p50_ms']
+                    and a['size_mb'] <= b['size_mb'])
+        better = (a['f1_score'] > b['f1_score'] or a['single_p50_ms'] < b['single_p50_ms']
+                  or a['size_mb'] < b['size_mb'])
+        return no_worse and better
+
+    front = [r for r in results if not any(dominates(other, r) for other in results)]
+    return sorted(front, key=lambda r: r['single_p50_ms'])
+
+def search(data, configs, strategy, workers, eta=3):
+    """Fit and score configurations on the full training set, or by successive halving
+
+    Halving trains every configuration on a small slice of the training rows
+    and re-trains the survivors of each round on eta times more rows. Returns
+    the results of every round, each tagged with its round and row budget.
+    """
+    X_train, y_train = data['X_train'], data['y_train']
+    X_test, y_test = data['X_test'], data['y_test']
+    n_train = len(X_train)
+
+    if strategy == 'halving':
+        rounds = max(1, int(np.log(len(configs)) / np.log(eta)) + 1)
+        budgets = [max(n_train // eta ** (rounds - 1 - i), 1000) for i in range(rounds)]
+    else:
+        budgets = [n_train]
+
+    all_results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(X_train, y_train)) as executor:
+        candidates = configs
+        for round_index, n_rows in enumerate(budgets):
+            n_rows = min(n_rows, n_train)
+            print(f"Round {round_index + 1}/{len(budgets)}: {len(candidates)} configs on {n_rows} rows")
+            # Wait for every fit before timing anything, so concurrent training doesn't skew latency
+            models = list(executor.map(fit_candidate, candidates, [n_rows] * len(candidates)))
+
+            results = [{
+                'params': params,
+                **score(model, X_test, y_test),
+                **measure_latency(model, X_test),
+                'size_mb': len(pickle.dumps(model)) / (1024 * 1024),
+                'round': round_index + 1,
+                'train_rows': n_rows
+            } for params, model in zip(candidates, models)]
+            all_results.extend(results)
+
+            # Keep the Pareto front so cheap models survive, then fill up with the best F1
+            front = pareto_front(results)
+            keep = max(1, len(results) // eta)
+            rest = sorted((r for r in results if r not in front), key=lambda r: r['f1_score'], reverse=True)
+            candidates = [r['params'] for r in front + rest[:max(0, keep - len(front))]]
+
+    return all_results
+
+def print_results(title, results):
+    print(f"\n{title}")
+    print(f"{'round':>5} {'rows':>8} {'f1':>7} {'acc':>7} {'1-row p50':>10} {'1-row p99':>10} {'batch/row':>10} "
+          f"{'size':>9}  params")
+    print("-" * 115)
+    for r in results:
+        print(f"{r['round']:>5} {r['train_rows']:>8} {r['f1_score']:>7.4f} {r['accuracy']:>7.4f} {r['single_p50_ms']:>8.2f}ms "
+              f"{r['single_p99_ms']:>8.2f}ms {r['batch_per_row_us']:>8.1f}us {r['size_mb']:>7.1f}MB  "
+              f"{r['params']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Search Random Forest hyperparameters against latency and size")
+    parser.add_argument('--dataset', default='data/nsl_kdd_dataset.parquet', help="dataset (.parquet or .csv)")
+    parser.add_argument('--strategy', choices=['random', 'halving'], default='halving')
+    parser.add_argument('--configs', type=int, default=27, help="configurations to sample")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="parallel training processes")
+    parser.add_argument('--seed', type=int, default=42, help="configuration sampling seed")
+    parser.add_argument('--latency-budget-ms', type=float, default=None,
+                        help="pick the best F1 whose single-row p50 latency fits this budget")
+    parser.add_argument('--cache-dir', default='.cache/pipeline', help="pipeline stage cache directory")
+    parser.add_argument('--output', default='models/hyperparameter_search.json', help="results JSON")
+    args = parser.parse_args()
+
+    _, data = IntrusionDetectionModel().prepared_data(args.dataset, StageCache(args.cache_dir))
+    configs = sample_configs(args.configs, np.random.default_rng(args.seed))
+
+    start = time.perf_counter()
+    results = search(data, configs, args.strategy, args.workers)
+    print(f"\nSearch finished in {time.perf_counter() - start:.1f}s")
+
+    results.sort(key=lambda r: r['f1_score'], reverse=True)
+    print_results("All evaluated configurations", results)
+
+    # Only models trained on every row describe what train_model.py would build;
+    # earlier halving rounds are smaller and faster because they saw less data
+    n_train = len(data['X_train'])
+    final = list({json.dumps(r['params'], sort_keys=True): r
+                  for r in results if r['train_rows'] == n_train}.values())
+    front = pareto_front(final)
+    print_results("Pareto front on all training rows (F1 vs single-row latency vs size)", front)
+
+    choice = None
+    if args.latency_budget_ms is not None:
+        within = [r for r in front if r['single_p50_ms'] <= args.latency_budget_ms]
+        choice = max(within, key=lambda r: r['f1_score']) if within else None
+        if choice:
+            params = ' '.join(f"--param {k}={v}" for k, v in choice['params'].items())
+            print(f"\nBest within {args.latency_budget_ms}ms: F1 {choice['f1_score']:.4f}")
+            print(f"Train it with: python train_model.py {params}")
+        else:
+            print(f"\nNo configuration meets {args.latency_budget_ms}ms")
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'strategy': args.strategy, 'results': results, 'pareto_front': front, 'choice': choice},
+                  f, indent=2)
+    print(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
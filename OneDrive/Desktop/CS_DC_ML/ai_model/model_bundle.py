@@ -0,0 +1,380 @@
+"""
+Model Bundle Format
+Stores a trained forest and its preprocessing as one versioned directory: a JSON
+manifest plus flat, uncompressed .npy arrays that load memory-mapped
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+REJECTED_FILE = 'REJECTED'  # marker written into a bundle the registry rejected
+BUNDLE_PREFIX = 'bundle-'
+PRECISIONS = ('float64', 'float32', 'int16')
+# int16 bundles store leaf probabilities as uint16 fixed point in units of 1/PROBABILITY_SCALE
+PROBABILITY_SCALE = 65535
+
+def is_rejected(path):
+    return os.path.exists(os.path.join(path, REJECTED_FILE))
+
+def mark_rejected(path, reason):
+    """Persist a rejection so the bundle is never loaded again, across restarts too
+
+    Delete the REJECTED file in the bundle directory to make it eligible again.
+    """
+    with open(os.path.join(path, REJECTED_FILE), 'w') as f:
+        json.dump({'rejected_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'reason': reason}, f)
+
+def list_bundles(model_dir, include_rejected=False):
+    """Complete bundle directories in model_dir, oldest first, skipping rejected ones by default"""
+    if not os.path.isdir(model_dir):
+        return []
+    names = sorted(name for name in os.listdir(model_dir)
+                   if name.startswith(BUNDLE_PREFIX)
+                   and os.path.exists(os.path.join(model_dir, name, MANIFEST_FILE)))
+    paths = [os.path.join(model_dir, name) for name in names]
+    return paths if include_rejected else [path for path in paths if not is_rejected(path)]
+
+def latest_bundle(model_dir):
+    bundles = list_bundles(model_dir)
+    return bundles[-1] if bundles else None
+
+def prune_bundles(model_dir, keep=5):
+    """Delete all but the newest `keep` bundles (rejected ones included); returns the deleted paths
+
+    Processes already serving a deleted bundle keep their memory maps.
+    """
+    bundles = list_bundles(model_dir, include_rejected=True)
+    stale = bundles[:-keep] if keep > 0 else []
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+    return stale
+
+class BundleLabelEncoder:
+    """The parts of LabelEncoder used for inference, backed by a class list"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+        self.index = {value: code for code, value in enumerate(classes)}
+
+    def transform(self, values):
+        return np.array([self.index[value] for value in values], dtype=np.int64)
+
+    def inverse_transform(self, codes):
+        return self.classes_[np.asarray(codes)]
+
+class BundleScaler:
+    """StandardScaler.transform from stored mean and scale arrays"""
+
+    def __init__(self, mean, scale):
+        self.mean_ = mean
+        self.scale_ = scale
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+class BundleForest:
+    """Random forest inference over flattened tree arrays
+
+    All trees' nodes are concatenated; child indices are absolute, leaves have
+    a left child of -1 and value holds each node's class probabilities.
+    Evaluation walks every (row, tree) pair one level per step, so the cost
+    is max_depth vectorized steps regardless of the number of trees.
+    """
+
+    def __init__(self, arrays, n_classes, max_depth):
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.children_left = arrays['children_left']
+        self.children_right = arrays['children_right']
+        self.value = arrays['value']
+        self.roots = arrays['roots']
+        self.max_depth = max_depth
+        self.classes_ = np.arange(n_classes)
+        self.cuts = None
+        if 'cut_points' in arrays:
+            offsets = arrays['cut_offsets']
+            self.cuts = [arrays['cut_points'][start:end] for start, end in zip(offsets[:-1], offsets[1:])]
+
+    def encode(self, X):
+        """Feature rows in the representation the thresholds use"""
+        # Trees compare float32 features against the thresholds, as sklearn does
+        X = np.asarray(X, dtype=np.float32)
+        if self.cuts is None:
+            return X
+        # int16 bundles: a value's code is the number of that feature's cut points below it
+        codes = np.empty(X.shape, dtype=np.int16)
+        for column, cuts in enumerate(self.cuts):
+            codes[:, column] = np.searchsorted(cuts, X[:, column])
+        return codes
+
+    def apply(self, X):
+        """Leaf node index of every row in every tree, shape (n_rows, n_trees)"""
+        X = self.encode(X)
+        rows = np.arange(len(X))[:, None]
+        nodes = np.repeat(self.roots[None, :], len(X), axis=0)
+        for _ in range(self.max_depth):
+            left = self.children_left[nodes]
+            internal = left >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(internal, np.where(go_left, left, self.children_right[nodes]), nodes)
+        return nodes
+
+    def predict_proba(self, X):
+        proba = self.value[self.apply(X)].mean(axis=1, dtype=np.float64)
+        return proba / PROBABILITY_SCALE if self.value.dtype == np.uint16 else proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    @property
+    def nbytes(self):
+        arrays = [self.feature, self.threshold, self.children_left, self.children_right, self.value, self.roots]
+        return sum(a.nbytes for a in arrays) + sum(c.nbytes for c in self.cuts or [])
+
+class ModelBundle:
+    """A loaded bundle: model, preprocessing objects and manifest"""
+
+    def __init__(self, path, manifest, arrays):
+        self.path = path
+        self.manifest = manifest
+        self.version = manifest['version']
+        self.precision = manifest.get('precision', 'float64')
+        self.feature_columns = manifest['feature_columns']
+        self.model = BundleForest(arrays, manifest['n_classes'], manifest['max_depth'])
+        self.scaler = BundleScaler(arrays['scaler_mean'], arrays['scaler_scale'])
+        self.label_encoders = {col: BundleLabelEncoder(classes)
+                               for col, classes in manifest['categorical_classes'].items()}
+        self.target_encoder = BundleLabelEncoder(manifest['target_classes'])
+        self.category_encoder = BundleLabelEncoder(manifest['category_classes'])
+        self.label_categories = manifest.get('label_categories', {})
+
+def flatten_forest(model):
+    """Concatenate a fitted forest's trees into flat node arrays"""
+    if not hasattr(model, 'estimators_') or not all(hasattr(tree, 'tree_') for tree in model.estimators_):
+        raise ValueError(f"Bundles store tree forests only, got {type(model).__name__}")
+
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+
+    def absolute(children, offset):
+        # Keep leaves at -1, shift real children to their position in the flat arrays
+        return np.where(children >= 0, children + offset, -1)
+
+    value = np.concatenate([tree.value[:, 0, :] for tree in trees])
+    totals = value.sum(axis=1, keepdims=True)
+    return {
+        'feature': np.concatenate([tree.feature for tree in trees]).astype(np.int32),
+        'threshold': np.concatenate([tree.threshold for tree in trees]).astype(np.float64),
+        'children_left': np.concatenate([absolute(tree.children_left, o) for tree, o in zip(trees, offsets)]).astype(np.int32),
+        'children_right': np.concatenate([absolute(tree.children_right, o) for tree, o in zip(trees, offsets)]).astype(np.int32),
+        'value': np.divide(value, totals, out=np.zeros_like(value), where=totals > 0),
+        'roots': offsets[:-1].astype(np.int32)
+    }, max(tree.max_depth for tree in trees)
+
+def float32_floor(values):
+    """Largest float32 not above each value
+
+    For a float32 x, x <= t exactly when x <= float32_floor(t), so rounding
+    thresholds this way never changes a split decision.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = values.astype(np.float32)
+    over = rounded.astype(np.float64) > values
+    rounded[over] = np.nextafter(rounded[over], np.float32(-np.inf))
+    return rounded
+
+def quantize_probabilities(value):
+    """uint16 fixed-point leaf probabilities whose rows still sum to exactly one"""
+    scaled = value * PROBABILITY_SCALE
+    quantized = np.floor(scaled).astype(np.int64)
+    # Hand the units lost to flooring to the largest remainders
+    missing = np.where(value.sum(axis=1) > 0, PROBABILITY_SCALE - quantized.sum(axis=1), 0)
+    ranks = np.argsort(np.argsort(quantized - scaled, axis=1), axis=1)
+    quantized += ranks < missing[:, None]
+    return quantized.astype(np.uint16)
+
+def reduce_precision(arrays, precision, n_features):
+    """Convert flattened forest arrays to a smaller serving representation
+
+    float32 rounds thresholds down to float32 and stores float32
+    probabilities. int16 replaces every threshold by its rank among the
+    distinct thresholds of its feature; rows are encoded into the same ranks
+    at predict time (BundleForest.encode) and leaf probabilities become uint16
+    fixed point. Neither changes a split decision; only the probabilities
+    lose precision, which validate_precision.py measures.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision {precision}, expected one of {PRECISIONS}")
+    if precision == 'float64':
+        return arrays
+
+    arrays = dict(arrays)
+    threshold = float32_floor(arrays['threshold'])
+    if precision == 'float32':
+        arrays['threshold'] = threshold
+        arrays['value'] = arrays['value'].astype(np.float32)
+        return arrays
+
+    internal = arrays['children_left'] >= 0
+    codes = np.zeros(len(threshold), dtype=np.int16)
+    cuts = []
+    for column in range(n_features):
+        nodes = internal & (arrays['feature'] == column)
+        column_cuts = np.unique(threshold[nodes])
+        if len(column_cuts) > np.iinfo(np.int16).max:
+            raise ValueError(f"Feature {column} has {len(column_cuts)} distinct thresholds, too many for int16")
+        codes[nodes] = np.searchsorted(column_cuts, threshold[nodes])
+        cuts.append(column_cuts)
+
+    arrays['threshold'] = codes
+    arrays['cut_points'] = np.concatenate(cuts).astype(np.float32)
+    arrays['cut_offsets'] = np.cumsum([0] + [len(c) for c in cuts]).astype(np.int64)
+    arrays['value'] = quantize_probabilities(arrays['value'])
+    return arrays
+
+def save_bundle(model_dir, model, scaler, label_encoders, target_encoder, category_encoder, feature_columns,
+                label_categories=None, version=None, precision='float64'):
+    """Write a new bundle directory under model_dir and return its path
+
+    The bundle is written to a temporary directory and renamed into place, so
+    readers never see a partial bundle. precision selects a reduced-precision
+    serving representation (see reduce_precision). If the newest bundle already
+    holds identical arrays, it is marked as fresh and returned instead.
+    """
+    arrays, max_depth = flatten_forest(model)
+    arrays = reduce_precision(arrays, precision, len(feature_columns))
+    arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+
+    if not version:
+        version = time.strftime('%Y%m%dT%H%M%S', time.gmtime())
+        if precision != 'float64':
+            version += f'-{precision}'
+    path = os.path.join(model_dir, f'{BUNDLE_PREFIX}{version}')
+    tmp_path = os.path.join(model_dir, f'.{BUNDLE_PREFIX}{version}.tmp')
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    array_entries = {}
+    for name, array in arrays.items():
+        filename = f'{name}.npy'
+        np.save(os.path.join(tmp_path, filename), np.ascontiguousarray(array))
+        with open(os.path.join(tmp_path, filename), 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        array_entries[name] = {'file': filename, 'dtype': str(array.dtype), 'shape': list(array.shape),
+                               'sha256': digest}
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'version': version,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'source_model_type': type(model).__name__,
+        'precision': precision,
+        'n_trees': len(arrays['roots']),
+        'n_nodes': len(arrays['feature']),
+        'max_depth': int(max_depth),
+        'n_classes': int(arrays['value'].shape[1]),
+        'feature_columns': list(feature_columns),
+        'categorical_classes': {col: [str(c) for c in le.classes_] for col, le in label_encoders.items()},
+        'target_classes': [str(c) for c in target_encoder.classes_],
+        'category_classes': [str(c) for c in category_encoder.classes_],
+        'label_categories': dict(label_categories or {}),
+        'arrays': array_entries
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    # Retraining the same model (e.g. a pipeline cache hit) reuses the newest bundle instead of adding a copy;
+    # rejected bundles are never reused, so retraining always leaves a servable bundle behind
+    existing = list_bundles(model_dir)
+    if existing and not os.path.exists(path):
+        with open(os.path.join(existing[-1], MANIFEST_FILE)) as f:
+            latest = json.load(f)
+        if latest['arrays'] == manifest['arrays'] and latest.get('precision') == precision:
+            shutil.rmtree(tmp_path)
+            os.utime(os.path.join(existing[-1], MANIFEST_FILE))
+            return existing[-1]
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+    return path
+
+def load_bundle(path, verify=False):
+    """Load a bundle with its arrays memory-mapped read-only
+
+    Worker processes loading the same bundle share its pages through the OS
+    page cache. verify=True also checks every array against its checksum.
+    """
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get('format_version') != BUNDLE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported bundle format {manifest.get('format_version')} in {path}")
+
+    arrays = {}
+    for name, entry in manifest['arrays'].items():
+        array_path = os.path.join(path, entry['file'])
+        if verify:
+            with open(array_path, 'rb') as f:
+                if hashlib.sha256(f.read()).hexdigest() != entry['sha256']:
+                    raise ValueError(f"Checksum mismatch for {entry['file']} in {path}")
+        arrays[name] = np.load(array_path, mmap_mode='r')
+        if list(arrays[name].shape) != entry['shape'] or str(arrays[name].dtype) != entry['dtype']:
+            raise ValueError(f"{entry['file']} does not match the manifest in {path}")
+
+    return ModelBundle(path, manifest, arrays)
+
+def convert_pickles(model_dir='models', precision='float64', output_dir=None):
+    """Build a bundle from the per-object pickles written by train_model.py"""
+    import joblib
+    from generate_nsl_kdd_data import NSLKDDDataGenerator
+
+    return save_bundle(
+        output_dir or model_dir,
+        joblib.load(f'{model_dir}/intrusion_detection_model.pkl'),
+        joblib.load(f'{model_dir}/scaler.pkl'),
+        joblib.load(f'{model_dir}/label_encoders.pkl'),
+        joblib.load(f'{model_dir}/target_encoder.pkl'),
+        joblib.load(f'{model_dir}/category_encoder.pkl'),
+        joblib.load(f'{model_dir}/feature_columns.pkl'),
+        NSLKDDDataGenerator(num_samples=0).attack_categories,
+        precision=precision
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage model bundles")
+    parser.add_argument('command', choices=['convert', 'info', 'verify', 'prune'],
+                        help="convert: build a bundle from the pickles; info/verify: inspect the latest bundle; "
+                             "prune: delete old bundles")
+    parser.add_argument('--model-dir', default='models', help="model artifact directory")
+    parser.add_argument('--precision', choices=PRECISIONS, default='float64',
+                        help="convert: serving precision (check it first with validate_precision.py)")
+    parser.add_argument('--keep', type=int, default=5, help="prune: newest bundles to keep")
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        start = time.perf_counter()
+        path = convert_pickles(args.model_dir, args.precision)
+        print(f"Bundle written to {path} in {time.perf_counter() - start:.2f}s")
+    elif args.command == 'prune':
+        for path in prune_bundles(args.model_dir, args.keep):
+            print(f"Deleted {path}")
+    else:
+        path = latest_bundle(args.model_dir)
+        if path is None:
+            raise SystemExit(f"No bundle found in {args.model_dir}")
+        start = time.perf_counter()
+        bundle = load_bundle(path, verify=args.command == 'verify')
+        print(f"Loaded {path} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        info = {k: v for k, v in bundle.manifest.items() if k not in ('arrays', 'feature_columns')}
+        print(json.dumps(info, indent=2))
@@ -0,0 +1,276 @@
+"""
+Model Registry
+Hot-reloads model bundles from the model directory: new bundles are validated in
+the background, optionally shadow-scored against live traffic, then swapped in
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from model_bundle import MANIFEST_FILE, is_rejected, list_bundles, load_bundle, mark_rejected
+from model_utils import ModelLoader, serving_bundle
+
+class ShadowStats:
+    """Agreement and latency of a candidate model against the active one"""
+
+    def __init__(self, window=1000):
+        self.samples = 0
+        self.label_agreements = 0
+        self.verdict_agreements = 0
+        self.errors = 0
+        self.skipped = 0
+        self.active_ms = deque(maxlen=window)
+        self.candidate_ms = deque(maxlen=window)
+
+    def record(self, active, candidate, active_ms, candidate_ms):
+        if candidate is None:
+            self.errors += 1
+            return
+        self.samples += 1
+        self.label_agreements += active['prediction'] == candidate['prediction']
+        self.verdict_agreements += active['is_malicious'] == candidate['is_malicious']
+        self.active_ms.append(active_ms)
+        self.candidate_ms.append(candidate_ms)
+
+    @property
+    def agreement(self):
+        return self.label_agreements / self.samples if self.samples else None
+
+    def to_dict(self):
+        def percentile(values, q):
+            return round(float(np.percentile(values, q)), 3) if values else None
+        return {
+            'samples': self.samples,
+            'label_agreement': round(self.agreement, 4) if self.samples else None,
+            'verdict_agreement': round(self.verdict_agreements / self.samples, 4) if self.samples else None,
+            'errors': self.errors,
+            'skipped': self.skipped,
+            'active_p50_ms': percentile(self.active_ms, 50),
+            'active_p99_ms': percentile(self.active_ms, 99),
+            'candidate_p50_ms': percentile(self.candidate_ms, 50),
+            'candidate_p99_ms': percentile(self.candidate_ms, 99)
+        }
+
+class ModelRegistry:
+    """Owns the active model and swaps in new bundles without a restart
+
+    Requests read `self.active` once and use that loader for the whole
+    prediction, so a swap (a single reference assignment) only affects the
+    next request. With shadow_fraction > 0 a validated bundle first becomes a
+    candidate that scores that fraction of live requests on a background
+    thread; it is promoted after min_samples if label agreement reaches
+    min_agreement, and rejected otherwise. With shadow_fraction = 0 it is
+    promoted as soon as it validates.
+    """
+
+    def __init__(self, model_dir, poll_interval=10, warm_up_rows=64, shadow_fraction=0.0,
+                 min_samples=500, min_agreement=0.95):
+        self.model_dir = model_dir
+        self.poll_interval = poll_interval
+        self.warm_up_rows = warm_up_rows
+        self.shadow_fraction = shadow_fraction
+        self.min_samples = min_samples
+        self.min_agreement = min_agreement
+
+        self.active = None
+        self.candidate = None
+        self.shadow = None
+        # Rejections are persisted in the bundles; this is the set for status()
+        self.rejected = {load_bundle_version(path) for path in list_bundles(model_dir, include_rejected=True)
+                         if is_rejected(path)}
+        self.history = deque(maxlen=20)
+        self.lock = threading.Lock()
+        self.shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-shadow')
+        # Bounds the shadow backlog so a slow candidate can't queue up unboundedly
+        self.shadow_slots = threading.BoundedSemaphore(100)
+        self.stop_event = threading.Event()
+
+    @property
+    def ready(self):
+        return self.active is not None and self.active.ready
+
+    def version_of(self, loader):
+        if loader is None:
+            return None
+        return loader.bundle.version if loader.bundle else 'pickles'
+
+    def record(self, event, version, detail=None):
+        self.history.append({'time': time.time(), 'event': event, 'version': version, 'detail': detail})
+        print(f"Model registry: {event} {version}" + (f" ({detail})" if detail else ""))
+
+    def load_initial(self):
+        """Load and warm up the newest model (bundle, else pickles); returns success"""
+        loader = ModelLoader(self.model_dir)
+        if not loader.ensure_loaded():
+            return False
+        try:
+            loader.warm_up(self.warm_up_rows)
+        except Exception as e:
+            print(f"Error warming up model: {e}")
+            return False
+        self.active = loader
+        self.record('loaded', self.version_of(loader))
+        return True
+
+    def validate(self, path):
+        """Load a bundle and check it can replace the active model; returns a warmed-up loader"""
+        loader = ModelLoader(self.model_dir)
+        loader.use_bundle(load_bundle(path, verify=True))
+
+        active = self.active
+        if active is not None and list(loader.feature_columns) != list(active.feature_columns):
+            raise ValueError("feature_columns differ from the active model")
+
+        # Smoke prediction through the request path, then the full warm-up
+        sample = {col: 0 for col in loader.feature_columns}
+        result = loader.predict_traffic(sample)
+        if result is None or not np.isclose(sum(result['probabilities']), 1.0):
+            raise ValueError(f"smoke prediction failed: {result}")
+        loader.warm_up(self.warm_up_rows)
+        return loader
+
+    def check_for_update(self):
+        """Validate the newest bundle if it is new; promote it or start shadowing it"""
+        path = serving_bundle(self.model_dir)
+        if path is None:
+            return
+        version = load_bundle_version(path)
+        known = {self.version_of(self.active), self.version_of(self.candidate)}
+        if version in known or version in self.rejected:
+            return
+
+        try:
+            loader = self.validate(path)
+        except Exception as e:
+            self.mark_rejected(path, version, f"validation: {e}")
+            return
+
+        if self.shadow_fraction > 0 and self.active is not None:
+            with self.lock:
+                self.candidate = loader
+                self.shadow = ShadowStats()
+            self.record('shadowing', version, f"{self.shadow_fraction:.0%} of traffic")
+        else:
+            self.promote(loader)
+
+    def promote(self, loader=None, shadow=None):
+        """Make the candidate (or the given loader) the active model
+
+        With `shadow`, only promote if that shadow run is still the current one,
+        so a stale shadow thread can't promote a candidate that was replaced or
+        rejected in the meantime.
+        """
+        with self.lock:
+            if shadow is not None and shadow is not self.shadow:
+                return False
+            loader = loader or self.candidate
+            if loader is None:
+                return False
+            previous = self.version_of(self.active)
+            detail = self.shadow.to_dict() if self.shadow and loader is self.candidate else None
+            self.active = loader
+            self.candidate = None
+            self.shadow = None
+        self.record('promoted', self.version_of(loader), detail or f"replaced {previous}")
+        return True
+
+    def reject(self, reason='manual', shadow=None):
+        """Drop the current candidate and never pick its bundle up again, even after a restart"""
+        with self.lock:
+            if shadow is not None and shadow is not self.shadow:
+                return False
+            candidate, self.candidate = self.candidate, None
+            detail = self.shadow.to_dict() if self.shadow else None
+            self.shadow = None
+        if candidate is None:
+            return False
+        self.mark_rejected(candidate.bundle.path, self.version_of(candidate), f"{reason}: {detail}")
+        return True
+
+    def mark_rejected(self, path, version, detail):
+        self.rejected.add(version)
+        try:
+            mark_rejected(path, detail)
+        except OSError as e:
+            print(f"Model registry: could not persist rejection of {version}: {e}")
+        self.record('rejected', version, detail)
+
+    def predict(self, features):
+        """Score with the active model; mirror a sample to the candidate in the background"""
+        active = self.active
+        if active is None:
+            return None
+
+        start = time.perf_counter()
+        result = active.predict_traffic(features)
+        active_ms = (time.perf_counter() - start) * 1000
+
+        if result is None or random.random() >= self.shadow_fraction:
+            return result
+        # Candidate and shadow change together under the lock; read them as a pair
+        with self.lock:
+            candidate, shadow = self.candidate, self.shadow
+        if candidate is not None:
+            if not self.shadow_slots.acquire(blocking=False):
+                shadow.skipped += 1
+            else:
+                self.shadow_executor.submit(self.score_shadow, candidate, shadow, dict(features), result, active_ms)
+        return result
+
+    def score_shadow(self, candidate, shadow, features, active_result, active_ms):
+        try:
+            start = time.perf_counter()
+            candidate_result = candidate.predict_traffic(features)
+            shadow.record(active_result, candidate_result, active_ms, (time.perf_counter() - start) * 1000)
+        finally:
+            self.shadow_slots.release()
+
+        # promote/reject do nothing unless this shadow run is still the current one
+        if shadow.samples >= self.min_samples:
+            if shadow.agreement >= self.min_agreement:
+                self.promote(candidate, shadow=shadow)
+            else:
+                self.reject(f"agreement {shadow.agreement:.3f} < {self.min_agreement}", shadow=shadow)
+
+    def status(self):
+        with self.lock:
+            return {
+                'active': self.version_of(self.active),
+                'ready': self.ready,
+                'candidate': self.version_of(self.candidate),
+                'shadow': self.shadow.to_dict() if self.shadow else None,
+                'shadow_fraction': self.shadow_fraction,
+                'rejected': sorted(self.rejected),
+                'history': list(self.history)
+            }
+
+    def watch(self):
+        """Poll the model directory until stop() (run on a background thread)"""
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                print(f"Model registry: update check failed: {e}")
+
+    def start(self):
+        thread = threading.Thread(target=self.watch, name='model-registry', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self.stop_event.set()
+        self.shadow_executor.shutdown(wait=False)
+
+def load_bundle_version(path):
+    """Bundle version from its manifest, without loading the arrays"""
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        return json.load(f)['version']
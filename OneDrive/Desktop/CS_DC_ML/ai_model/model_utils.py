@@ -6,6 +6,26 @@ import joblib
 import pandas as pd
 import numpy as np
 import os
+import sys
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from model_bundle import MANIFEST_FILE, latest_bundle, load_bundle
+
+DEFAULT_MODEL_DIR = os.getenv('MODEL_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models'))
+
+def serving_bundle(model_dir):
+    """The newest bundle, or None when the pickles are newer and should be served instead
+
+    Incremental training modes (sgd, nb, hgb) only write pickles, since bundles
+    hold forests, so the most recently written format wins.
+    """
+    path = latest_bundle(model_dir)
+    pickle_path = os.path.join(model_dir, 'intrusion_detection_model.pkl')
+    if path and os.path.exists(pickle_path) and \
+            os.path.getmtime(pickle_path) > os.path.getmtime(os.path.join(path, MANIFEST_FILE)):
+        return None
+    return path
 
 class ModelLoader:
     def __init__(self, model_dir='models'):
@@ -16,16 +36,39 @@ class ModelLoader:
         self.target_encoder = None
         self.category_encoder = None
         self.feature_columns = []
+        self.label_categories = {}
+        self.bundle = None
+        self.lock = threading.Lock()
+        self.warmup_stats = None
+    
+    @property
+    def ready(self):
+        """Loaded and warmed up, so requests won't pay for either"""
+        return self.model is not None and self.warmup_stats is not None
         
+    def ensure_loaded(self):
+        """Load the model once, even if several threads ask at the same time"""
+        with self.lock:
+            return self.model is not None or self.load_model()
+    
     def load_model(self):
-        """Load all model artifacts"""
+        """Load all model artifacts from the newest bundle, or the pickles if they are newer"""
         try:
+            bundle_path = serving_bundle(self.model_dir)
+            if bundle_path:
+                self.use_bundle(load_bundle(bundle_path))
+                print(f"Model bundle {self.bundle.version} loaded successfully!")
+                return True
+            
             self.model = joblib.load(f'{self.model_dir}/intrusion_detection_model.pkl')
             self.scaler = joblib.load(f'{self.model_dir}/scaler.pkl')
             self.label_encoders = joblib.load(f'{self.model_dir}/label_encoders.pkl')
             self.target_encoder = joblib.load(f'{self.model_dir}/target_encoder.pkl')
             self.category_encoder = joblib.load(f'{self.model_dir}/category_encoder.pkl')
             self.feature_columns = joblib.load(f'{self.model_dir}/feature_columns.pkl')
+            # Same label -> category mapping the bundles carry in their manifest
+            from generate_nsl_kdd_data import NSLKDDDataGenerator
+            self.label_categories = NSLKDDDataGenerator(num_samples=0).attack_categories
             
             print("Model loaded successfully!")
             return True
@@ -33,11 +76,21 @@ class ModelLoader:
             print(f"Error loading model: {e}")
             return False
     
+    def use_bundle(self, bundle):
+        """Serve predictions from a loaded ModelBundle"""
+        self.bundle = bundle
+        self.model = bundle.model
+        self.scaler = bundle.scaler
+        self.label_encoders = bundle.label_encoders
+        self.target_encoder = bundle.target_encoder
+        self.category_encoder = bundle.category_encoder
+        self.feature_columns = bundle.feature_columns
+        self.label_categories = bundle.label_categories
+    
     def predict_traffic(self, traffic_features):
         """Predict if traffic is malicious or normal"""
-        if self.model is None:
-            if not self.load_model():
-                return None
+        if self.model is None and not self.ensure_loaded():
+            return None
         
         try:
             # Convert to DataFrame if needed
@@ -71,13 +124,16 @@ class ModelLoader:
             # Scale features
             features_scaled = self.scaler.transform(features_df)
             
-            # Make prediction
-            prediction = self.model.predict(features_scaled)
+            # Make prediction: one pass over the trees, the label is the most probable class
             prediction_proba = self.model.predict_proba(features_scaled)
+            prediction = self.model.classes_[np.argmax(prediction_proba, axis=1)]
             
             # Decode prediction
             predicted_label = self.target_encoder.inverse_transform(prediction)[0]
-            predicted_category = self.category_encoder.inverse_transform(prediction)[0]
+            if self.label_categories:
+                predicted_category = self.label_categories.get(predicted_label, 'unknown')
+            else:
+                predicted_category = self.category_encoder.inverse_transform(prediction)[0]
             confidence = float(np.max(prediction_proba[0]))
             
             return {
@@ -91,6 +147,76 @@ class ModelLoader:
         except Exception as e:
             print(f"Error making prediction: {e}")
             return None
+
+    def predict_batch(self, rows):
+        """Predict a list of feature dicts in one pass, one predict_traffic-style result per row"""
+        if self.model is None and not self.ensure_loaded():
+            return None
+
+        try:
+            features_df = pd.DataFrame(list(rows))
+
+            # Encode categorical features, mapping unseen labels to the first class
+            for col in ['protocol_type', 'service', 'flag']:
+                if col in features_df.columns and col in self.label_encoders:
+                    encoder = self.label_encoders[col]
+                    values = features_df[col].astype(str)
+                    features_df[col] = encoder.transform(values.where(values.isin(encoder.classes_), encoder.classes_[0]))
+
+            for col in self.feature_columns:
+                if col not in features_df.columns:
+                    features_df[col] = 0
+
+            features_scaled = self.scaler.transform(features_df[self.feature_columns])
+            prediction_proba = self.model.predict_proba(features_scaled)
+            prediction = self.model.classes_[np.argmax(prediction_proba, axis=1)]
+
+            labels = self.target_encoder.inverse_transform(prediction)
+            if self.label_categories:
+                categories = [self.label_categories.get(label, 'unknown') for label in labels]
+            else:
+                categories = self.category_encoder.inverse_transform(prediction)
+
+            return [
+                {
+                    'is_malicious': label != 'normal',
+                    'prediction': label,
+                    'category': category,
+                    'confidence': float(proba.max()),
+                    'probabilities': proba.tolist()
+                }
+                for label, category, proba in zip(labels, categories, prediction_proba)
+            ]
+
+        except Exception as e:
+            print(f"Error making batch prediction: {e}")
+            return None
+
+    def warm_up(self, num_rows=64):
+        """Run synthetic rows through the single-row prediction path
+        
+        Touches the model pages, encoders and scaler and takes every code path
+        a real request takes, so the first request is as fast as the rest.
+        """
+        from generate_nsl_kdd_data import NSLKDDDataGenerator
+        
+        generator = NSLKDDDataGenerator(num_samples=num_rows, seed=0)
+        rows = generator.generate_labeled(num_rows // 2, num_rows - num_rows // 2)[generator.feature_columns]
+        
+        timings = []
+        for row in rows.astype(object).to_dict('records'):
+            start = time.perf_counter()
+            if self.predict_traffic(row) is None:
+                raise RuntimeError("Warm-up prediction failed")
+            timings.append((time.perf_counter() - start) * 1000)
+        
+        self.warmup_stats = {
+            'rows': len(timings),
+            'first_ms': round(timings[0], 3),
+            'p50_ms': round(float(np.median(timings)), 3),
+            'max_ms': round(max(timings), 3)
+        }
+        return self.warmup_stats
     
     def get_model_info(self):
         """Get model information"""
@@ -98,15 +224,17 @@ class ModelLoader:
             return None
         
         return {
-            'model_type': 'RandomForestClassifier',
+            'model_type': self.bundle.manifest['source_model_type'] if self.bundle else type(self.model).__name__,
+            'model_version': self.bundle.version if self.bundle else None,
             'n_features': len(self.feature_columns),
             'feature_columns': self.feature_columns,
             'target_classes': self.target_encoder.classes_.tolist() if self.target_encoder else [],
-            'category_classes': self.category_encoder.classes_.tolist() if self.category_encoder else []
+            'category_classes': self.category_encoder.classes_.tolist() if self.category_encoder else [],
+            'warmup': self.warmup_stats
         }
 
 # Global model loader instance
-model_loader = ModelLoader()
+model_loader = ModelLoader(DEFAULT_MODEL_DIR)
 
 def predict_traffic_features(traffic_features):
     """Convenience function to predict traffic features"""
@@ -116,6 +244,18 @@ def get_model_info():
     """Convenience function to get model info"""
     return model_loader.get_model_info()
 
-def initialize_model():
-    """Initialize the model (call this at application startup)"""
-    return model_loader.load_model()
+def initialize_model(model_dir=None, warm_up_rows=64):
+    """Load and warm up the model (call this at application startup)"""
+    if model_dir:
+        model_loader.model_dir = model_dir
+    if not model_loader.ensure_loaded():
+        return False
+    try:
+        model_loader.warm_up(warm_up_rows)
+    except Exception as e:
+        print(f"Error warming up model: {e}")
+        return False
+    return True
+
+def is_model_ready():
+    return model_loader.ready
@@ -0,0 +1,58 @@
+"""
+Training Pipeline Stage Cache
+Skips pipeline stages whose inputs (data content, parameters, upstream stages) are unchanged
+"""
+
+import hashlib
+import json
+import os
+
+import joblib
+
+# Bump when a stage's code changes in a way that invalidates cached outputs
+PIPELINE_VERSION = 1
+
+def file_digest(filepath, block_size=1 << 20):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class StageCache:
+    """Content-addressed store of stage outputs; a cache_dir of None disables caching"""
+
+    def __init__(self, cache_dir='.cache/pipeline'):
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, stage, inputs):
+        """Hash of the stage name, pipeline version and JSON-serializable inputs"""
+        payload = json.dumps({'stage': stage, 'version': PIPELINE_VERSION, 'inputs': inputs},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def run(self, stage, inputs, compute):
+        """Return (key, output) for a stage, computing and storing it only on a cache miss
+
+        Pass the returned key as an input of downstream stages so they are
+        invalidated whenever this stage's inputs change.
+        """
+        key = self.key(stage, inputs)
+        if not self.cache_dir:
+            return key, compute()
+
+        path = os.path.join(self.cache_dir, f'{stage}-{key[:16]}.joblib')
+        if os.path.exists(path):
+            print(f"[cache] {stage}: hit ({key[:12]})")
+            # Arrays come back memory-mapped instead of being copied into RAM
+            return key, joblib.load(path, mmap_mode='r')
+
+        print(f"[cache] {stage}: miss ({key[:12]}), running...")
+        output = compute()
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        joblib.dump(output, tmp_path)
+        os.replace(tmp_path, path)
+        return key, output
@@ -5,16 +5,81 @@ Trains Random Forest classifier on NSL-KDD style dataset
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+import time
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import GaussianNB
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, precision_score, recall_score, f1_score
 import pickle
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
 from generate_nsl_kdd_data import NSLKDDDataGenerator
+from pipeline_cache import StageCache, file_digest
+from model_bundle import prune_bundles, save_bundle
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CATEGORICAL_COLUMNS = ['protocol_type', 'service', 'flag']
+
+# Random Forest hyperparameters; override per run with --param KEY=VALUE
+RF_PARAMS = {
+    'n_estimators': 100,
+    'random_state': 42,
+    'max_depth': 15,
+    'min_samples_split': 5,
+    'min_samples_leaf': 2,
+    'n_jobs': -1
+}
+
+# Incremental training modes: models fit chunk by chunk with partial_fit, or
+# on a fixed-size reservoir sample of the stream
+INCREMENTAL_MODES = {
+    'sgd': lambda: SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42),
+    'nb': lambda: GaussianNB(),
+    'hgb': lambda: HistGradientBoostingClassifier(max_iter=100, random_state=42)
+}
+
+def peak_memory_mb():
+    """Peak resident set size of this process in MB, if the platform reports it"""
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if os.uname().sysname == 'Darwin' else peak / 1024
+
+class ReservoirSample:
+    """Fixed-size uniform sample of a stream of rows (Algorithm R, vectorized per chunk)"""
+    
+    def __init__(self, size, n_features, rng):
+        self.size = size
+        self.X = np.empty((size, n_features))
+        self.y = np.empty(size, dtype=np.int64)
+        self.seen = 0
+        self.rng = rng
+    
+    def add(self, X, y):
+        n = len(X)
+        fill = min(max(self.size - self.seen, 0), n)
+        if fill:
+            self.X[self.seen:self.seen + fill] = X[:fill]
+            self.y[self.seen:self.seen + fill] = y[:fill]
+        if fill < n:
+            # Row i of the stream replaces a random slot with probability size / (i + 1);
+            # later rows win duplicate slots, exactly as in the sequential algorithm
+            slots = self.rng.integers(0, self.seen + np.arange(fill, n) + 1)
+            keep = slots < self.size
+            self.X[slots[keep]] = X[fill:][keep]
+            self.y[slots[keep]] = y[fill:][keep]
+        self.seen += n
+    
+    def sample(self):
+        count = min(self.size, self.seen)
+        return self.X[:count], self.y[:count]
 
 class IntrusionDetectionModel:
     def __init__(self):
@@ -25,15 +90,26 @@ class IntrusionDetectionModel:
         self.target_encoder = LabelEncoder()
         self.category_encoder = LabelEncoder()
         
-    def load_data(self, filepath='data/nsl_kdd_dataset.csv'):
-        """Load dataset from CSV file"""
+    def ensure_dataset(self, filepath='data/nsl_kdd_dataset.parquet'):
+        """Generate the dataset if it does not exist yet"""
         if not os.path.exists(filepath):
             print(f"Dataset not found at {filepath}. Generating new dataset...")
             generator = NSLKDDDataGenerator(num_samples=10000)
-            df = generator.generate_dataset(normal_ratio=0.7)
-            generator.save_dataset(df, filepath)
-        
-        df = pd.read_csv(filepath)
+            if filepath.endswith('.parquet'):
+                generator.stream_dataset(filepath, normal_ratio=0.7)
+            else:
+                df = generator.generate_dataset(normal_ratio=0.7)
+                generator.save_dataset(df, filepath)
+    
+    def load_data(self, filepath='data/nsl_kdd_dataset.parquet'):
+        """Load dataset from a Parquet (memory-mapped) or CSV file"""
+        self.ensure_dataset(filepath)
+        
+        if filepath.endswith('.parquet'):
+            # Typed columns, no parsing; categories stay dictionary-encoded
+            df = pd.read_parquet(filepath, memory_map=True)
+        else:
+            df = pd.read_csv(filepath)
         print(f"Dataset loaded: {df.shape}")
         return df
     
@@ -48,9 +124,7 @@ class IntrusionDetectionModel:
         self.feature_columns = X.columns.tolist()
         
         # Encode categorical features
-        categorical_columns = ['protocol_type', 'service', 'flag']
-        
-        for col in categorical_columns:
+        for col in CATEGORICAL_COLUMNS:
             if col in X.columns:
                 le = LabelEncoder()
                 X[col] = le.fit_transform(X[col].astype(str))
@@ -65,18 +139,11 @@ class IntrusionDetectionModel:
         
         return X_scaled, y_encoded, y_category_encoded
     
-    def train_model(self, X_train, y_train):
+    def train_model(self, X_train, y_train, params=None):
         """Train Random Forest classifier"""
         print("Training Random Forest model...")
         
-        self.model = RandomForestClassifier(
-            n_estimators=100,
-            random_state=42,
-            max_depth=15,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            n_jobs=-1
-        )
+        self.model = RandomForestClassifier(**{**RF_PARAMS, **(params or {})})
         
         self.model.fit(X_train, y_train)
         print("Model training completed!")
@@ -100,9 +167,9 @@ class IntrusionDetectionModel:
         
         # Calculate metrics
         accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, average='weighted')
-        recall = recall_score(y_test, y_pred, average='weighted')
-        f1 = f1_score(y_test, y_pred, average='weighted')
+        precision = precision_score(y_test, y_pred, average='weighted', zero_division=0)
+        recall = recall_score(y_test, y_pred, average='weighted', zero_division=0)
+        f1 = f1_score(y_test, y_pred, average='weighted', zero_division=0)
         
         print(f"\nModel Performance Metrics:")
         print(f"Accuracy: {accuracy:.4f}")
@@ -113,21 +180,12 @@ class IntrusionDetectionModel:
         # Classification report
         print("\nClassification Report:")
         label_names = self.target_encoder.classes_
-        print(classification_report(y_test, y_pred, target_names=label_names))
+        labels = np.arange(len(label_names))
+        report = classification_report(y_test, y_pred, labels=labels, target_names=label_names, zero_division=0)
+        print(report)
         
         # Confusion matrix
-        cm = confusion_matrix(y_test, y_pred)
-        
-        # Plot confusion matrix
-        plt.figure(figsize=(12, 8))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                   xticklabels=label_names, yticklabels=label_names)
-        plt.title('Confusion Matrix')
-        plt.xlabel('Predicted')
-        plt.ylabel('Actual')
-        plt.tight_layout()
-        plt.savefig('models/confusion_matrix.png')
-        plt.close()
+        cm = confusion_matrix(y_test, y_pred, labels=labels)
         
         return {
             'accuracy': accuracy,
@@ -135,11 +193,11 @@ class IntrusionDetectionModel:
             'recall': recall,
             'f1_score': f1,
             'confusion_matrix': cm,
-            'classification_report': classification_report(y_test, y_pred, target_names=label_names)
+            'classification_report': report
         }
     
-    def save_model(self, model_dir='models'):
-        """Save trained model and preprocessing objects"""
+    def save_model(self, model_dir='models', keep_bundles=5):
+        """Save trained model and preprocessing objects, keeping the newest keep_bundles bundles"""
         os.makedirs(model_dir, exist_ok=True)
         
         # Save model
@@ -158,6 +216,15 @@ class IntrusionDetectionModel:
         # Save feature columns
         joblib.dump(self.feature_columns, f'{model_dir}/feature_columns.pkl')
         
+        # Save the memory-mappable bundle the load balancer serves from
+        if hasattr(self.model, 'estimators_'):
+            bundle_path = save_bundle(model_dir, self.model, self.scaler, self.label_encoders,
+                                      self.target_encoder, self.category_encoder, self.feature_columns,
+                                      NSLKDDDataGenerator(num_samples=0).attack_categories)
+            print(f"Model bundle saved to {bundle_path}")
+            for path in prune_bundles(model_dir, keep_bundles):
+                print(f"Pruned old bundle {path}")
+        
         print(f"Model and artifacts saved to {model_dir}/")
     
     def load_model(self, model_dir='models'):
@@ -224,32 +291,62 @@ class IntrusionDetectionModel:
             'probabilities': prediction_proba[0].tolist()
         }
     
-    def train_and_evaluate(self, dataset_path='data/nsl_kdd_dataset.csv'):
-        """Complete training and evaluation pipeline"""
-        print("Starting AI Intrusion Detection Model Training...")
-        
-        # Load data
+    def prepare_data(self, dataset_path, test_size=0.2, random_state=42):
+        """Load, encode, scale and split the dataset"""
         df = self.load_data(dataset_path)
-        
-        # Preprocess data
         X, y, y_category = self.preprocess_data(df)
         
-        # Split data
         X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
+            X, y, test_size=test_size, random_state=random_state, stratify=y
         )
         
-        print(f"Training set size: {X_train.shape[0]}")
-        print(f"Test set size: {X_test.shape[0]}")
+        return {
+            'X_train': X_train, 'X_test': X_test, 'y_train': y_train, 'y_test': y_test,
+            'scaler': self.scaler, 'label_encoders': self.label_encoders,
+            'target_encoder': self.target_encoder, 'category_encoder': self.category_encoder,
+            'feature_columns': self.feature_columns
+        }
+    
+    def prepared_data(self, dataset_path, cache):
+        """Run the dataset and preprocessing stages through the cache; return (stage key, data)"""
+        # Dataset stage: identified by content, not path or timestamp
+        self.ensure_dataset(dataset_path)
+        dataset_key = file_digest(dataset_path)
+        
+        # Preprocessing stage: encoders, scaler and the train/test split
+        preprocess_key, data = cache.run(
+            'preprocess', {'dataset': dataset_key, 'test_size': 0.2, 'random_state': 42},
+            lambda: self.prepare_data(dataset_path)
+        )
+        self.scaler = data['scaler']
+        self.label_encoders = data['label_encoders']
+        self.target_encoder = data['target_encoder']
+        self.category_encoder = data['category_encoder']
+        self.feature_columns = data['feature_columns']
         
-        # Train model
-        feature_importance = self.train_model(X_train, y_train)
+        return preprocess_key, data
+    
+    def plot_results(self, metrics, feature_importance, model_dir='models'):
+        """Draw the confusion matrix and feature importance plots"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
         
-        # Evaluate model
-        metrics = self.evaluate_model(X_test, y_test)
+        os.makedirs(model_dir, exist_ok=True)
+        label_names = self.target_encoder.classes_
         
-        # Save model
-        self.save_model()
+        # Plot confusion matrix
+        plt.figure(figsize=(12, 8))
+        sns.heatmap(metrics['confusion_matrix'], annot=True, fmt='d', cmap='Blues',
+                   xticklabels=label_names, yticklabels=label_names)
+        plt.title('Confusion Matrix')
+        plt.xlabel('Predicted')
+        plt.ylabel('Actual')
+        plt.tight_layout()
+        plt.savefig(f'{model_dir}/confusion_matrix.png')
+        plt.close()
+        
+        if feature_importance is None:
+            return
         
         # Save feature importance plot
         plt.figure(figsize=(12, 6))
@@ -258,21 +355,195 @@ class IntrusionDetectionModel:
         plt.title('Top 15 Feature Importance')
         plt.xlabel('Importance')
         plt.tight_layout()
-        plt.savefig('models/feature_importance.png')
+        plt.savefig(f'{model_dir}/feature_importance.png')
         plt.close()
+    
+    def train_and_evaluate(self, dataset_path='data/nsl_kdd_dataset.parquet', model_dir='models',
+                           params=None, cache_dir=None, plots=False, keep_bundles=5):
+        """Complete training and evaluation pipeline
+        
+        With a cache_dir, the preprocessing and model stages are cached by the
+        hash of their inputs (dataset content, parameters, upstream stage), so
+        re-runs only recompute what changed. Plotting runs only when asked.
+        """
+        print("Starting AI Intrusion Detection Model Training...")
+        cache = StageCache(cache_dir)
+        params = {**RF_PARAMS, **(params or {})}
+        preprocess_key, data = self.prepared_data(dataset_path, cache)
+        
+        print(f"Training set size: {data['X_train'].shape[0]}")
+        print(f"Test set size: {data['X_test'].shape[0]}")
+        
+        # Model stage
+        def fit():
+            feature_importance = self.train_model(data['X_train'], data['y_train'], params)
+            return self.model, feature_importance
+        
+        _, (self.model, feature_importance) = cache.run(
+            'model', {'preprocess': preprocess_key, 'params': params}, fit
+        )
+        
+        # Evaluate model
+        metrics = self.evaluate_model(data['X_test'], data['y_test'])
+        
+        # Save model
+        self.save_model(model_dir, keep_bundles)
+        
+        if plots:
+            self.plot_results(metrics, feature_importance, model_dir)
         
         print("\nTraining completed successfully!")
         print(f"Model saved with accuracy: {metrics['accuracy']:.4f}")
         
         return metrics, feature_importance
 
+    def iter_chunks(self, filepath, chunk_size=100000):
+        """Stream a Parquet (or CSV) dataset as DataFrames of at most chunk_size rows"""
+        if not filepath.endswith('.parquet'):
+            yield from pd.read_csv(filepath, chunksize=chunk_size)
+            return
+        
+        import pyarrow.parquet as pq
+        
+        dataset = pq.ParquetFile(filepath, memory_map=True)
+        for batch in dataset.iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    
+    def fit_encoders(self):
+        """Fit encoders on the generator's fixed value sets instead of a full pass over the data"""
+        dtypes = NSLKDDDataGenerator(num_samples=0).column_dtypes
+        for col in CATEGORICAL_COLUMNS:
+            self.label_encoders[col] = LabelEncoder().fit(dtypes[col].categories.astype(str))
+        self.target_encoder.fit(dtypes['label'].categories)
+        self.category_encoder.fit(dtypes['category'].categories)
+    
+    def encode_chunk(self, df):
+        """Encode one chunk into a feature matrix and target vector"""
+        X = df[self.feature_columns].copy()
+        for col in CATEGORICAL_COLUMNS:
+            X[col] = self.label_encoders[col].transform(X[col].astype(str))
+        return X.to_numpy(dtype=np.float64), self.target_encoder.transform(df['label'].astype(str))
+    
+    def train_incremental(self, dataset_path='data/nsl_kdd_dataset.parquet', mode='sgd', chunk_size=100000,
+                          sample_size=500000, test_size=0.2, test_sample_size=200000, model_dir='models',
+                          plots=False):
+        """Train out of core: stream the dataset in chunks and never hold all of it in memory
+        
+        The scaler is fit with partial_fit over the stream. 'sgd' and 'nb' then
+        partial_fit the model on a second pass; 'hgb' trains on a reservoir
+        sample of sample_size rows. Evaluation uses a reservoir sample of the
+        held-out rows.
+        """
+        print(f"Starting incremental training ({mode})...")
+        self.ensure_dataset(dataset_path)
+        
+        self.feature_columns = NSLKDDDataGenerator(num_samples=0).feature_columns
+        self.fit_encoders()
+        self.model = INCREMENTAL_MODES[mode]()
+        classes = np.arange(len(self.target_encoder.classes_))
+        n_features = len(self.feature_columns)
+        
+        rng = np.random.default_rng(42)
+        train_sample = ReservoirSample(sample_size, n_features, rng) if mode == 'hgb' else None
+        test_sample = ReservoirSample(test_sample_size, n_features, rng)
+        
+        # Pass 1: scaler statistics (and, for hgb, the train/test split into reservoirs)
+        rows = 0
+        for df in self.iter_chunks(dataset_path, chunk_size):
+            X, y = self.encode_chunk(df)
+            self.scaler.partial_fit(X)
+            if train_sample is not None:
+                is_test = rng.random(len(X)) < test_size
+                train_sample.add(X[~is_test], y[~is_test])
+                test_sample.add(X[is_test], y[is_test])
+            rows += len(X)
+        print(f"Scaler fit on {rows} rows")
+        
+        if train_sample is not None:
+            X_train, y_train = train_sample.sample()
+            print(f"Training on a reservoir sample of {len(X_train)} rows...")
+            self.model.fit(self.scaler.transform(X_train), y_train)
+        else:
+            # Pass 2: partial_fit chunk by chunk, holding out test rows as we go
+            for i, df in enumerate(self.iter_chunks(dataset_path, chunk_size)):
+                X, y = self.encode_chunk(df)
+                X = self.scaler.transform(X)
+                is_test = rng.random(len(X)) < test_size
+                self.model.partial_fit(X[~is_test], y[~is_test], classes=classes)
+                test_sample.add(X[is_test], y[is_test])
+                print(f"Chunk {i + 1}: {len(X)} rows")
+        print("Model training completed!")
+        
+        X_test, y_test = test_sample.sample()
+        if train_sample is not None:
+            X_test = self.scaler.transform(X_test)
+        metrics = self.evaluate_model(X_test, y_test)
+        self.save_model(model_dir)
+        if plots:
+            self.plot_results(metrics, None, model_dir)
+        
+        return metrics
+    
 if __name__ == "__main__":
+    import argparse
+    import ast
+    import json
+    
+    parser = argparse.ArgumentParser(description="Train the intrusion detection model")
+    parser.add_argument('--dataset', default='data/nsl_kdd_dataset.parquet', help="dataset (.parquet or .csv)")
+    parser.add_argument('--mode', choices=['full'] + list(INCREMENTAL_MODES), default='full',
+                        help="full: in-memory Random Forest; sgd/nb: partial_fit over chunks; "
+                             "hgb: gradient boosting on a reservoir sample")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="rows per chunk in incremental modes")
+    parser.add_argument('--sample-size', type=int, default=500000, help="reservoir sample size for hgb")
+    parser.add_argument('--model-dir', default='models', help="where to write model artifacts")
+    parser.add_argument('--report', default=None, help="write metrics, wall time and peak memory as JSON")
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=VALUE',
+                        help="Random Forest hyperparameter override, e.g. --param max_depth=20")
+    parser.add_argument('--cache-dir', default='.cache/pipeline', help="pipeline stage cache directory")
+    parser.add_argument('--no-cache', action='store_true', help="recompute every stage")
+    parser.add_argument('--plots', action='store_true', help="draw confusion matrix and feature importance plots")
+    parser.add_argument('--keep-bundles', type=int, default=5, help="newest serving bundles to keep in --model-dir")
+    args = parser.parse_args()
+    
+    params = {}
+    for item in args.param:
+        key, value = item.split('=', 1)
+        try:
+            params[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            params[key] = value
+    
     # Initialize and train model
+    start = time.perf_counter()
     model = IntrusionDetectionModel()
-    metrics, feature_importance = model.train_and_evaluate()
+    if args.mode == 'full':
+        metrics, feature_importance = model.train_and_evaluate(
+            args.dataset, args.model_dir, params,
+            cache_dir=None if args.no_cache else args.cache_dir, plots=args.plots, keep_bundles=args.keep_bundles
+        )
+    else:
+        metrics = model.train_incremental(args.dataset, args.mode, args.chunk_size, args.sample_size,
+                                          model_dir=args.model_dir, plots=args.plots)
+    wall_time = time.perf_counter() - start
+    peak_memory = peak_memory_mb()
     
     print("\nTraining Summary:")
     print(f"Accuracy: {metrics['accuracy']:.4f}")
     print(f"Precision: {metrics['precision']:.4f}")
     print(f"Recall: {metrics['recall']:.4f}")
     print(f"F1-Score: {metrics['f1_score']:.4f}")
+    print(f"Wall time: {wall_time:.1f}s")
+    if peak_memory is not None:
+        print(f"Peak memory: {peak_memory:.0f} MB")
+    
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({
+                'mode': args.mode,
+                'dataset': args.dataset,
+                'accuracy': metrics['accuracy'],
+                'f1_score': metrics['f1_score'],
+                'wall_time_s': wall_time,
+                'peak_memory_mb': peak_memory
+            }, f, indent=2)
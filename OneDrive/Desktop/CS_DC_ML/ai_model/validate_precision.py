@@ -0,0 +1,113 @@
+"""
+Reduced-Precision Bundle Validation
+Builds float32 and int16 bundles from the trained pickles and compares them with
+the full-precision bundle on held-out traffic: probability deviation, verdict flips,
+model memory and latency
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from generate_nsl_kdd_data import NSLKDDDataGenerator
+from model_bundle import PRECISIONS, convert_pickles, load_bundle
+
+def held_out_rows(dataset, rows, seed):
+    """Rows from a dataset file, or freshly generated rows the model was never trained on"""
+    if dataset:
+        df = pd.read_parquet(dataset) if dataset.endswith('.parquet') else pd.read_csv(dataset)
+        return df.sample(n=min(rows, len(df)), random_state=seed)
+    generator = NSLKDDDataGenerator(num_samples=rows, seed=seed)
+    return generator.generate_dataset()
+
+def preprocess(bundle, df):
+    """Encode and scale a frame the way ModelLoader.predict_traffic does, for the whole batch"""
+    df = df.copy()
+    for col, encoder in bundle.label_encoders.items():
+        values = df[col].astype(str)
+        df[col] = encoder.transform(values.where(values.isin(encoder.index), encoder.classes_[0]))
+    return bundle.scaler.transform(df[bundle.feature_columns])
+
+def single_row_latency(bundle, X, calls=200):
+    timings = []
+    for i in range(min(calls, len(X))):
+        start = time.perf_counter()
+        bundle.model.predict_proba(X[i:i + 1])
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+def compare(reference, candidate, X):
+    """Deviation of a candidate bundle's output from the reference bundle's on rows X"""
+    start = time.perf_counter()
+    proba = candidate.model.predict_proba(X)
+    batch_seconds = time.perf_counter() - start
+    reference_proba = reference.model.predict_proba(X)
+
+    deviation = np.abs(proba - reference_proba)
+    labels = candidate.target_encoder.inverse_transform(np.argmax(proba, axis=1))
+    reference_labels = reference.target_encoder.inverse_transform(np.argmax(reference_proba, axis=1))
+    return {
+        'precision': candidate.precision,
+        'model_mb': candidate.model.nbytes / (1024 * 1024),
+        'max_abs_deviation': float(deviation.max()),
+        'mean_abs_deviation': float(deviation.mean()),
+        'label_flips': int((labels != reference_labels).sum()),
+        'verdict_flips': int(((labels != 'normal') != (reference_labels != 'normal')).sum()),
+        'single_p50_ms': single_row_latency(candidate, X),
+        'batch_per_row_us': batch_seconds / len(X) * 1e6
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate reduced-precision model bundles against full precision")
+    parser.add_argument('--model-dir', default='models', help="directory with the trained pickles")
+    parser.add_argument('--precision', nargs='+', choices=PRECISIONS[1:], default=list(PRECISIONS[1:]))
+    parser.add_argument('--dataset', default=None, help="held-out dataset file (default: freshly generated rows)")
+    parser.add_argument('--rows', type=int, default=20000, help="held-out rows to score")
+    parser.add_argument('--seed', type=int, default=7, help="seed for generating or sampling rows")
+    parser.add_argument('--max-deviation', type=float, default=1e-3,
+                        help="largest acceptable probability deviation")
+    parser.add_argument('--output', default=None, help="write the report as JSON")
+    args = parser.parse_args()
+
+    df = held_out_rows(args.dataset, args.rows, args.seed)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        reference = load_bundle(convert_pickles(args.model_dir, 'float64', tmp_dir))
+        X = preprocess(reference, df)
+        results.append(compare(reference, reference, X))
+        for precision in args.precision:
+            candidate = load_bundle(convert_pickles(args.model_dir, precision, tmp_dir))
+            results.append(compare(reference, candidate, X))
+
+    print(f"\nValidated on {len(X)} held-out rows")
+    print(f"{'precision':>10} {'model':>9} {'max dev':>10} {'mean dev':>10} {'label flips':>12} "
+          f"{'verdict flips':>14} {'1-row p50':>10} {'batch/row':>10}")
+    print("-" * 92)
+    for r in results:
+        print(f"{r['precision']:>10} {r['model_mb']:>7.1f}MB {r['max_abs_deviation']:>10.2e} "
+              f"{r['mean_abs_deviation']:>10.2e} {r['label_flips']:>12} {r['verdict_flips']:>14} "
+              f"{r['single_p50_ms']:>8.2f}ms {r['batch_per_row_us']:>8.1f}us")
+
+    failed = [r['precision'] for r in results
+              if r['verdict_flips'] or r['max_abs_deviation'] > args.max_deviation]
+    for r in results[1:]:
+        verdict = 'FAIL' if r['precision'] in failed else 'OK'
+        print(f"{r['precision']}: {verdict}"
+              + ("" if verdict == 'FAIL' else f" - deploy with: python model_bundle.py convert --precision {r['precision']}"))
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({'rows': len(X), 'max_deviation': args.max_deviation, 'results': results}, f, indent=2)
+        print(f"Report saved to {args.output}")
+
+    if failed:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+End-to-End Load Balancer Benchmark
+Starts the load balancer in front of stub backend instances and drives fixed
+workloads for every algorithm with AI security on and off, recording throughput,
+latency percentiles, CPU and RSS as JSON; `compare` flags regressions between two runs
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import Counter
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'traffic'))
+from latency_histogram import LatencyHistogram
+from traffic_generator import TrafficGenerator
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+ALGORITHMS = ('round_robin', 'least_connections', 'weighted_round_robin')
+WORKLOADS = ('small_get', 'large_upload', 'attack_heavy')
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+
+# metric -> True when higher is better; compare flags moves the wrong way beyond the threshold
+COMPARED_METRICS = {
+    'throughput_rps': True,
+    'p50_ms': False,
+    'p99_ms': False,
+    'lb_cpu_ms_per_request': False,
+    'lb_peak_rss_mb': False
+}
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process, from /proc"""
+    with open(f'/proc/{pid}/stat') as f:
+        fields = f.read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+def memory_mb(pid):
+    """Current (VmRSS) and peak (VmHWM) resident set size in MB"""
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            if key in ('VmRSS', 'VmHWM'):
+                values[key] = int(value.split()[0]) / 1024
+    return values.get('VmRSS', 0.0), values.get('VmHWM', 0.0)
+
+def wait_until_ready(url, process, timeout):
+    """Poll a URL until it answers 200; fail early if the process exits"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"process exited with {process.returncode} before {url} was ready")
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+def stop(process):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def start_backends(ports, latency, latency_ms, log):
+    """Instances of the stub backend profile, one process serving every port"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, 'servers', 'backend.py'), '--profile', 'stub', '--instances', str(len(ports)),
+         '--host', '127.0.0.1', '--ports', *map(str, ports), '--latency', latency, '--latency-ms', str(latency_ms)],
+        stdout=log, stderr=subprocess.STDOUT
+    )
+    for port in ports:
+        wait_until_ready(f'http://127.0.0.1:{port}/health', process, 30)
+    return process
+
+def start_load_balancer(port, algorithm, security, backend_ports, model_dir, workdir, log, timeout):
+    """Launch the load balancer with uvicorn on its own port, database and log file"""
+    case = f'{algorithm}-{security}'
+    env = dict(
+        os.environ,
+        LB_ALGORITHM=algorithm,
+        ENABLE_AI_SECURITY='true' if security == 'on' else 'false',
+        BACKEND_SERVERS=','.join(f'127.0.0.1:{p}:{i + 1}' for i, p in enumerate(backend_ports)),
+        SQLITE_DB_PATH=os.path.join(workdir, f'{case}.db'),
+        LOG_FILE=os.path.join(workdir, f'{case}.log'),
+        LOG_LEVEL='WARNING',
+        MODEL_DIR=model_dir,
+        MODEL_RELOAD_INTERVAL='0'
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'load_balancer:app', '--host', '127.0.0.1', '--port', str(port),
+         '--log-level', 'warning', '--no-access-log'],
+        cwd=os.path.join(ROOT, 'load_balancer'), env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    wait_until_ready(f'http://127.0.0.1:{port}/ready', process, timeout)
+    return process
+
+def workload_requests(workload, generator, upload_bytes):
+    """An endless, seeded stream of request_data dicts for TrafficGenerator.send_request"""
+    base = generator.load_balancer_url
+    headers = generator.normal_headers[0]
+    if workload == 'small_get':
+        request_data = {'method': 'GET', 'url': f'{base}/api/users', 'headers': headers, 'body': None, 'type': 'normal'}
+        while True:
+            yield request_data
+    elif workload == 'large_upload':
+        # A multipart form like a browser upload, encoded once and re-sent as is
+        boundary = 'bench-e2e-boundary'
+        body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="upload.bin"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n').encode() + b'x' * upload_bytes \
+            + f'\r\n--{boundary}--\r\n'.encode()
+        request_data = {'method': 'POST', 'url': f'{base}/api/upload', 'body': body, 'type': 'normal',
+                        'headers': {**headers, 'Content-Type': f'multipart/form-data; boundary={boundary}'}}
+        while True:
+            yield request_data
+    elif workload == 'attack_heavy':
+        # 80% attacks across every pattern, the rest ordinary browsing
+        while True:
+            yield generator.next_request(0.8)
+    else:
+        raise ValueError(f"Unknown workload {workload}")
+
+async def drive(url, workload, duration, warmup, concurrency, upload_bytes, pids, seed):
+    """Closed loop: `concurrency` clients send back to back; only requests finishing after warm-up count"""
+    random.seed(seed)
+    histogram = LatencyHistogram()
+    statuses = Counter()
+    peak_rss = {pid: 0.0 for pid in pids.values()}
+
+    async with TrafficGenerator(url, connection_limit=concurrency) as generator:
+        requests = workload_requests(workload, generator, upload_bytes)
+        start = time.perf_counter()
+        measure_from = start + warmup
+        deadline = measure_from + duration
+        baseline = {}
+
+        async def client():
+            while time.perf_counter() < deadline:
+                result = await generator.send_request(next(requests))
+                if time.perf_counter() < measure_from:
+                    continue
+                histogram.record(result['latency'])
+                statuses[result['status_code']] += 1
+
+        async def sample():
+            await asyncio.sleep(warmup)
+            baseline['cpu'] = {name: cpu_seconds(pid) for name, pid in pids.items()}
+            baseline['client'] = time.process_time()
+            while time.perf_counter() < deadline:
+                for pid in peak_rss:
+                    peak_rss[pid] = max(peak_rss[pid], memory_mb(pid)[0])
+                await asyncio.sleep(0.25)
+
+        await asyncio.gather(sample(), *(client() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - measure_from
+
+    cpu = {name: cpu_seconds(pid) - baseline['cpu'][name] for name, pid in pids.items()}
+    requests_done = histogram.total
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 500)
+    latency = histogram.summary()
+    return {
+        'requests': requests_done,
+        'errors': errors,
+        'error_rate': round(errors / requests_done, 4) if requests_done else 0.0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'throughput_rps': round(requests_done / elapsed, 1),
+        'latency': latency,
+        'p50_ms': latency['p50_ms'],
+        'p99_ms': latency['p99_ms'],
+        'lb_cpu_percent': round(cpu['lb'] / elapsed * 100, 1),
+        'lb_cpu_ms_per_request': round(cpu['lb'] * 1000 / requests_done, 3) if requests_done else None,
+        'lb_rss_mb': round(memory_mb(pids['lb'])[0], 1),
+        'lb_peak_rss_mb': round(peak_rss[pids['lb']], 1),
+        'backend_cpu_percent': round(cpu['backends'] / elapsed * 100, 1),
+        # A client near 100% of a core is the bottleneck, not the load balancer
+        'client_cpu_percent': round((time.process_time() - baseline['client']) / elapsed * 100, 1),
+        'histogram': histogram.to_dict()
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='bench_e2e_')
+    log = open(os.path.join(workdir, 'processes.log'), 'w')
+    backend_ports = [free_port() for _ in range(args.backends)]
+    results = {
+        'meta': {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'git_commit': git_commit(),
+            'python': sys.version.split()[0],
+            'cpus': os.cpu_count(),
+            'duration': args.duration,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'backends': args.backends,
+            'backend_latency': args.backend_latency,
+            'backend_latency_ms': args.backend_latency_ms,
+            'upload_kb': args.upload_kb
+        },
+        'cases': {}
+    }
+
+    print(f"Working directory: {workdir}")
+    backends = start_backends(backend_ports, args.backend_latency, args.backend_latency_ms, log)
+    try:
+        for algorithm in args.algorithms:
+            for security in args.security:
+                for workload in args.workloads:
+                    # A fresh load balancer per case, so RSS and the request log start from zero
+                    port = free_port()
+                    lb = start_load_balancer(port, algorithm, security, backend_ports, args.model_dir,
+                                             workdir, log, args.ready_timeout)
+                    try:
+                        result = asyncio.run(drive(
+                            f'http://127.0.0.1:{port}', workload, args.duration, args.warmup, args.concurrency,
+                            args.upload_kb * 1024, {'lb': lb.pid, 'backends': backends.pid}, args.seed
+                        ))
+                    finally:
+                        stop(lb)
+                    key = f'{algorithm}/security-{security}/{workload}'
+                    results['cases'][key] = result
+                    print(f"{key:<50} {result['throughput_rps']:>8.1f} req/s  p50 {result['p50_ms']:>7.2f}ms  "
+                          f"p99 {result['p99_ms']:>8.2f}ms  lb cpu {result['lb_cpu_percent']:>5.1f}%  "
+                          f"rss {result['lb_peak_rss_mb']:>6.1f}MB  errors {result['errors']}")
+    finally:
+        stop(backends)
+        log.close()
+
+    output = args.output or os.path.join(BENCHMARKS, 'results', f"e2e-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+def compare(args):
+    """Print each shared case's metrics side by side; exit 1 if any regressed beyond the threshold"""
+    with open(args.baseline) as f:
+        baseline = json.load(f)['cases']
+    with open(args.candidate) as f:
+        candidate = json.load(f)['cases']
+
+    regressions = []
+    print(f"{'case':<50} {'metric':<22} {'baseline':>10} {'candidate':>10} {'change':>8}")
+    print("-" * 104)
+    for key in sorted(set(baseline) & set(candidate)):
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = baseline[key].get(metric), candidate[key].get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            regressed = -change > args.threshold if higher_is_better else change > args.threshold
+            flag = '  REGRESSION' if regressed else ''
+            print(f"{key:<50} {metric:<22} {old:>10.2f} {new:>10.2f} {change:>+7.1%}{flag}")
+            if regressed:
+                regressions.append(f"{key} {metric}")
+        if candidate[key]['error_rate'] > baseline[key]['error_rate'] + args.max_error_increase:
+            regressions.append(f"{key} error_rate")
+            print(f"{key:<50} {'error_rate':<22} {baseline[key]['error_rate']:>10.4f} "
+                  f"{candidate[key]['error_rate']:>10.4f}  REGRESSION")
+
+    for key in sorted(set(baseline) ^ set(candidate)):
+        print(f"{key}: only in {'baseline' if key in baseline else 'candidate'}, not compared")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        raise SystemExit(1)
+    print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end load balancer benchmark")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="benchmark every algorithm / security / workload case")
+    run_parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    run_parser.add_argument('--security', nargs='+', choices=('off', 'on'), default=['off', 'on'],
+                            help="AI security settings to run (on needs a trained model)")
+    run_parser.add_argument('--workloads', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    run_parser.add_argument('--duration', type=float, default=10.0, help="measured seconds per case")
+    run_parser.add_argument('--warmup', type=float, default=2.0, help="unmeasured seconds before each case")
+    run_parser.add_argument('--concurrency', type=int, default=32, help="concurrent closed-loop clients")
+    run_parser.add_argument('--backends', type=int, default=3, help="stub backends behind the load balancer")
+    run_parser.add_argument('--backend-latency', choices=('zero', 'fixed', 'lognormal', 'bimodal'), default='zero',
+                            help="stub backend service time distribution")
+    run_parser.add_argument('--backend-latency-ms', type=float, default=1.0,
+                            help="stub fixed service time, or lognormal/bimodal median")
+    run_parser.add_argument('--upload-kb', type=int, default=1024, help="body size of the large_upload workload")
+    run_parser.add_argument('--model-dir', default=os.path.join(ROOT, 'models'),
+                            help="trained model for security-on cases")
+    run_parser.add_argument('--ready-timeout', type=float, default=120.0,
+                            help="seconds to wait for the load balancer's /ready")
+    run_parser.add_argument('--seed', type=int, default=42, help="seed for the attack_heavy request mix")
+    run_parser.add_argument('--output', default=None, help="results file (default: benchmarks/results/e2e-<time>.json)")
+
+    compare_parser = commands.add_parser('compare', help="compare two result files and flag regressions")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="relative change counted as a regression (0.10 = 10%%)")
+    compare_parser.add_argument('--max-error-increase', type=float, default=0.01,
+                                help="absolute error-rate increase counted as a regression")
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        if 'on' in args.security and not os.path.isdir(args.model_dir):
+            parser.error(f"--security on needs a trained model in {args.model_dir} (make train, or --model-dir)")
+        run(args)
+    else:
+        compare(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Hot-Path Microbenchmarks
+Times the per-request pieces of the load balancer in isolation (feature extraction,
+model prediction, server selection, request logging) and reports ops/sec and
+tracemalloc allocations per call; `--compare` flags regressions against a saved run
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='bench_hot_paths_')
+
+# The load balancer module opens its database and log file on import
+os.environ.setdefault('SQLITE_DB_PATH', os.path.join(WORKDIR, 'requests.db'))
+os.environ.setdefault('LOG_FILE', os.path.join(WORKDIR, 'load_balancer.log'))
+os.environ['ENABLE_AI_SECURITY'] = 'false'
+os.environ['LOG_LEVEL'] = 'WARNING'
+sys.path.append(os.path.join(ROOT, 'load_balancer'))
+sys.path.append(os.path.join(ROOT, 'ai_model'))
+import load_balancer as lb_module
+from traffic_analyzer import TrafficFeatureExtractor
+from model_utils import ModelLoader
+
+ALGORITHMS = ('round_robin', 'least_connections', 'weighted_round_robin')
+BACKEND_COUNTS = (3, 100, 1000)
+
+NORMAL_REQUEST = {
+    'method': 'GET',
+    'path': '/api/products',
+    'query_params': {'category': 'electronics', 'page': '2'},
+    'headers': {
+        'host': 'localhost:8000',
+        'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'accept': 'application/json',
+        'accept-encoding': 'gzip, deflate',
+        'connection': 'keep-alive'
+    },
+    'client_ip': '10.0.0.12',
+    'body': b''
+}
+
+ATTACK_REQUEST = {
+    'method': 'POST',
+    'path': '/api/login',
+    'query_params': {'user': "admin' OR '1'='1", 'next': '../../../etc/passwd'},
+    'headers': {'host': 'localhost:8000', 'user-agent': 'sqlmap/1.6.12', 'content-type': 'application/x-www-form-urlencoded'},
+    'client_ip': '203.0.113.66',
+    'body': b"username=admin'--&password=x; cat /etc/shadow&cmd=<script>alert(1)</script>"
+}
+
+def measure(fn, min_time=1.0, rounds=5):
+    """pytest-benchmark style timing: calibrate a loop count, then time several rounds of it"""
+    fn()
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / rounds / 2:
+            break
+        iterations *= 2
+
+    per_call = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        per_call.append((time.perf_counter() - start) / iterations)
+
+    return {
+        'rounds': rounds,
+        'iterations': iterations,
+        'min_us': round(min(per_call) * 1e6, 3),
+        'median_us': round(statistics.median(per_call) * 1e6, 3),
+        'stddev_us': round(statistics.stdev(per_call) * 1e6, 3) if rounds > 1 else 0.0,
+        'ops_per_sec': round(1 / statistics.median(per_call), 1)
+    }
+
+def allocations(fn, calls=200):
+    """tracemalloc view of one call: peak transient bytes, and bytes still held afterwards (leaks, caches)"""
+    fn()
+    tracemalloc.start()
+    try:
+        peak = 0
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(calls):
+            tracemalloc.reset_peak()
+            current, _ = tracemalloc.get_traced_memory()
+            fn()
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'peak_bytes_per_op': peak,
+        'retained_bytes_per_op': round((after - before) / calls, 1)
+    }
+
+def feature_benchmarks():
+    extractor = TrafficFeatureExtractor()
+    return {
+        'extract_features[normal]': (lambda: extractor.extract_features(NORMAL_REQUEST), 1),
+        'extract_features[attack]': (lambda: extractor.extract_features(ATTACK_REQUEST), 1)
+    }
+
+def model_benchmarks(model_dir, batch_size):
+    loader = ModelLoader(model_dir)
+    if not loader.ensure_loaded():
+        print(f"No model in {model_dir}; skipping prediction benchmarks")
+        return {}
+    extractor = TrafficFeatureExtractor()
+    rows = [extractor.extract_features(NORMAL_REQUEST if i % 2 else ATTACK_REQUEST) for i in range(batch_size)]
+    return {
+        'predict_traffic[single]': (lambda: loader.predict_traffic(rows[0]), 1),
+        f'predict_batch[{batch_size}]': (lambda: loader.predict_batch(rows), batch_size)
+    }
+
+def selection_benchmarks():
+    balancer = lb_module.load_balancer
+    benchmarks = {}
+    for algorithm in ALGORITHMS:
+        for count in BACKEND_COUNTS:
+            servers = [lb_module.BackendServer('127.0.0.1', 10000 + i, weight=1 + i % 3) for i in range(count)]
+            for i, server in enumerate(servers):
+                server.active_connections = (i * 7) % 11
+
+            def select(algorithm=algorithm, servers=servers):
+                lb_module.Config.ALGORITHM = algorithm
+                balancer.servers = servers
+                return balancer.get_next_server()
+
+            benchmarks[f'get_next_server[{algorithm}-{count}]'] = (select, 1)
+    return benchmarks
+
+def logging_benchmarks():
+    balancer = lb_module.load_balancer
+    server = lb_module.BackendServer('127.0.0.1', 8001)
+    response_data = {'status_code': 200, 'response_time': 0.012}
+    security_result = {'is_malicious': False, 'prediction': 'normal', 'confidence': 0.98}
+    return {
+        'log_request': (lambda: balancer.log_request(NORMAL_REQUEST, server, response_data, security_result), 1)
+    }
+
+def compare(baseline_path, results, threshold):
+    """Regressions: best-round time or peak allocation up by more than the threshold
+
+    The best round is compared rather than the median because it is the
+    least affected by other load on the machine.
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)['benchmarks']
+
+    regressions = []
+    print(f"\nCompared with {baseline_path}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        speed = old['min_us'] / result['min_us'] - 1
+        memory = (result['peak_bytes_per_op'] - old['peak_bytes_per_op']) / max(old['peak_bytes_per_op'], 1)
+        flags = []
+        if -speed > threshold:
+            flags.append('slower')
+        if memory > threshold:
+            flags.append('allocates more')
+        print(f"{name:<48} speed {speed:>+7.1%}  peak alloc {memory:>+7.1%}"
+              + (f"  REGRESSION ({', '.join(flags)})" if flags else ""))
+        if flags:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark the load balancer's per-request hot paths")
+    parser.add_argument('--model-dir', default=os.path.join(ROOT, 'models'), help="trained model for prediction benchmarks")
+    parser.add_argument('--batch-size', type=int, default=64, help="rows per predict_batch call")
+    parser.add_argument('--min-time', type=float, default=1.0, help="seconds of timed calls per benchmark")
+    parser.add_argument('--rounds', type=int, default=5, help="timed rounds per benchmark")
+    parser.add_argument('-k', '--filter', default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument('--output', default=None, help="write results as JSON")
+    parser.add_argument('--compare', default=None, help="earlier --output file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="relative change counted as a regression (0.10 = 10%%)")
+    args = parser.parse_args()
+    if args.rounds < 1:
+        parser.error("--rounds must be at least 1")
+
+    benchmarks = {}
+    for group in (feature_benchmarks(), model_benchmarks(args.model_dir, args.batch_size),
+                  selection_benchmarks(), logging_benchmarks()):
+        benchmarks.update(group)
+    if args.filter:
+        benchmarks = {name: bench for name, bench in benchmarks.items() if args.filter in name}
+
+    results = {}
+    print(f"{'benchmark':<48} {'ops/sec':>12} {'items/sec':>12} {'median':>11} {'stddev':>10} "
+          f"{'peak alloc':>11} {'retained':>10}")
+    print("-" * 120)
+    for name, (fn, items) in benchmarks.items():
+        result = measure(fn, args.min_time, args.rounds)
+        result.update(allocations(fn))
+        result['items_per_op'] = items
+        result['items_per_sec'] = round(result['ops_per_sec'] * items, 1)
+        results[name] = result
+        print(f"{name:<48} {result['ops_per_sec']:>12,.1f} {result['items_per_sec']:>12,.1f} "
+              f"{result['median_us']:>9.1f}us {result['stddev_us']:>8.1f}us "
+              f"{result['peak_bytes_per_op'] / 1024:>9.1f}KB {result['retained_bytes_per_op']:>9.1f}B")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump({
+                'meta': {'created': datetime.now().isoformat(timespec='seconds'), 'python': sys.version.split()[0],
+                         'min_time': args.min_time, 'rounds': args.rounds},
+                'benchmarks': results
+            }, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.compare:
+        regressions = compare(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            raise SystemExit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Request Log Query Benchmark
+Times the dashboard queries and request inserts against the original
+UUID/ISO-timestamp schema and the indexed epoch-ms schema with rollups
+(optionally partitioned)
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT, 'load_balancer'))
+sys.path.append(os.path.join(ROOT, 'dashboard'))
+
+from log_store import RequestLogStore, now_ms, DAY_MS
+from app import DashboardData
+
+# The original DashboardData queries, run against the original schema
+LEGACY_QUERIES = {
+    'count_all': ("SELECT COUNT(*) FROM requests", ()),
+    'count_blocked': ("SELECT COUNT(*) FROM requests WHERE is_malicious = 1", ()),
+    'attack_types': ("SELECT prediction, COUNT(*) FROM requests WHERE is_malicious = 1 GROUP BY prediction", ()),
+    'requests_24h': ("SELECT COUNT(*) FROM requests WHERE timestamp > strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime', '-1 day')", ()),
+    'timeline_24h': ("""
+        SELECT datetime(timestamp), COUNT(*), SUM(CASE WHEN is_malicious = 1 THEN 1 ELSE 0 END), AVG(response_time)
+        FROM requests WHERE timestamp > strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime', '-1 day')
+        GROUP BY strftime('%Y-%m-%d %H:00:00', timestamp)
+    """, ()),
+    'recent_50': ("SELECT * FROM requests ORDER BY timestamp DESC LIMIT 50", ()),
+}
+
+# Synthetic rows are generated inside SQLite so 10M rows take seconds, not minutes
+ROWS_CTE = """
+    WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < :rows - 1)
+"""
+
+ROW_VALUES = """
+    '10.0.' || (abs(random()) % 256) || '.' || (abs(random()) % 256),
+    CASE abs(random()) % 4 WHEN 0 THEN 'POST' ELSE 'GET' END,
+    '/api/' || CASE abs(random()) % 5 WHEN 0 THEN 'users' WHEN 1 THEN 'products' WHEN 2 THEN 'orders'
+                                      WHEN 3 THEN 'search' ELSE 'dashboard' END,
+    'http://localhost:' || (8001 + abs(random()) % 3),
+    CASE WHEN abs(random()) % 10 = 0 THEN 403 ELSE 200 END,
+    (abs(random()) % 500) / 1000.0,
+    CASE WHEN abs(random()) % 5 = 0 THEN 1 ELSE 0 END,
+    CASE abs(random()) % 4 WHEN 0 THEN 'neptune' WHEN 1 THEN 'satan' WHEN 2 THEN 'smurf' ELSE 'normal' END,
+    (abs(random()) % 1000) / 1000.0
+"""
+
+def build_legacy(path, rows, days):
+    """Build a database with the original schema: random UUID keys and ISO timestamps"""
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE requests (
+            id TEXT PRIMARY KEY, timestamp TEXT, client_ip TEXT, method TEXT, path TEXT,
+            server_url TEXT, status_code INTEGER, response_time REAL, is_malicious BOOLEAN,
+            prediction TEXT, confidence REAL
+        )
+    ''')
+    start = now_ms() - days * DAY_MS
+    step = days * DAY_MS / rows
+    conn.execute(ROWS_CTE + f"""
+        INSERT INTO requests
+        SELECT lower(hex(randomblob(16))),
+               strftime('%Y-%m-%dT%H:%M:%f', (:start + n * :step) / 1000.0, 'unixepoch', 'localtime'),
+               {ROW_VALUES}
+        FROM seq
+    """, {'rows': rows, 'start': start, 'step': step})
+    conn.commit()
+    conn.close()
+
+def build_indexed(path, rows, days, partitioned=False):
+    """Build a database with the indexed epoch-ms schema"""
+    store = RequestLogStore(path)
+    store.init_schema()
+    start = now_ms() - days * DAY_MS
+    step = days * DAY_MS / rows
+    store.conn.execute(ROWS_CTE + f"""
+        INSERT INTO requests (timestamp, client_ip, method, path, server_url, status_code,
+                              response_time, is_malicious, prediction, confidence)
+        SELECT CAST(:start + n * :step AS INTEGER), {ROW_VALUES}
+        FROM seq
+    """, {'rows': rows, 'start': start, 'step': step})
+    store.conn.commit()
+    # The bulk load bypasses the writer, so derive the rollups in one pass
+    store.rebuild_rollups()
+    store.close()
+
+    if partitioned:
+        store = RequestLogStore(path, partitioned=True)
+        store.init_schema()
+        store.close()
+
+def vacuum(path):
+    """Rebuild the file so sizes compare layouts, not leftover free pages from the build"""
+    conn = sqlite3.connect(path)
+    conn.execute('VACUUM')
+    conn.close()
+
+def sample_row(i):
+    return {
+        'client_ip': f'10.0.{i % 256}.{i // 256 % 256}', 'method': 'GET', 'path': '/api/users',
+        'server_url': f'http://localhost:{8001 + i % 3}', 'status_code': 200, 'response_time': 0.012,
+        'is_malicious': i % 5 == 0, 'prediction': 'neptune' if i % 5 == 0 else 'normal', 'confidence': 0.9
+    }
+
+def rows_per_sec(fn, rows):
+    start = time.perf_counter()
+    fn()
+    return rows / (time.perf_counter() - start)
+
+def insert_legacy(path, rows, batch):
+    """The original writer (a connection and a commit per request), and the same insert batched"""
+    def values(i):
+        row = sample_row(i)
+        return (str(uuid.uuid4()), datetime.now().isoformat(), row['client_ip'], row['method'], row['path'],
+                row['server_url'], row['status_code'], row['response_time'], row['is_malicious'],
+                row['prediction'], row['confidence'])
+    sql = 'INSERT INTO requests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+
+    def single():
+        for i in range(rows):
+            conn = sqlite3.connect(path)
+            conn.execute(sql, values(i))
+            conn.commit()
+            conn.close()
+
+    def batched():
+        conn = sqlite3.connect(path)
+        for start in range(0, rows, batch):
+            with conn:
+                conn.executemany(sql, [values(i) for i in range(start, start + batch)])
+        conn.close()
+
+    return {'insert_1/txn': rows_per_sec(single, rows), f'insert_{batch}/txn': rows_per_sec(batched, rows)}
+
+def insert_indexed(path, rows, batch, partitioned=False):
+    """RequestLogStore writes: one row per transaction, as the load balancer logs, and batched"""
+    store = RequestLogStore(path, partitioned=partitioned)
+    store.init_schema()
+    results = {
+        'insert_1/txn': rows_per_sec(lambda: [store.insert(sample_row(i)) for i in range(rows)], rows),
+        f'insert_{batch}/txn': rows_per_sec(
+            lambda: [store.insert_many([sample_row(i) for i in range(start, start + batch)])
+                     for start in range(0, rows, batch)], rows)
+    }
+    store.close()
+    return results
+
+def timed(fn, repeat):
+    """Best-of-N wall time in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def bench_legacy(path, repeat):
+    conn = sqlite3.connect(path)
+    results = {
+        name: timed(lambda: conn.execute(sql, params).fetchall(), repeat)
+        for name, (sql, params) in LEGACY_QUERIES.items()
+    }
+    conn.close()
+    return results
+
+def bench_dashboard(path, repeat):
+    data = DashboardData(path)
+    return {
+        'overview': timed(data.get_overview_stats, repeat),
+        'timeline_24h': timed(lambda: data.get_traffic_timeline(24), repeat),
+        'attacks': timed(data.get_attack_distribution, repeat),
+        'recent_50': timed(lambda: data.get_recent_requests(50), repeat),
+    }
+
+def print_results(title, results, unit='ms'):
+    print(f"\n{title}")
+    print("-" * 60)
+    for name, value in results.items():
+        print(f"{name:<20} {value:>12.2f} {unit}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request log schemas")
+    parser.add_argument('--rows', type=int, default=10_000_000, help="rows per database")
+    parser.add_argument('--days', type=int, default=30, help="days of traffic the rows span")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per query (best is reported)")
+    parser.add_argument('--insert-rows', type=int, default=5000, help="rows inserted per write benchmark")
+    parser.add_argument('--insert-batch', type=int, default=100, help="rows per insert_many transaction")
+    parser.add_argument('--dir', default=None, help="directory for the benchmark databases")
+    args = parser.parse_args()
+
+    workdir = args.dir or tempfile.mkdtemp(prefix='bench_request_log_')
+    os.makedirs(workdir, exist_ok=True)
+
+    layouts = [
+        ('legacy (uuid + iso, no indexes)', 'legacy.db', lambda p: build_legacy(p, args.rows, args.days),
+         bench_legacy, insert_legacy),
+        ('indexed (rowid + epoch-ms + rollups)', 'indexed.db', lambda p: build_indexed(p, args.rows, args.days),
+         bench_dashboard, insert_indexed),
+        ('indexed + daily partitions', 'partitioned.db',
+         lambda p: build_indexed(p, args.rows, args.days, partitioned=True), bench_dashboard,
+         lambda p, rows, batch: insert_indexed(p, rows, batch, partitioned=True)),
+    ]
+
+    for title, filename, build, bench, insert in layouts:
+        path = os.path.join(workdir, filename)
+        if os.path.exists(path):
+            os.remove(path)
+        start = time.perf_counter()
+        build(path)
+        build_time = time.perf_counter() - start
+        vacuum(path)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        print_results(f"{title}: {args.rows:,} rows, built in {build_time:.1f}s, {size_mb:.0f} MB",
+                      bench(path, args.repeat))
+        # Writes go into the full-size tables and indexes, after the reads
+        print_results(f"{title}: inserting {args.insert_rows:,} rows", insert(path, args.insert_rows,
+                                                                                   args.insert_batch),
+                      unit='rows/s')
+
+    print(f"\nDatabases kept in {workdir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Training Mode Benchmark
+Runs each training mode in a fresh process and compares wall time, peak memory and accuracy
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AI_MODEL = os.path.join(ROOT, 'ai_model')
+
+def run_mode(mode, dataset, workdir, extra_args):
+    """Train one mode in a subprocess so its peak RSS is its own"""
+    report = os.path.join(workdir, f'{mode}.json')
+    cmd = [sys.executable, 'train_model.py', '--mode', mode, '--dataset', dataset,
+           '--model-dir', os.path.join(workdir, mode), '--report', report] + extra_args
+    subprocess.run(cmd, cwd=AI_MODEL, check=True, stdout=subprocess.DEVNULL)
+    with open(report) as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-memory vs incremental training")
+    parser.add_argument('--samples', type=int, default=2_000_000, help="rows in the generated dataset")
+    parser.add_argument('--dataset', default=None, help="existing .parquet dataset to use instead")
+    parser.add_argument('--modes', default='full,sgd,nb,hgb', help="comma-separated training modes")
+    parser.add_argument('--chunk-size', type=int, default=100000, help="rows per chunk in incremental modes")
+    parser.add_argument('--workers', type=int, default=1, help="dataset generation workers")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_training_')
+    dataset = os.path.abspath(args.dataset) if args.dataset else os.path.join(workdir, 'dataset.parquet')
+    if not args.dataset:
+        subprocess.run([sys.executable, 'generate_nsl_kdd_data.py', '--samples', str(args.samples),
+                        '--seed', '42', '--output', dataset, '--workers', str(args.workers)],
+                       cwd=AI_MODEL, check=True, stdout=subprocess.DEVNULL)
+
+    print(f"{'mode':<8} {'wall time':>12} {'peak memory':>14} {'accuracy':>10} {'f1':>8}")
+    print("-" * 56)
+    for mode in args.modes.split(','):
+        result = run_mode(mode, dataset, workdir, ['--chunk-size', str(args.chunk_size)])
+        peak = f"{result['peak_memory_mb']:.0f} MB" if result['peak_memory_mb'] is not None else "n/a"
+        print(f"{mode:<8} {result['wall_time_s']:>11.1f}s {peak:>14} "
+              f"{result['accuracy']:>10.4f} {result['f1_score']:>8.4f}")
+
+    print(f"\nArtifacts kept in {workdir}")
+
+if __name__ == "__main__":
+    main()
@@ -3,63 +3,171 @@ Real-time Web Dashboard for AI-Powered Secure Load Balancer
 Displays system metrics, attack detection, and server health
 """
 
-from flask import Flask, render_template, jsonify
+from flask import Flask, render_template, jsonify, request, Response
 import sqlite3
 import json
 from datetime import datetime, timedelta
 import os
 import time
+import queue
+import threading
+import logging
+import base64
+import csv
+import io
+from collections import OrderedDict
+from contextlib import contextmanager
 
 app = Flask(__name__, static_folder='static')
+logger = logging.getLogger(__name__)
 
 # Database configuration
-DB_PATH = os.path.join(os.path.dirname(__file__), "..", "logs", "load_balancer.db")
+DB_PATH = os.getenv("DB_PATH", os.path.join(os.path.dirname(__file__), "..", "logs", "load_balancer.db"))
+
+# Read pool and cache settings
+DB_POOL_SIZE = int(os.getenv("DASHBOARD_DB_POOL_SIZE", 4))
+CACHE_TTLS = {  # seconds each DashboardData result may be served from cache
+    "get_overview_stats": 5,
+    "get_server_metrics": 5,
+    "get_traffic_timeline": 30,
+    "get_attack_distribution": 10,
+    "get_recent_requests": 2,
+    "get_requests_page": 2
+}
+CACHE_MAX_ENTRIES = 1024  # least recently used results are evicted beyond this
+
+# Live update settings
+STREAM_INTERVAL = float(os.getenv("DASHBOARD_STREAM_INTERVAL", 5))  # seconds between recomputes
+STREAM_KEEPALIVE = 15  # seconds between keep-alive comments on idle streams
+
+def epoch_ms(dt):
+    """Convert a datetime to the integer epoch-ms timestamps stored in the request log"""
+    return int(dt.timestamp() * 1000)
+
+def iso_timestamp(ms):
+    """Convert a stored epoch-ms timestamp to a local ISO string for the UI"""
+    return datetime.fromtimestamp(ms / 1000).isoformat() if ms is not None else None
+
+# Request log browsing: columns returned per row and the supported filters
+REQUEST_LOG_COLUMNS = [
+    "id", "timestamp", "client_ip", "method", "path", "server_url",
+    "status_code", "response_time", "is_malicious", "prediction", "confidence"
+]
+REQUEST_LOG_FILTERS = {
+    "client_ip": "client_ip = ?",
+    "path": "path = ?",
+    "prediction": "prediction = ?",
+    "status_code": "status_code = ?",
+    "server": "server_url = ?"
+}
+
+def encode_cursor(timestamp, row_id):
+    """Opaque keyset cursor pointing just past (timestamp, id)"""
+    return base64.urlsafe_b64encode(f"{timestamp}:{row_id}".encode()).decode()
+
+def decode_cursor(cursor):
+    timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(":")
+    return int(timestamp), int(row_id)
+
+def request_log_query(filters, cursor=None):
+    """Build the WHERE clause and parameters for a filtered request log scan
+
+    Filters are equality matches, so each is served by a (column, timestamp)
+    index that already yields rows in (timestamp, id) order: pages are an
+    index seek, never a sort of every matching row.
+    """
+    clauses, params = [], []
+    for name, clause in REQUEST_LOG_FILTERS.items():
+        if filters.get(name) is not None:
+            clauses.append(clause)
+            params.append(filters[name])
+    
+    if cursor:
+        clauses.append("(timestamp, id) < (?, ?)")
+        params.extend(decode_cursor(cursor))
+    
+    where = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where, params
+
+def request_log_row(row):
+    entry = dict(zip(REQUEST_LOG_COLUMNS, row))
+    entry["timestamp"] = iso_timestamp(entry["timestamp"])
+    entry["is_malicious"] = bool(entry["is_malicious"])
+    return entry
+
+class ConnectionPool:
+    """Fixed-size pool of persistent read-only SQLite connections"""
+    
+    def __init__(self, db_path, size=DB_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self.idle = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+    
+    def open(self):
+        uri = f"file:{os.path.abspath(self.db_path)}?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection, opening one if the pool is not yet full"""
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                can_open = self.created < self.size
+                if can_open:
+                    self.created += 1
+            if can_open:
+                try:
+                    conn = self.open()
+                except Exception:
+                    with self.lock:
+                        self.created -= 1
+                    raise
+            else:
+                conn = self.idle.get()
+        
+        try:
+            yield conn
+        finally:
+            self.idle.put(conn)
 
 class DashboardData:
-    def __init__(self, db_path=DB_PATH):
+    def __init__(self, db_path=DB_PATH, pool_size=DB_POOL_SIZE):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path, pool_size)
         
-    def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+    def connection(self):
+        """Borrow a pooled read-only database connection"""
+        return self.pool.connection()
     
     def get_overview_stats(self):
         """Get overview statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Total requests
-        cursor.execute("SELECT COUNT(*) FROM requests")
-        total_requests = cursor.fetchone()[0]
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        # Blocked requests
-        cursor.execute("SELECT COUNT(*) FROM requests WHERE is_malicious = 1")
-        blocked_requests = cursor.fetchone()[0]
+            # Totals from the hourly rollup
+            cursor.execute("SELECT TOTAL(total), TOTAL(attacks) FROM rollup_hour")
+            total_requests, blocked_requests = (int(v) for v in cursor.fetchone())
         
-        # Attack types
-        cursor.execute("""
-            SELECT prediction, COUNT(*) as count 
-            FROM requests 
-            WHERE is_malicious = 1 
-            GROUP BY prediction
-        """)
-        attack_types = dict(cursor.fetchall())
+            # Attack types
+            cursor.execute("""
+                SELECT prediction, SUM(attacks) as count 
+                FROM rollup_prediction 
+                GROUP BY prediction
+                HAVING count > 0
+            """)
+            attack_types = dict(cursor.fetchall())
         
-        # Last 24 hours stats
-        yesterday = datetime.now() - timedelta(days=1)
-        cursor.execute("""
-            SELECT COUNT(*) FROM requests 
-            WHERE timestamp > ?
-        """, (yesterday.isoformat(),))
-        requests_24h = cursor.fetchone()[0]
-        
-        cursor.execute("""
-            SELECT COUNT(*) FROM requests 
-            WHERE is_malicious = 1 AND timestamp > ?
-        """, (yesterday.isoformat(),))
-        attacks_24h = cursor.fetchone()[0]
-        
-        conn.close()
+            # Last 24 hours stats, to minute resolution
+            yesterday = datetime.now() - timedelta(days=1)
+            cursor.execute("""
+                SELECT TOTAL(total), TOTAL(attacks) FROM rollup_minute 
+                WHERE bucket >= ?
+            """, (epoch_ms(yesterday) // 60000 * 60000,))
+            requests_24h, attacks_24h = (int(v) for v in cursor.fetchone())
         
         return {
             "total_requests": total_requests,
@@ -72,122 +180,354 @@ class DashboardData:
     
     def get_server_metrics(self):
         """Get server metrics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Get latest server metrics
-        cursor.execute("""
-            SELECT server_url, active_connections, total_requests, 
-                   failed_requests, avg_response_time, timestamp
-            FROM server_metrics 
-            ORDER BY timestamp DESC 
-            LIMIT 20
-        """)
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        server_data = cursor.fetchall()
-        
-        # Organize by server
-        servers = {}
-        for row in server_data:
-            server_url, active_conn, total_req, failed_req, avg_resp_time, timestamp = row
-            if server_url not in servers:
+            # Traffic totals per backend from the request log rollup
+            cursor.execute("""
+                SELECT server_url, SUM(total), SUM(errors),
+                       SUM(response_time_sum) / NULLIF(SUM(response_time_count), 0), MAX(bucket)
+                FROM rollup_server 
+                GROUP BY server_url
+            """)
+            servers = {}
+            for server_url, total_req, failed_req, avg_resp_time, last_bucket in cursor.fetchall():
                 servers[server_url] = {
                     "url": server_url,
-                    "active_connections": active_conn,
+                    "active_connections": 0,
                     "total_requests": total_req,
                     "failed_requests": failed_req,
-                    "avg_response_time": avg_resp_time,
-                    "last_update": timestamp
+                    "avg_response_time": round(avg_resp_time or 0, 3),
+                    "last_update": iso_timestamp(last_bucket)
                 }
         
-        conn.close()
+            # Get latest server metrics
+            cursor.execute("""
+                SELECT server_url, active_connections, total_requests, 
+                       failed_requests, avg_response_time, timestamp
+                FROM server_metrics 
+                ORDER BY timestamp DESC 
+                LIMIT 20
+            """)
+        
+            server_data = cursor.fetchall()
+        
+            # Organize by server, live snapshots override the rollup totals
+            seen = set()
+            for row in server_data:
+                server_url, active_conn, total_req, failed_req, avg_resp_time, timestamp = row
+                if server_url not in seen:
+                    seen.add(server_url)
+                    servers[server_url] = {
+                        "url": server_url,
+                        "active_connections": active_conn,
+                        "total_requests": total_req,
+                        "failed_requests": failed_req,
+                        "avg_response_time": avg_resp_time,
+                        "last_update": timestamp
+                    }
         
         return list(servers.values())
     
     def get_traffic_timeline(self, hours=24):
         """Get traffic timeline data"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        since = datetime.now() - timedelta(hours=hours)
+            since = datetime.now() - timedelta(hours=hours)
         
-        cursor.execute("""
-            SELECT 
-                datetime(timestamp) as hour,
-                COUNT(*) as total_requests,
-                SUM(CASE WHEN is_malicious = 1 THEN 1 ELSE 0 END) as attacks,
-                AVG(response_time) as avg_response_time
-            FROM requests 
-            WHERE timestamp > ?
-            GROUP BY strftime('%Y-%m-%d %H:00:00', timestamp)
-            ORDER BY hour
-        """, (since.isoformat(),))
+            cursor.execute("""
+                SELECT 
+                    bucket as hour,
+                    total as total_requests,
+                    attacks,
+                    response_time_sum / NULLIF(response_time_count, 0) as avg_response_time
+                FROM rollup_hour 
+                WHERE bucket >= ?
+                ORDER BY bucket
+            """, (epoch_ms(since) // 3600000 * 3600000,))
         
-        timeline = []
-        for row in cursor.fetchall():
-            hour, total, attacks, avg_resp_time = row
-            timeline.append({
-                "time": hour,
-                "total_requests": total,
-                "attacks": attacks,
-                "normal_requests": total - attacks,
-                "avg_response_time": round(avg_resp_time or 0, 3)
-            })
+            timeline = []
+            for row in cursor.fetchall():
+                hour, total, attacks, avg_resp_time = row
+                timeline.append({
+                    "time": iso_timestamp(hour),
+                    "total_requests": total,
+                    "attacks": attacks,
+                    "normal_requests": total - attacks,
+                    "avg_response_time": round(avg_resp_time or 0, 3)
+                })
         
-        conn.close()
         return timeline
     
     def get_attack_distribution(self):
         """Get attack type distribution"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            SELECT prediction, COUNT(*) as count
-            FROM requests 
-            WHERE is_malicious = 1
-            GROUP BY prediction
-            ORDER BY count DESC
-        """)
+            cursor.execute("""
+                SELECT prediction, SUM(attacks) as count
+                FROM rollup_prediction 
+                GROUP BY prediction
+                HAVING count > 0
+                ORDER BY count DESC
+            """)
         
-        attacks = [{"type": row[0], "count": row[1]} for row in cursor.fetchall()]
+            attacks = [{"type": row[0], "count": row[1]} for row in cursor.fetchall()]
         
-        conn.close()
         return attacks
     
     def get_recent_requests(self, limit=50):
         """Get recent requests"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        requests, _ = self.get_requests_page(limit)
+        return requests
+    
+    def get_requests_page(self, limit=50, cursor=None, filters=None):
+        """Get one page of the request log, newest first, and the cursor for the next page"""
+        where, params = request_log_query(filters or {}, cursor)
         
-        cursor.execute("""
-            SELECT timestamp, client_ip, method, path, server_url, 
-                   status_code, response_time, is_malicious, prediction, confidence
-            FROM requests 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        """, (limit,))
+        with self.connection() as conn:
+            cursor = conn.cursor()
         
-        requests = []
-        for row in cursor.fetchall():
-            timestamp, client_ip, method, path, server_url, status_code, response_time, is_malicious, prediction, confidence = row
-            requests.append({
-                "timestamp": timestamp,
-                "client_ip": client_ip,
-                "method": method,
-                "path": path,
-                "server_url": server_url,
-                "status_code": status_code,
-                "response_time": response_time,
-                "is_malicious": bool(is_malicious),
-                "prediction": prediction,
-                "confidence": confidence
-            })
+            # Keyset pagination: seek past the cursor instead of OFFSET scanning
+            cursor.execute(f"""
+                SELECT {", ".join(REQUEST_LOG_COLUMNS)}
+                FROM requests 
+                {where}
+                ORDER BY timestamp DESC, id DESC 
+                LIMIT ?
+            """, params + [limit + 1])
+            rows = cursor.fetchall()
         
-        conn.close()
-        return requests
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][1], rows[-1][0])
+        
+        return [request_log_row(row) for row in rows], next_cursor
+    
+    def iter_requests(self, filters=None, batch_size=1000, oldest_first=False):
+        """Yield every matching request row, holding one batch in memory
 
-dashboard_data = DashboardData()
+        Rows come newest first, or oldest first with oldest_first=True (the
+        export's order=asc, which the replay tool reads); ties on timestamp
+        are ordered by id in the same direction.
+        """
+        where, params = request_log_query(filters or {})
+        direction = "ASC" if oldest_first else "DESC"
+        
+        # A dedicated connection, so long exports do not starve the pool
+        conn = self.pool.open()
+        try:
+            cursor = conn.execute(f"""
+                SELECT {", ".join(REQUEST_LOG_COLUMNS)}
+                FROM requests 
+                {where}
+                ORDER BY timestamp {direction}, id {direction}
+            """, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield request_log_row(row)
+        finally:
+            conn.close()
+
+class CachedDashboardData:
+    """TTL result cache in front of DashboardData.
+    
+    Results are keyed by method and arguments (hours, limit, cursor,
+    filters), and at most max_entries are kept, least recently used evicted
+    first, since cursors and filters come from clients. Concurrent misses on
+    the same key wait for a single computation instead of each running the
+    queries; the per-key lock is dropped once its entry is stored.
+    """
+    
+    def __init__(self, data, ttls=CACHE_TTLS, max_entries=CACHE_MAX_ENTRIES):
+        self.data = data
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.key_locks = {}
+        self.lock = threading.Lock()
+        self.stats = {name: {"hits": 0, "misses": 0, "query_time": 0.0} for name in ttls}
+    
+    def get(self, method, *args):
+        key = (method, args)
+        entry = self.lookup(key)
+        if entry:
+            self.record(method, hit=True)
+            return entry[1]
+        
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            # Another thread may have filled the entry while we waited
+            entry = self.lookup(key)
+            if entry:
+                self.record(method, hit=True)
+                return entry[1]
+            
+            try:
+                start = time.perf_counter()
+                value = getattr(self.data, method)(*self.unpack(method, args))
+                elapsed = time.perf_counter() - start
+                self.store(key, (time.monotonic() + self.ttls.get(method, 0), value))
+            finally:
+                with self.lock:
+                    if self.key_locks.get(key) is key_lock:
+                        del self.key_locks[key]
+            self.record(method, hit=False, query_time=elapsed)
+            return value
+    
+    def lookup(self, key):
+        """The unexpired entry for key, marked as recently used, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+    
+    def store(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def unpack(self, method, args):
+        # Filters travel as a sorted tuple so they can be part of the cache key
+        if method == "get_requests_page":
+            limit, cursor, filters = args
+            return limit, cursor, dict(filters)
+        return args
+    
+    def record(self, method, hit, query_time=0.0):
+        with self.lock:
+            stats = self.stats.setdefault(method, {"hits": 0, "misses": 0, "query_time": 0.0})
+            if hit:
+                stats["hits"] += 1
+            else:
+                stats["misses"] += 1
+                stats["query_time"] += query_time
+    
+    def get_overview_stats(self):
+        return self.get("get_overview_stats")
+    
+    def get_server_metrics(self):
+        return self.get("get_server_metrics")
+    
+    def get_traffic_timeline(self, hours=24):
+        return self.get("get_traffic_timeline", hours)
+    
+    def get_attack_distribution(self):
+        return self.get("get_attack_distribution")
+    
+    def get_recent_requests(self, limit=50):
+        return self.get("get_recent_requests", limit)
+    
+    def get_requests_page(self, limit=50, cursor=None, filters=None):
+        filters = tuple(sorted((filters or {}).items()))
+        return self.get("get_requests_page", limit, cursor, filters)
+    
+    def iter_requests(self, filters=None, batch_size=1000, oldest_first=False):
+        """Stream matching rows newest first, or oldest first with oldest_first=True"""
+        # Exports stream straight from the database and are never cached
+        return self.data.iter_requests(filters, batch_size, oldest_first)
+    
+    def get_stats(self):
+        """Hit ratio and average query time per cached method"""
+        with self.lock:
+            report = {}
+            for method, stats in self.stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                report[method] = {
+                    "hits": stats["hits"],
+                    "misses": stats["misses"],
+                    "hit_ratio": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+                    "avg_query_ms": round(stats["query_time"] / stats["misses"] * 1000, 2) if stats["misses"] else 0.0
+                }
+            return report
+
+class DashboardBroadcaster:
+    """Computes dashboard data once per interval and pushes changes to every stream subscriber"""
+    
+    TOPICS = {
+        "overview": lambda data: data.get_overview_stats(),
+        "servers": lambda data: data.get_server_metrics(),
+        "timeline": lambda data: data.get_traffic_timeline(),
+        "attacks": lambda data: data.get_attack_distribution(),
+        "requests": lambda data: data.get_recent_requests(10)
+    }
+    
+    def __init__(self, data, interval=STREAM_INTERVAL):
+        self.data = data
+        self.interval = interval
+        self.subscribers = set()
+        self.snapshot = {}
+        self.lock = threading.Lock()
+        self.thread = None
+    
+    def subscribe(self):
+        """Register a subscriber queue, primed with the current full snapshot"""
+        subscriber = queue.Queue(maxsize=8)
+        with self.lock:
+            self.subscribers.add(subscriber)
+            if self.snapshot:
+                subscriber.put(dict(self.snapshot))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="dashboard-broadcaster", daemon=True)
+                self.thread.start()
+        return subscriber
+    
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+    
+    def compute_changes(self):
+        """Recompute every topic and return only the ones whose data changed"""
+        changes = {}
+        for topic, compute in self.TOPICS.items():
+            try:
+                value = compute(self.data)
+            except Exception as e:
+                logger.error(f"Dashboard stream error computing {topic}: {e}")
+                continue
+            if value != self.snapshot.get(topic):
+                changes[topic] = value
+        return changes
+    
+    def publish(self, changes):
+        with self.lock:
+            self.snapshot.update(changes)
+            for subscriber in self.subscribers:
+                try:
+                    subscriber.put_nowait(changes)
+                except queue.Full:
+                    # Slow client: replace its backlog with one full snapshot
+                    try:
+                        while True:
+                            subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+                    subscriber.put_nowait(dict(self.snapshot))
+    
+    def run(self):
+        while True:
+            if self.subscribers:
+                changes = self.compute_changes()
+                if changes:
+                    self.publish(changes)
+            time.sleep(self.interval)
+
+dashboard_data = CachedDashboardData(DashboardData())
+broadcaster = DashboardBroadcaster(dashboard_data)
 
 @app.route('/')
 def index():
@@ -232,7 +572,8 @@ def api_servers():
 def api_timeline():
     """API endpoint for traffic timeline"""
     try:
-        hours = int(request.args.get('hours', 24))
+        # Clamped so cache keys stay bounded
+        hours = min(max(int(request.args.get('hours', 24)), 1), 24 * 30)
         timeline = dashboard_data.get_traffic_timeline(hours)
         return jsonify(timeline)
     except Exception as e:
@@ -247,20 +588,111 @@ def api_attacks():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def request_log_filters(args):
+    """Parse request log filters from query parameters"""
+    filters = {
+        "client_ip": args.get('client_ip') or None,
+        "path": args.get('path') or None,
+        "prediction": args.get('prediction') or None,
+        "server": args.get('server') or None,
+        "status_code": int(args['status_code']) if args.get('status_code') else None
+    }
+    return {name: value for name, value in filters.items() if value is not None}
+
 @app.route('/api/requests')
 def api_requests():
-    """API endpoint for recent requests"""
+    """API endpoint for the request log, keyset-paginated and filterable
+    
+    Returns the rows as a JSON list; the cursor for the next (older) page is
+    sent in the X-Next-Cursor header and passed back as ?cursor=.
+    """
     try:
-        limit = int(request.args.get('limit', 50))
-        requests = dashboard_data.get_recent_requests(limit)
-        return jsonify(requests)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 1000)
+        filters = request_log_filters(request.args)
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except Exception:
+                return jsonify({"error": "Invalid cursor"}), 400
+        
+        requests, next_cursor = dashboard_data.get_requests_page(limit, cursor, filters)
+        response = jsonify(requests)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/requests/export')
+def api_requests_export():
+    """Stream the filtered request log as NDJSON (default) or CSV"""
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in ('ndjson', 'csv'):
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+    try:
+        filters = request_log_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # order=asc exports oldest first, the order traffic/replay_traffic.py replays in
+    rows = dashboard_data.iter_requests(filters, oldest_first=request.args.get('order') == 'asc')
+    
+    if export_format == 'ndjson':
+        body = (json.dumps(row) + "\n" for row in rows)
+        mimetype = 'application/x-ndjson'
+    else:
+        def csv_lines():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=REQUEST_LOG_COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        body = csv_lines()
+        mimetype = 'text/csv'
+    
+    filename = f"requests-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{export_format}"
+    return Response(body, mimetype=mimetype, headers={
+        "Content-Disposition": f"attachment; filename={filename}"
+    })
+
+@app.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of dashboard updates (changed topics only)"""
+    subscriber = broadcaster.subscribe()
+    
+    def events():
+        try:
+            yield f"retry: {int(STREAM_INTERVAL * 1000)}\n\n"
+            while True:
+                try:
+                    changes = subscriber.get(timeout=STREAM_KEEPALIVE)
+                    yield f"event: update\ndata: {json.dumps(changes)}\n\n"
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+    
+    return Response(events(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
 @app.route('/api/health')
 def api_health():
     """API health check"""
-    return jsonify({"status": "healthy", "timestamp": datetime.now().isoformat()})
+    return jsonify({
+        "status": "healthy",
+        "timestamp": datetime.now().isoformat(),
+        "cache": dashboard_data.get_stats(),
+        "db_pool": {"size": dashboard_data.data.pool.size, "open": dashboard_data.data.pool.created}
+    })
 
 if __name__ == '__main__':
     # Ensure templates directory exists
@@ -314,6 +314,37 @@ class PerformanceMonitor {
     }
 }
 
+// Live updates pushed by the dashboard server over Server-Sent Events
+class DashboardStream {
+    static handlers = {};
+    static source = null;
+    
+    // handlers maps a topic (overview, servers, timeline, attacks, requests) to a callback
+    static subscribe(handlers) {
+        for (const [topic, handler] of Object.entries(handlers)) {
+            (this.handlers[topic] = this.handlers[topic] || []).push(handler);
+        }
+        
+        if (!this.source) {
+            this.connect();
+        }
+    }
+    
+    static connect() {
+        // The server sends a full snapshot on (re)connect, then only changed topics
+        this.source = new EventSource('/api/stream');
+        this.source.addEventListener('update', (event) => {
+            const changes = JSON.parse(event.data);
+            for (const [topic, data] of Object.entries(changes)) {
+                (this.handlers[topic] || []).forEach(handler => handler(data));
+            }
+        });
+        this.source.onerror = () => {
+            console.warn('Dashboard stream interrupted, reconnecting...');
+        };
+    }
+}
+
 // Initialize performance monitoring
 const performanceMonitor = new PerformanceMonitor();
 
@@ -333,3 +364,4 @@ window.addEventListener('unhandledrejection', (event) => {
 window.DashboardUtils = DashboardUtils;
 window.ChartUtils = ChartUtils;
 window.PerformanceMonitor = PerformanceMonitor;
+window.DashboardStream = DashboardStream;
@@ -1,13 +1,19 @@
 import sqlite3
 import random
 import os
+import sys
 from datetime import datetime, timedelta
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'load_balancer'))
+from log_store import RequestLogStore
+
 def generate_sample_data():
     """Generate sample data for the dashboard"""
     
     # Connect to database
     db_path = os.path.join(os.path.dirname(__file__), 'logs', 'load_balancer.db')
+    store = RequestLogStore(db_path)
+    store.init_schema()
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
     
@@ -18,6 +24,7 @@ def generate_sample_data():
     
     # Generate requests
     print("Generating sample requests...")
+    rows = []
     for i in range(100):
         timestamp = datetime.now() - timedelta(minutes=random.randint(0, 1440))
         server_url = random.choice(servers)
@@ -26,26 +33,25 @@ def generate_sample_data():
         prediction = attack_type if is_malicious else 'normal'
         confidence = random.uniform(0.7, 1.0) if is_malicious else random.uniform(0.8, 1.0)
         
-        sql = "INSERT INTO requests (id, timestamp, client_ip, method, path, server_url, status_code, response_time, is_malicious, prediction, confidence) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
-        values = (
-            f'req-{i+1}',
-            timestamp.isoformat(),
-            f'192.168.1.{random.randint(1, 254)}',
-            random.choice(methods),
-            random.choice(endpoints),
-            server_url,
-            random.choice([200, 201, 400, 403, 404, 500]),
-            round(random.uniform(10, 200), 2),
-            is_malicious,
-            prediction,
-            confidence
-        )
-        cursor.execute(sql, values)
+        rows.append({
+            "timestamp": int(timestamp.timestamp() * 1000),
+            "client_ip": f'192.168.1.{random.randint(1, 254)}',
+            "method": random.choice(methods),
+            "path": random.choice(endpoints),
+            "server_url": server_url,
+            "status_code": random.choice([200, 201, 400, 403, 404, 500]),
+            "response_time": round(random.uniform(10, 200), 2),
+            "is_malicious": is_malicious,
+            "prediction": prediction,
+            "confidence": confidence
+        })
+    store.insert_many(rows)
+    store.close()
     
     # Generate server metrics
     print("Generating server metrics...")
     for server_url in servers:
-        sql = "INSERT INTO server_metrics (timestamp, server_url, active_connections, total_requests, failed_requests, avg_response_time) VALUES (?, ?, ?, ?, ?, ?, ?)"
+        sql = "INSERT INTO server_metrics (timestamp, server_url, active_connections, total_requests, failed_requests, avg_response_time) VALUES (?, ?, ?, ?, ?, ?)"
         values = (
             datetime.now().isoformat(),
             server_url,
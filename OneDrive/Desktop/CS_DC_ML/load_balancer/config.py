@@ -5,17 +5,23 @@ Load Balancer Configuration
 import os
 from typing import List, Dict
 
+def parse_backend_servers(value: str) -> List[Dict]:
+    """Backends from "host:port[:weight],..." (weight defaults to 1)"""
+    servers = []
+    for entry in filter(None, (part.strip() for part in value.split(","))):
+        host, port, *weight = entry.split(":")
+        servers.append({"host": host, "port": int(port), "weight": int(weight[0]) if weight else 1})
+    return servers
+
 class Config:
     # Load Balancer Settings
     HOST = os.getenv("LB_HOST", "0.0.0.0")
     PORT = int(os.getenv("LB_PORT", 8000))
     
     # Backend Servers
-    BACKEND_SERVERS = [
-        {"host": "localhost", "port": 8001, "weight": 1},
-        {"host": "localhost", "port": 8002, "weight": 1},
-        {"host": "localhost", "port": 8003, "weight": 1}
-    ]
+    BACKEND_SERVERS = parse_backend_servers(
+        os.getenv("BACKEND_SERVERS", "localhost:8001:1,localhost:8002:1,localhost:8003:1")
+    )
     
     # Load Balancing Algorithm
     ALGORITHM = os.getenv("LB_ALGORITHM", "least_connections")  # "round_robin", "least_connections", "weighted_round_robin"
@@ -38,10 +44,20 @@ class Config:
     SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH", os.path.join(os.path.dirname(__file__), "..", "logs", "load_balancer.db"))
     MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
     MONGODB_DB_NAME = os.getenv("MONGODB_DB_NAME", "load_balancer")
+    LOG_PARTITIONING = os.getenv("LOG_PARTITIONING", "false").lower() == "true"  # daily requests_YYYYMMDD tables
+    LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", 0))  # 0 keeps every request
     
     # AI Model Settings
     MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(__file__), "..", "models"))
     MODEL_CONFIDENCE_THRESHOLD = float(os.getenv("MODEL_CONFIDENCE_THRESHOLD", 0.7))
+    MODEL_WARMUP_ROWS = int(os.getenv("MODEL_WARMUP_ROWS", 64))  # synthetic rows scored before reporting ready
+    MODEL_RELOAD_INTERVAL = int(os.getenv("MODEL_RELOAD_INTERVAL", 10))  # seconds between checks for a new bundle, 0 disables
+    MODEL_SHADOW_FRACTION = float(os.getenv("MODEL_SHADOW_FRACTION", 0.0))  # share of traffic a new bundle shadows before promotion, 0 swaps at once
+    MODEL_SHADOW_MIN_SAMPLES = int(os.getenv("MODEL_SHADOW_MIN_SAMPLES", 500))
+    MODEL_SHADOW_MIN_AGREEMENT = float(os.getenv("MODEL_SHADOW_MIN_AGREEMENT", 0.95))
+    
+    # Admin API (/_admin/*), disabled unless a token is set; send it as "Authorization: Bearer <token>"
+    ADMIN_TOKEN = os.getenv("LB_ADMIN_TOKEN", "")
     
     # Request Settings
     REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", 30))  # seconds
@@ -2,7 +2,7 @@
 Secure Load Balancer with AI-based Attack Detection
 """
 
-from fastapi import FastAPI, Request, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Request, HTTPException, BackgroundTasks, Depends, Header
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
@@ -11,16 +11,15 @@ import time
 import logging
 from typing import Dict, List, Optional
 import json
-import sqlite3
-from datetime import datetime
-import uuid
+import secrets
 
 from config import Config
 from traffic_analyzer import TrafficFeatureExtractor
+from log_store import RequestLogStore, now_ms
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from ai_model.model_utils import predict_traffic_features
+from ai_model.model_registry import ModelRegistry
 
 app = FastAPI(title="AI-Powered Secure Load Balancer")
 
@@ -66,42 +65,44 @@ class LoadBalancer:
         self.current_index = 0
         self.feature_extractor = TrafficFeatureExtractor()
         self.init_database()
+        self.started_at = time.time()
+        self.model_state = "loading" if Config.ENABLE_AI_SECURITY else "disabled"
+        self.model_registry = ModelRegistry(
+            Config.MODEL_DIR,
+            poll_interval=Config.MODEL_RELOAD_INTERVAL,
+            warm_up_rows=Config.MODEL_WARMUP_ROWS,
+            shadow_fraction=Config.MODEL_SHADOW_FRACTION,
+            min_samples=Config.MODEL_SHADOW_MIN_SAMPLES,
+            min_agreement=Config.MODEL_SHADOW_MIN_AGREEMENT
+        )
+        
+    @property
+    def ready(self) -> bool:
+        """Ready to take traffic: the model is loaded and warm, or not needed"""
+        return not Config.ENABLE_AI_SECURITY or self.model_registry.ready
+    
+    async def warm_up_model(self):
+        """Load the model and run a warm-up batch off the event loop, then watch for new bundles"""
+        start = time.time()
+        ok = await asyncio.to_thread(self.model_registry.load_initial)
+        self.model_state = "ready" if ok else "failed"
+        if ok:
+            logger.info(f"AI model ready in {time.time() - start:.2f}s: {self.model_registry.active.warmup_stats}")
+        else:
+            logger.error("AI model failed to load; requests will be allowed unscored")
         
+        # Keep watching even after a failed load, so a bundle copied in later is picked up
+        if Config.MODEL_RELOAD_INTERVAL > 0:
+            self.model_registry.start()
+    
     def init_database(self):
         """Initialize SQLite database for logging"""
-        conn = sqlite3.connect(Config.SQLITE_DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS requests (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT,
-                client_ip TEXT,
-                method TEXT,
-                path TEXT,
-                server_url TEXT,
-                status_code INTEGER,
-                response_time REAL,
-                is_malicious BOOLEAN,
-                prediction TEXT,
-                confidence REAL
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS server_metrics (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                server_url TEXT,
-                active_connections INTEGER,
-                total_requests INTEGER,
-                failed_requests INTEGER,
-                avg_response_time REAL
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        self.log_store = RequestLogStore(
+            Config.SQLITE_DB_PATH,
+            partitioned=Config.LOG_PARTITIONING,
+            retention_days=Config.LOG_RETENTION_DAYS
+        )
+        self.log_store.init_schema()
     
     def get_next_server(self) -> Optional[BackendServer]:
         """Select next server based on algorithm"""
@@ -148,7 +149,7 @@ class LoadBalancer:
             features = self.feature_extractor.extract_features(request_data)
             
             # Make prediction
-            prediction = predict_traffic_features(features)
+            prediction = self.model_registry.predict(features)
             
             if prediction:
                 return prediction
@@ -164,30 +165,18 @@ class LoadBalancer:
                    response_data: Dict, security_result: Dict):
         """Log request to database"""
         try:
-            conn = sqlite3.connect(Config.SQLITE_DB_PATH)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO requests 
-                (id, timestamp, client_ip, method, path, server_url, status_code, 
-                 response_time, is_malicious, prediction, confidence)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                str(uuid.uuid4()),
-                datetime.now().isoformat(),
-                request_data.get("client_ip"),
-                request_data.get("method"),
-                request_data.get("path"),
-                server.url,
-                response_data.get("status_code"),
-                response_data.get("response_time"),
-                security_result.get("is_malicious"),
-                security_result.get("prediction"),
-                security_result.get("confidence")
-            ))
-            
-            conn.commit()
-            conn.close()
+            self.log_store.insert({
+                "timestamp": now_ms(),
+                "client_ip": request_data.get("client_ip"),
+                "method": request_data.get("method"),
+                "path": request_data.get("path"),
+                "server_url": server.url,
+                "status_code": response_data.get("status_code"),
+                "response_time": response_data.get("response_time"),
+                "is_malicious": security_result.get("is_malicious"),
+                "prediction": security_result.get("prediction"),
+                "confidence": security_result.get("confidence")
+            })
             
         except Exception as e:
             logger.error(f"Logging error: {e}")
@@ -214,6 +203,8 @@ load_balancer = LoadBalancer()
 async def startup_event():
     """Start background tasks"""
     asyncio.create_task(load_balancer.health_check_servers())
+    if Config.ENABLE_AI_SECURITY:
+        asyncio.create_task(load_balancer.warm_up_model())
     logger.info("Secure Load Balancer started")
 
 @app.get("/")
@@ -222,7 +213,54 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy", "servers": len(load_balancer.servers)}
+    """Liveness: the process is up and serving, whether or not it is ready"""
+    return {
+        "status": "healthy",
+        "ready": load_balancer.ready,
+        "servers": len(load_balancer.servers),
+        "uptime": round(time.time() - load_balancer.started_at, 1)
+    }
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 200 once the AI model is loaded and warmed up, 503 until then"""
+    registry = load_balancer.model_registry
+    body = {
+        "ready": load_balancer.ready,
+        "model": "ready" if registry.ready else load_balancer.model_state,
+        "healthy_servers": sum(1 for s in load_balancer.servers if s.healthy)
+    }
+    if registry.ready:
+        body["model_version"] = registry.version_of(registry.active)
+        body["warmup"] = registry.active.warmup_stats
+    return JSONResponse(status_code=200 if body["ready"] else 503, content=body)
+
+def require_admin(authorization: Optional[str] = Header(None)):
+    """Admin endpoints need LB_ADMIN_TOKEN as a bearer token, and are off when it is unset"""
+    if not Config.ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API disabled (set LB_ADMIN_TOKEN)")
+    if not secrets.compare_digest(authorization or "", f"Bearer {Config.ADMIN_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+# Admin routes live under /_admin so they never shadow backend paths
+@app.get("/_admin/model", dependencies=[Depends(require_admin)])
+async def model_status():
+    """Active model version, any candidate under shadow evaluation, and recent swaps"""
+    return load_balancer.model_registry.status()
+
+@app.post("/_admin/model/promote", dependencies=[Depends(require_admin)])
+async def promote_model():
+    """Promote the shadowed candidate now instead of waiting for enough samples"""
+    if not load_balancer.model_registry.promote():
+        raise HTTPException(status_code=409, detail="No candidate model to promote")
+    return load_balancer.model_registry.status()
+
+@app.post("/_admin/model/reject", dependencies=[Depends(require_admin)])
+async def reject_model():
+    """Drop the shadowed candidate and keep the active model"""
+    if not load_balancer.model_registry.reject():
+        raise HTTPException(status_code=409, detail="No candidate model to reject")
+    return load_balancer.model_registry.status()
 
 @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def proxy_request(request: Request, path: str, background_tasks: BackgroundTasks):
@@ -0,0 +1,480 @@
+"""
+Request Log Storage
+SQLite schema, migrations and daily partitioning for the request log
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 3
+MINUTE_MS = 60000
+HOUR_MS = 3600000
+DAY_MS = 86400000
+MINUTE_ROLLUP_DAYS = 2  # minute buckets only back the short recent windows
+
+REQUEST_COLUMNS = [
+    'timestamp', 'client_ip', 'method', 'path', 'server_url', 'status_code',
+    'response_time', 'is_malicious', 'prediction', 'confidence'
+]
+
+REQUESTS_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY,
+        timestamp INTEGER NOT NULL,
+        client_ip TEXT,
+        method TEXT,
+        path TEXT,
+        server_url TEXT,
+        status_code INTEGER,
+        response_time REAL,
+        is_malicious INTEGER,
+        prediction TEXT,
+        confidence REAL
+    )
+'''
+
+# Covering indexes for the dashboard queries: recent-window counts and the
+# timeline read (timestamp, is_malicious, response_time), blocked counts and
+# the attack distribution read (is_malicious, prediction). The log browser
+# pages by (timestamp, id): id is the rowid, which every index ends with, so
+# (timestamp) and the equality-filter (column, timestamp) indexes return rows
+# in page order with no sort.
+REQUESTS_INDEX_SQL = [
+    'CREATE INDEX IF NOT EXISTS {table}_recent ON {table} (timestamp)',
+    'CREATE INDEX IF NOT EXISTS {table}_timestamp ON {table} (timestamp, is_malicious, response_time)',
+    'CREATE INDEX IF NOT EXISTS {table}_attacks ON {table} (is_malicious, prediction, timestamp)',
+    'CREATE INDEX IF NOT EXISTS {table}_client_ip ON {table} (client_ip, timestamp)',
+    'CREATE INDEX IF NOT EXISTS {table}_path ON {table} (path, timestamp)',
+    'CREATE INDEX IF NOT EXISTS {table}_prediction ON {table} (prediction, timestamp)',
+    'CREATE INDEX IF NOT EXISTS {table}_status ON {table} (status_code, timestamp)',
+    'CREATE INDEX IF NOT EXISTS {table}_server ON {table} (server_url, timestamp)',
+]
+
+# Pre-aggregated counters kept in step with the request log by the writer,
+# so dashboard overview, timeline and attack queries scan buckets, not rows
+ROLLUP_TABLES_SQL = [
+    '''
+    CREATE TABLE IF NOT EXISTS rollup_minute (
+        bucket INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL,
+        attacks INTEGER NOT NULL,
+        response_time_sum REAL NOT NULL,
+        response_time_count INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS rollup_hour (
+        bucket INTEGER PRIMARY KEY,
+        total INTEGER NOT NULL,
+        attacks INTEGER NOT NULL,
+        response_time_sum REAL NOT NULL,
+        response_time_count INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS rollup_prediction (
+        bucket INTEGER NOT NULL,
+        prediction TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        attacks INTEGER NOT NULL,
+        PRIMARY KEY (bucket, prediction)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS rollup_server (
+        bucket INTEGER NOT NULL,
+        server_url TEXT NOT NULL,
+        total INTEGER NOT NULL,
+        attacks INTEGER NOT NULL,
+        errors INTEGER NOT NULL,
+        response_time_sum REAL NOT NULL,
+        response_time_count INTEGER NOT NULL,
+        PRIMARY KEY (bucket, server_url)
+    )
+    ''',
+]
+
+ROLLUP_UPSERT_SQL = {
+    'rollup_minute': '''
+        INSERT INTO rollup_minute VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (bucket) DO UPDATE SET
+            total = total + excluded.total,
+            attacks = attacks + excluded.attacks,
+            response_time_sum = response_time_sum + excluded.response_time_sum,
+            response_time_count = response_time_count + excluded.response_time_count
+    ''',
+    'rollup_hour': '''
+        INSERT INTO rollup_hour VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (bucket) DO UPDATE SET
+            total = total + excluded.total,
+            attacks = attacks + excluded.attacks,
+            response_time_sum = response_time_sum + excluded.response_time_sum,
+            response_time_count = response_time_count + excluded.response_time_count
+    ''',
+    'rollup_prediction': '''
+        INSERT INTO rollup_prediction VALUES (?, ?, ?, ?)
+        ON CONFLICT (bucket, prediction) DO UPDATE SET
+            total = total + excluded.total,
+            attacks = attacks + excluded.attacks
+    ''',
+    'rollup_server': '''
+        INSERT INTO rollup_server VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (bucket, server_url) DO UPDATE SET
+            total = total + excluded.total,
+            attacks = attacks + excluded.attacks,
+            errors = errors + excluded.errors,
+            response_time_sum = response_time_sum + excluded.response_time_sum,
+            response_time_count = response_time_count + excluded.response_time_count
+    ''',
+}
+
+# Full rebuild from the request log, used when the rollups are first created
+ROLLUP_REBUILD_SQL = {
+    'rollup_minute': '''
+        INSERT INTO rollup_minute
+        SELECT timestamp / 60000 * 60000, COUNT(*), SUM(is_malicious),
+               TOTAL(response_time), COUNT(response_time)
+        FROM requests WHERE timestamp >= ? GROUP BY 1
+    ''',
+    'rollup_hour': '''
+        INSERT INTO rollup_hour
+        SELECT timestamp / 3600000 * 3600000, COUNT(*), SUM(is_malicious),
+               TOTAL(response_time), COUNT(response_time)
+        FROM requests GROUP BY 1
+    ''',
+    'rollup_prediction': '''
+        INSERT INTO rollup_prediction
+        SELECT timestamp / 3600000 * 3600000, COALESCE(prediction, 'unknown'), COUNT(*), SUM(is_malicious)
+        FROM requests GROUP BY 1, 2
+    ''',
+    'rollup_server': '''
+        INSERT INTO rollup_server
+        SELECT timestamp / 3600000 * 3600000, COALESCE(server_url, 'unknown'), COUNT(*), SUM(is_malicious),
+               SUM(CASE WHEN status_code >= 500 THEN 1 ELSE 0 END),
+               TOTAL(response_time), COUNT(response_time)
+        FROM requests GROUP BY 1, 2
+    ''',
+}
+
+SERVER_METRICS_SQL = '''
+    CREATE TABLE IF NOT EXISTS server_metrics (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        server_url TEXT,
+        active_connections INTEGER,
+        total_requests INTEGER,
+        failed_requests INTEGER,
+        avg_response_time REAL
+    )
+'''
+
+def now_ms() -> int:
+    """Current time as integer epoch milliseconds"""
+    return int(time.time() * 1000)
+
+def partition_name(timestamp_ms: int) -> str:
+    """Name of the daily partition table holding a timestamp (UTC day)"""
+    return time.strftime('requests_%Y%m%d', time.gmtime(timestamp_ms / 1000))
+
+class RequestLogStore:
+    """Writer for the request log.
+
+    Rows are keyed by an INTEGER rowid and stamped with epoch milliseconds.
+    Every insert also bumps the ``rollup_*`` counters in the same transaction.
+    With partitioning enabled every UTC day gets its own ``requests_YYYYMMDD``
+    table and ``requests`` becomes a UNION ALL view over them, so retention
+    is a ``DROP TABLE`` instead of a large ``DELETE``.
+    """
+
+    def __init__(self, db_path: str, partitioned: bool = False, retention_days: int = 0):
+        self.db_path = db_path
+        self.partitioned = partitioned
+        self.retention_days = retention_days
+        self.lock = threading.Lock()
+        self.conn = None
+        self.current_partition = None
+        self.next_id = 1
+        self.maintained_hour = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for a single concurrent writer"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def init_schema(self):
+        """Create or migrate the schema and apply retention"""
+        with self.lock:
+            if self.conn is None:
+                self.conn = self.connect()
+            conn = self.conn
+
+            with conn:
+                # sqlite3 only opens a transaction before DML, so begin one explicitly:
+                # the renames, CREATEs and copies below must commit or roll back together
+                conn.execute('BEGIN')
+                version = conn.execute('PRAGMA user_version').fetchone()[0]
+                conn.execute(SERVER_METRICS_SQL)
+                self._migrate_v1(conn)
+
+                kind = self._object_type(conn, 'requests')
+                if self.partitioned:
+                    if kind == 'table':
+                        self._split_into_partitions(conn)
+                    for table in self.list_partitions(conn):
+                        self._create_requests_table(conn, table)
+                    self._ensure_partition(conn, partition_name(now_ms()))
+                else:
+                    if kind == 'view':
+                        self._merge_partitions(conn)
+                    self._create_requests_table(conn, 'requests')
+
+                for sql in ROLLUP_TABLES_SQL:
+                    conn.execute(sql)
+                if version < 3:
+                    self._rebuild_rollups(conn)
+
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+            self._maintain(conn)
+
+    def rebuild_rollups(self):
+        """Recompute every rollup table from the request log"""
+        with self.lock:
+            with self.conn:
+                self._rebuild_rollups(self.conn)
+
+    def insert(self, row: Dict):
+        """Append one request row"""
+        self.insert_many([row])
+
+    def insert_many(self, rows: List[Dict]):
+        """Append request rows in a single transaction"""
+        if not rows:
+            return
+
+        with self.lock:
+            conn = self.conn
+            with conn:
+                # Stamp rows here rather than in the caller's dicts
+                timestamps = [row.get('timestamp') or now_ms() for row in rows]
+                for row, timestamp in zip(rows, timestamps):
+                    table = 'requests'
+                    row_id = None
+                    if self.partitioned:
+                        table = partition_name(timestamp)
+                        if table != self.current_partition:
+                            self._ensure_partition(conn, table)
+                        # Partitions share one id space so ids stay unique in the view
+                        row_id = self.next_id
+                        self.next_id += 1
+
+                    conn.execute(f'''
+                        INSERT INTO {table}
+                        (id, timestamp, client_ip, method, path, server_url, status_code,
+                         response_time, is_malicious, prediction, confidence)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (
+                        row_id,
+                        timestamp,
+                        row.get('client_ip'),
+                        row.get('method'),
+                        row.get('path'),
+                        row.get('server_url'),
+                        row.get('status_code'),
+                        row.get('response_time'),
+                        1 if row.get('is_malicious') else 0,
+                        row.get('prediction'),
+                        row.get('confidence')
+                    ))
+
+                self._update_rollups(conn, rows, timestamps)
+
+            if now_ms() // HOUR_MS != self.maintained_hour:
+                self._maintain(conn)
+
+    def enforce_retention(self):
+        """Drop or delete request rows older than the retention window"""
+        with self.lock:
+            self._maintain(self.conn)
+
+    def list_partitions(self, conn: Optional[sqlite3.Connection] = None) -> List[str]:
+        """Daily partition tables, oldest first"""
+        conn = conn or self.conn
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'requests_[0-9]*' ORDER BY name"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def close(self):
+        """Close the writer connection"""
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+    def _object_type(self, conn: sqlite3.Connection, name: str) -> Optional[str]:
+        row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _create_requests_table(self, conn: sqlite3.Connection, table: str):
+        conn.execute(REQUESTS_TABLE_SQL.format(table=table))
+        for sql in REQUESTS_INDEX_SQL:
+            conn.execute(sql.format(table=table))
+
+    def _migrate_v1(self, conn: sqlite3.Connection):
+        """Convert the original UUID/ISO-timestamp table in place"""
+        if self._object_type(conn, 'requests_v1') == 'table':
+            # Left behind by an interrupted migration from before it ran in one transaction
+            if self._object_type(conn, 'requests') == 'table' and conn.execute(
+                    'SELECT 1 FROM requests LIMIT 1').fetchone() is None:
+                logger.info("Resuming interrupted request log migration")
+                conn.execute('DROP TABLE requests')
+            else:
+                logger.warning("requests_v1 exists next to a non-empty request log; leaving it in place")
+                return
+        else:
+            if self._object_type(conn, 'requests') != 'table':
+                return
+
+            columns = {row[1]: row[2] for row in conn.execute('PRAGMA table_info(requests)')}
+            if columns.get('id', '').upper() != 'TEXT':
+                return
+
+            logger.info("Migrating request log to integer keys and epoch-ms timestamps")
+            conn.execute('ALTER TABLE requests RENAME TO requests_v1')
+        self._create_requests_table(conn, 'requests')
+        # v1 rows were stamped with naive local-time ISO strings
+        conn.execute('''
+            INSERT INTO requests
+            (timestamp, client_ip, method, path, server_url, status_code,
+             response_time, is_malicious, prediction, confidence)
+            SELECT CAST(ROUND((julianday(timestamp, 'utc') - 2440587.5) * 86400000) AS INTEGER),
+                   client_ip, method, path, server_url, status_code,
+                   response_time, CASE WHEN is_malicious THEN 1 ELSE 0 END, prediction, confidence
+            FROM requests_v1
+            WHERE timestamp IS NOT NULL
+            ORDER BY timestamp
+        ''')
+        conn.execute('DROP TABLE requests_v1')
+
+    def _split_into_partitions(self, conn: sqlite3.Connection):
+        """Move an unpartitioned requests table into daily partitions"""
+        days = [row[0] for row in conn.execute('SELECT DISTINCT timestamp / ? FROM requests', (DAY_MS,))]
+        for day in days:
+            table = partition_name(day * DAY_MS)
+            self._create_requests_table(conn, table)
+            conn.execute(
+                f'INSERT INTO {table} SELECT * FROM requests WHERE timestamp >= ? AND timestamp < ?',
+                (day * DAY_MS, (day + 1) * DAY_MS)
+            )
+        conn.execute('DROP TABLE requests')
+        self._rebuild_view(conn)
+
+    def _merge_partitions(self, conn: sqlite3.Connection):
+        """Fold daily partitions back into a single requests table"""
+        partitions = self.list_partitions(conn)
+        conn.execute('DROP VIEW requests')
+        self._create_requests_table(conn, 'requests')
+        for table in partitions:
+            conn.execute(f'INSERT INTO requests SELECT * FROM {table}')
+            conn.execute(f'DROP TABLE {table}')
+
+    def _ensure_partition(self, conn: sqlite3.Connection, table: str):
+        if self._object_type(conn, table) is None:
+            self._create_requests_table(conn, table)
+            self._rebuild_view(conn)
+        self.current_partition = table
+        self._refresh_next_id(conn)
+
+    def _refresh_next_id(self, conn: sqlite3.Connection):
+        partitions = self.list_partitions(conn)
+        if not partitions:
+            return
+        max_id = conn.execute(
+            'SELECT MAX(id) FROM (' + ' UNION ALL '.join(f'SELECT MAX(id) AS id FROM {t}' for t in partitions) + ')'
+        ).fetchone()[0]
+        self.next_id = max(self.next_id, (max_id or 0) + 1)
+
+    def _update_rollups(self, conn: sqlite3.Connection, rows: List[Dict], timestamps: List[int]):
+        """Fold a batch into per-bucket deltas and upsert each once"""
+        deltas = {name: {} for name in ROLLUP_UPSERT_SQL}
+
+        for row, timestamp in zip(rows, timestamps):
+            minute = timestamp // MINUTE_MS * MINUTE_MS
+            hour = timestamp // HOUR_MS * HOUR_MS
+            attack = 1 if row.get('is_malicious') else 0
+            error = 1 if (row.get('status_code') or 0) >= 500 else 0
+            response_time = row.get('response_time')
+            rt_sum, rt_count = (response_time, 1) if response_time is not None else (0.0, 0)
+
+            for name, key, values in (
+                ('rollup_minute', (minute,), [1, attack, rt_sum, rt_count]),
+                ('rollup_hour', (hour,), [1, attack, rt_sum, rt_count]),
+                ('rollup_prediction', (hour, row.get('prediction') or 'unknown'), [1, attack]),
+                ('rollup_server', (hour, row.get('server_url') or 'unknown'), [1, attack, error, rt_sum, rt_count]),
+            ):
+                current = deltas[name].get(key)
+                if current is None:
+                    deltas[name][key] = values
+                else:
+                    for i, value in enumerate(values):
+                        current[i] += value
+
+        for name, buckets in deltas.items():
+            conn.executemany(
+                ROLLUP_UPSERT_SQL[name],
+                [key + tuple(values) for key, values in buckets.items()]
+            )
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        if self._object_type(conn, 'requests') is None:
+            return
+        for name, sql in ROLLUP_REBUILD_SQL.items():
+            conn.execute(f'DELETE FROM {name}')
+            if name == 'rollup_minute':
+                conn.execute(sql, (now_ms() - MINUTE_ROLLUP_DAYS * DAY_MS,))
+            else:
+                conn.execute(sql)
+
+    def _maintain(self, conn: sqlite3.Connection):
+        """Hourly housekeeping: expire minute rollups and old request rows"""
+        self.maintained_hour = now_ms() // HOUR_MS
+        with conn:
+            conn.execute('DELETE FROM rollup_minute WHERE bucket < ?', (now_ms() - MINUTE_ROLLUP_DAYS * DAY_MS,))
+        self._enforce_retention(conn)
+
+    def _rebuild_view(self, conn: sqlite3.Connection):
+        partitions = self.list_partitions(conn)
+        conn.execute('DROP VIEW IF EXISTS requests')
+        if partitions:
+            union = ' UNION ALL '.join(f'SELECT * FROM {table}' for table in partitions)
+            conn.execute(f'CREATE VIEW requests AS {union}')
+
+    def _enforce_retention(self, conn: sqlite3.Connection):
+        if self.retention_days <= 0:
+            return
+
+        cutoff = now_ms() - self.retention_days * DAY_MS
+        with conn:
+            if self.partitioned:
+                oldest_kept = partition_name(cutoff)
+                expired = [t for t in self.list_partitions(conn) if t < oldest_kept]
+                for table in expired:
+                    conn.execute(f'DROP TABLE {table}')
+                if expired:
+                    logger.info(f"Dropped {len(expired)} expired request log partitions")
+                    self._rebuild_view(conn)
+                rollup_cutoff = cutoff // DAY_MS * DAY_MS
+            else:
+                conn.execute('DELETE FROM requests WHERE timestamp < ?', (cutoff,))
+                rollup_cutoff = cutoff // HOUR_MS * HOUR_MS
+
+            for table in ('rollup_hour', 'rollup_prediction', 'rollup_server'):
+                conn.execute(f'DELETE FROM {table} WHERE bucket < ?', (rollup_cutoff,))
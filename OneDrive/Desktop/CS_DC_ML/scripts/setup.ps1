@@ -56,9 +56,7 @@ $serversScript = @'
 echo 🚀 Starting Backend Servers...
 cd servers
 
-start "Server 1" python server1.py
-start "Server 2" python server2.py
-start "Server 3" python server3.py
+start "Servers" python backend.py --profile server-1 server-2 server-3
 
 echo ✅ Servers started!
 echo Press any key to stop all servers...
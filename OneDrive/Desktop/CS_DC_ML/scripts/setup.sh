@@ -52,23 +52,15 @@ echo "🚀 Starting Backend Servers..."
 cd servers
 
 # Start servers in background
-python3 server1.py &
-SERVER1_PID=$!
-
-python3 server2.py &
-SERVER2_PID=$!
-
-python3 server3.py &
-SERVER3_PID=$!
+python3 backend.py --profile server-1 server-2 server-3 &
+SERVERS_PID=$!
 
 echo "✅ Servers started!"
-echo "Server 1 PID: $SERVER1_PID"
-echo "Server 2 PID: $SERVER2_PID"
-echo "Server 3 PID: $SERVER3_PID"
+echo "Servers PID: $SERVERS_PID"
 
 # Wait for user input to stop
 echo "Press Ctrl+C to stop all servers..."
-trap "kill $SERVER1_PID $SERVER2_PID $SERVER3_PID; exit" INT
+trap "kill $SERVERS_PID; exit" INT
 wait
 EOF
 
@@ -0,0 +1,431 @@
+"""
+Backend Server - aiohttp Application
+One backend implementation for every server, driven by a profile from
+config/backends (routes, dataset, latency distribution, port). Simulated latency
+is a non-blocking sleep, with an optional error rate and padded payloads, so one
+process holds tens of thousands of concurrent requests. A single command serves
+any number of instances on consecutive ports, optionally with several worker
+processes sharing each port
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import yaml
+from aiohttp import web
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ('zero', 'fixed', 'uniform', 'lognormal', 'bimodal')
+PROFILES_DIR = os.getenv("BACKEND_PROFILES_DIR",
+                         os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config", "backends"))
+
+# Serving settings (the command-line flags default to these)
+PROFILES = os.getenv("SERVER_PROFILE", "stub").split()  # profiles to serve, space-separated
+PORT = int(os.getenv("SERVER_PORT", 0))  # first port, 0 for each profile's own port
+INSTANCES = int(os.getenv("SERVER_INSTANCES", 1))  # instances per profile, on consecutive ports
+WORKERS = int(os.getenv("SERVER_WORKERS", 1))  # processes sharing each port, 0 for one per CPU
+MAX_CONCURRENCY = int(os.getenv("SERVER_MAX_CONCURRENCY", 0))  # in-flight requests per worker before queueing, 0 for no limit
+BACKLOG = int(os.getenv("SERVER_BACKLOG", 4096))  # listen backlog per port
+
+# API routes by their profile name ("METHOD /path"): handler, and the dataset key it serves
+ROUTES = {
+    "GET /api/users": ("users", "users"),
+    "GET /api/users/{user_id}": ("user", "users"),
+    "GET /api/products": ("products", "products"),
+    "GET /api/orders": ("orders", "orders"),
+    "POST /api/orders": ("create_order", "new_order_ids"),
+    "GET /api/search": ("search", "search_results"),
+    "GET /api/dashboard": ("dashboard", "dashboard"),
+    "GET /api/analytics": ("analytics", "analytics"),
+    "GET /api/reports": ("reports", "reports"),
+    "GET /api/notifications": ("notifications", "notifications"),
+    "GET /api/settings": ("settings", "settings"),
+    "GET /api/logs": ("logs", "logs"),
+    "POST /api/upload": ("upload", None)
+}
+
+def latency_sampler(spec):
+    """Simulated service time in seconds per request
+
+    spec is {distribution: zero}, fixed {ms}, uniform {min_ms, max_ms},
+    lognormal {median_ms, sigma} or bimodal: lognormal around median_ms, with
+    a tail_ratio share of requests around tail_ms instead.
+    """
+    distribution = spec.get('distribution', 'zero')
+    if distribution == 'zero':
+        return lambda: 0.0
+    if distribution == 'fixed':
+        return lambda: spec['ms'] / 1000
+    if distribution == 'uniform':
+        return lambda: random.uniform(spec['min_ms'], spec['max_ms']) / 1000
+    sigma = spec.get('sigma', 0.5)
+    if distribution == 'lognormal':
+        mu = math.log(spec['median_ms'])
+        return lambda: random.lognormvariate(mu, sigma) / 1000
+    if distribution == 'bimodal':
+        fast, slow, ratio = math.log(spec['median_ms']), math.log(spec['tail_ms']), spec['tail_ratio']
+        return lambda: random.lognormvariate(slow if random.random() < ratio else fast, sigma) / 1000
+    raise ValueError(f"Unknown latency distribution {distribution}")
+
+def load_profile(name):
+    """A backend profile by name (config/backends/<name>.yaml) or path"""
+    path = name if os.path.exists(name) else os.path.join(PROFILES_DIR, f"{name}.yaml")
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+def served_routes(dataset, routes=None):
+    """The API routes to serve: those listed, or every route whose dataset key is present"""
+    if routes is None:
+        return [route for route, (_, key) in ROUTES.items() if key is None or key in dataset]
+    for route in routes:
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route {route}")
+        key = ROUTES[route][1]
+        if key is not None and key not in dataset:
+            raise ValueError(f"Route {route} needs '{key}' in the dataset")
+    return routes
+
+class Backend:
+    """One backend server: its routes over a dataset, with simulated latency and errors"""
+
+    def __init__(self, server_id, port, dataset, routes=None, latency=None, route_latency=None, error_rate=0.0,
+                 payload_bytes=0, max_concurrency=0):
+        self.server_id = server_id
+        self.port = port
+        self.dataset = dataset
+        self.routes = served_routes(dataset, routes)
+        self.latency = latency_sampler(latency or {'distribution': 'zero'})
+        # "METHOD /path" (as routed, e.g. "GET /api/users/{user_id}") -> sampler
+        self.route_latency = {route: latency_sampler(spec) for route, spec in (route_latency or {}).items()}
+        self.error_rate = error_rate
+        self.padding = 'x' * payload_bytes if payload_bytes else None
+        self.max_concurrency = max_concurrency
+        self.slots = None
+        self.users_by_id = {user['id']: user for user in dataset.get('users', [])}
+
+    def respond(self, body, status=200, pad=True):
+        """Compact JSON, optionally padded to the configured payload size"""
+        if pad and self.padding:
+            body = {**body, 'padding': self.padding}
+        return web.Response(text=json.dumps(body, separators=(',', ':')), status=status,
+                            content_type='application/json')
+
+    @web.middleware
+    async def limit(self, request, handler):
+        """Queue requests beyond max_concurrency in flight, like a fixed pool of request workers"""
+        if self.slots is None:
+            return await handler(request)
+        async with self.slots:
+            return await handler(request)
+
+    @web.middleware
+    async def simulate(self, request, handler):
+        """API routes wait out their latency without blocking the loop, then fail at error_rate"""
+        if request.path.startswith('/api/') and request.match_info.http_exception is None:
+            route = f"{request.method} {request.match_info.route.resource.canonical}"
+            delay = self.route_latency.get(route, self.latency)()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.error_rate and random.random() < self.error_rate:
+                return self.respond({"error": "Internal server error", "server_id": self.server_id}, 500, pad=False)
+        try:
+            return await handler(request)
+        except web.HTTPNotFound:
+            return self.respond({"error": "Endpoint not found", "server_id": self.server_id}, 404, pad=False)
+
+    async def index(self, request):
+        return self.respond({
+            "message": f"Hello from Backend Server {self.server_id}",
+            "server_id": self.server_id,
+            "port": self.port,
+            "timestamp": time.time()
+        })
+
+    async def health(self, request):
+        return self.respond({"status": "healthy", "server_id": self.server_id, "port": self.port}, pad=False)
+
+    async def users(self, request):
+        users = self.dataset['users']
+        return self.respond({"server_id": self.server_id, "users": users, "total": len(users)})
+
+    async def user(self, request):
+        user = self.users_by_id.get(int(request.match_info['user_id']))
+        if user is None:
+            return self.respond({"error": "User not found"}, 404, pad=False)
+        return self.respond({"server_id": self.server_id, "user": user})
+
+    async def products(self, request):
+        products = self.dataset['products']
+        return self.respond({"server_id": self.server_id, "products": products, "total": len(products)})
+
+    async def orders(self, request):
+        orders = self.dataset['orders']
+        return self.respond({"server_id": self.server_id, "orders": orders, "total": len(orders)})
+
+    async def create_order(self, request):
+        try:
+            order_data = await request.json()
+        except ValueError:
+            order_data = {}
+        new_order = {
+            "id": random.randint(*self.dataset['new_order_ids']),
+            "user_id": order_data.get("user_id", 1),
+            "total": order_data.get("total", 0.0),
+            "status": "created",
+            "server_id": self.server_id
+        }
+        return self.respond({"message": "Order created successfully", "order": new_order}, 201)
+
+    async def search(self, request):
+        query = request.query.get('q', '')
+        category = request.query.get('category', '')
+        results = []
+        if query:
+            results = [
+                {"id": r["id"], "title": r["title"].format(query=query, server_id=self.server_id),
+                 "category": category or "general"}
+                for r in self.dataset['search_results']
+            ]
+        return self.respond({"server_id": self.server_id, "query": query, "category": category,
+                             "results": results, "total": len(results)})
+
+    async def dashboard(self, request):
+        return self.respond({**self.dataset['dashboard'], "server_id": self.server_id, "uptime": time.time()})
+
+    async def analytics(self, request):
+        return self.respond({**self.dataset['analytics'], "server_id": self.server_id})
+
+    async def reports(self, request):
+        return self.respond({**self.dataset['reports'], "server_id": self.server_id})
+
+    async def settings(self, request):
+        return self.respond({**self.dataset['settings'], "server_id": self.server_id})
+
+    async def notifications(self, request):
+        now = time.time()
+        notifications = [
+            {"id": n["id"], "message": n["message"], "type": n["type"], "timestamp": now - n["age"]}
+            for n in self.dataset['notifications']
+        ]
+        return self.respond({"server_id": self.server_id, "notifications": notifications,
+                             "unread": len(notifications)})
+
+    async def logs(self, request):
+        now = time.time()
+        logs = [
+            {"timestamp": now - entry["age"], "level": entry["level"],
+             "message": entry["message"].format(server_id=self.server_id)}
+            for entry in self.dataset['logs']
+        ]
+        return self.respond({"server_id": self.server_id, "logs": logs, "total": len(logs)})
+
+    async def upload(self, request):
+        """Count the multipart 'file' field's bytes as they stream in, without buffering the file"""
+        if not request.content_type.startswith('multipart/'):
+            return self.respond({"error": "No file provided"}, 400, pad=False)
+        reader = await request.multipart()
+        async for part in reader:
+            if part.name != 'file':
+                continue
+            if not part.filename:
+                return self.respond({"error": "No file selected"}, 400, pad=False)
+            size = 0
+            while True:
+                chunk = await part.read_chunk()
+                if not chunk:
+                    break
+                size += len(chunk)
+            return self.respond({"message": "File uploaded successfully", "filename": part.filename,
+                                 "server_id": self.server_id, "size": size})
+        return self.respond({"error": "No file provided"}, 400, pad=False)
+
+    def app(self):
+        """The aiohttp application (build it inside the event loop that will serve it)"""
+        if self.max_concurrency:
+            self.slots = asyncio.Semaphore(self.max_concurrency)
+        app = web.Application(middlewares=[self.limit, self.simulate], client_max_size=1024 ** 3)
+        app.router.add_get('/', self.index)
+        app.router.add_get('/health', self.health)
+        for route in self.routes:
+            method, path = route.split(' ', 1)
+            app.router.add_route(method, path.replace('{user_id}', r'{user_id:\d+}'), getattr(self, ROUTES[route][0]))
+        return app
+
+def raise_fd_limit():
+    """Allow as many open sockets as the hard limit permits; None where there is no such limit"""
+    if resource is None:
+        return None
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+async def serve(configs, host='0.0.0.0', backlog=BACKLOG, reuse_port=False):
+    """Serve a Backend built from each config (Backend keyword arguments) on its port until cancelled"""
+    for config in configs:
+        backend = Backend(**config)
+        # Long request lines are part of the attack traffic, so allow them
+        runner = web.AppRunner(backend.app(), access_log=None, max_line_size=65536, max_field_size=65536)
+        await runner.setup()
+        await web.TCPSite(runner, host, backend.port, backlog=backlog, reuse_port=reuse_port).start()
+        logger.info(f"Backend {backend.server_id} listening on {host}:{backend.port} (pid {os.getpid()})")
+    await asyncio.Event().wait()
+
+def serve_forever(configs, host, backlog, reuse_port=False):
+    try:
+        asyncio.run(serve(configs, host, backlog, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+def run(configs, host='0.0.0.0', workers=WORKERS, backlog=BACKLOG):
+    """Serve in this process, or in several worker processes that share each port (SO_REUSEPORT)
+
+    The kernel spreads new connections across the workers, so throughput
+    scales with cores while each worker keeps its own event loop.
+    """
+    workers = workers or os.cpu_count()
+    if workers > 1 and not hasattr(socket, 'SO_REUSEPORT'):
+        logger.warning(f"SO_REUSEPORT is not available on this platform; serving with 1 worker instead of {workers}")
+        workers = 1
+    if workers == 1:
+        serve_forever(configs, host, backlog)
+        return
+
+    processes = [
+        multiprocessing.Process(target=serve_forever, args=(configs, host, backlog, True), name=f"backend-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    def shut_down(signum, frame):
+        raise SystemExit(0)
+
+    # Stopping the parent (docker stop, kill) stops the workers too
+    signal.signal(signal.SIGTERM, shut_down)
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+def instance_configs(profiles, instances=1, port=0, ports=None):
+    """Backend keyword arguments for each instance of each profile
+
+    Instances take consecutive ports from port (or each profile's own port
+    when it is 0), unless ports lists one per instance. With more than one
+    instance of a profile, server_ids are numbered <server_id>-<n>.
+    """
+    count = len(profiles) * instances
+    if ports and len(ports) != count:
+        raise ValueError(f"{len(ports)} ports for {count} instances")
+    configs = []
+    for profile in profiles:
+        for i in range(instances):
+            if ports:
+                instance_port = ports[len(configs)]
+            elif port:
+                instance_port = port + len(configs)
+            else:
+                instance_port = profile.get('port', 8001) + i
+            configs.append({
+                'server_id': profile['server_id'] if instances == 1 else f"{profile['server_id']}-{i + 1}",
+                'port': instance_port,
+                'dataset': profile['dataset'],
+                'routes': served_routes(profile['dataset'], profile.get('routes')),
+                'latency': profile.get('latency'),
+                'route_latency': profile.get('route_latency'),
+                'error_rate': profile.get('error_rate', 0.0),
+                'payload_bytes': profile.get('payload_bytes', 0)
+            })
+    taken = [config['port'] for config in configs]
+    if len(set(taken)) != len(taken):
+        raise ValueError(f"Instances share a port ({taken}); pass --port to number them consecutively")
+    return configs
+
+def latency_spec(args):
+    """Latency distribution spec from the command-line flags, None to keep the profile's"""
+    if args.latency == 'fixed':
+        return {'distribution': 'fixed', 'ms': args.latency_ms}
+    if args.latency == 'uniform':
+        return {'distribution': 'uniform', 'min_ms': 0, 'max_ms': args.latency_ms}
+    if args.latency in ('lognormal', 'bimodal'):
+        return {'distribution': args.latency, 'median_ms': args.latency_ms, 'sigma': args.sigma,
+                'tail_ms': args.tail_ms, 'tail_ratio': args.tail_ratio}
+    if args.latency == 'zero':
+        return {'distribution': 'zero'}
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run backend servers from profiles, any number of instances each")
+    parser.add_argument('--profile', nargs='+', default=PROFILES,
+                        help="profiles from config/backends (names or paths) to serve (default: stub)")
+    parser.add_argument('--instances', type=int, default=INSTANCES, help="instances of each profile")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=PORT,
+                        help="first port, the rest follow consecutively (default: each profile's own port)")
+    parser.add_argument('--ports', type=int, nargs='+', default=None, help="one port per instance, instead of --port")
+    parser.add_argument('--print-backends', action='store_true',
+                        help="print the instances as a BACKEND_SERVERS value for the load balancer, and exit")
+    parser.add_argument('--latency', choices=LATENCY_DISTRIBUTIONS, default=None,
+                        help="service time distribution for every route, instead of the profile's")
+    parser.add_argument('--latency-ms', type=float, default=1.0,
+                        help="fixed time, uniform maximum, or lognormal/bimodal median")
+    parser.add_argument('--sigma', type=float, default=0.5, help="lognormal/bimodal spread")
+    parser.add_argument('--tail-ms', type=float, default=250.0, help="bimodal slow-mode median")
+    parser.add_argument('--tail-ratio', type=float, default=0.01, help="bimodal share of slow requests")
+    parser.add_argument('--error-rate', type=float, default=None, help="share of API requests answered with 500")
+    parser.add_argument('--payload-bytes', type=int, default=None, help="padding added to each API response")
+    parser.add_argument('--workers', type=int, default=WORKERS, help="processes sharing each port (0: one per CPU)")
+    parser.add_argument('--max-concurrency', type=int, default=MAX_CONCURRENCY,
+                        help="in-flight requests per worker before queueing (0: no limit)")
+    parser.add_argument('--backlog', type=int, default=BACKLOG, help="listen backlog per port")
+    args = parser.parse_args(argv)
+
+    try:
+        configs = instance_configs([load_profile(name) for name in args.profile], args.instances, args.port, args.ports)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.print_backends:
+        host = 'localhost' if args.host == '0.0.0.0' else args.host
+        print(','.join(f"{host}:{config['port']}" for config in configs))
+        return
+
+    latency = latency_spec(args)
+    for config in configs:
+        if latency:
+            config.update(latency=latency, route_latency=None)
+        if args.error_rate is not None:
+            config['error_rate'] = args.error_rate
+        if args.payload_bytes is not None:
+            config['payload_bytes'] = args.payload_bytes
+        config['max_concurrency'] = args.max_concurrency
+
+    logger.info(f"{len(configs)} instance(s) of {', '.join(args.profile)} on ports "
+                f"{configs[0]['port']}-{configs[-1]['port']}, open file limit {raise_fd_limit() or 'n/a'}, "
+                f"{args.workers or os.cpu_count()} worker(s), max concurrency {args.max_concurrency or 'unlimited'}")
+    run(configs, args.host, args.workers, args.backlog)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Latency Histogram
+Log-linear, mergeable latency histogram in the style of HdrHistogram
+"""
+
+import math
+from typing import Dict, Iterable
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+class LatencyHistogram:
+    """Counts latencies in microsecond buckets with bounded relative error
+
+    Values below 2**significant_bits microseconds are counted exactly; above
+    that every power-of-two range is split into 2**(significant_bits - 1)
+    linear sub-buckets, so the relative error stays below
+    2**-(significant_bits - 1) (under 1% for the default of 8 bits) at any
+    magnitude. Memory grows with the number of distinct buckets hit, not the
+    number of recorded values, and histograms merge by adding counts.
+    """
+
+    def __init__(self, significant_bits: int = 8):
+        self.significant_bits = significant_bits
+        self.half = 1 << (significant_bits - 1)
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.min_us = None
+        self.max_us = 0
+        self.sum_us = 0
+
+    def bucket(self, value_us: int) -> int:
+        shift = max(0, value_us.bit_length() - self.significant_bits)
+        return shift * self.half + (value_us >> shift)
+
+    def highest_equivalent(self, index: int) -> int:
+        """Largest value counted in a bucket (what HdrHistogram reports)"""
+        if index < 2 * self.half:
+            return index
+        shift = index // self.half - 1
+        return ((index - shift * self.half + 1) << shift) - 1
+
+    def record(self, seconds: float, count: int = 1):
+        value_us = max(0, int(round(seconds * 1e6)))
+        index = self.bucket(value_us)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+        self.sum_us += value_us * count
+        self.max_us = max(self.max_us, value_us)
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("Cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum_us += other.sum_us
+        self.max_us = max(self.max_us, other.max_us)
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        return self
+
+    def percentile(self, q: float) -> float:
+        """q-th percentile (0-100) in seconds"""
+        if not self.total:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.highest_equivalent(index), self.max_us) / 1e6
+        return self.max_us / 1e6
+
+    def summary(self, percentiles: Iterable[float] = PERCENTILES) -> Dict:
+        """Count, mean, percentiles and max, in milliseconds"""
+        result = {
+            'count': self.total,
+            'mean_ms': self.sum_us / self.total / 1000 if self.total else 0.0,
+            'min_ms': (self.min_us or 0) / 1000
+        }
+        for q in percentiles:
+            result[f'p{q:g}_ms'] = self.percentile(q) * 1000
+        result['max_ms'] = self.max_us / 1000
+        return {key: round(value, 3) for key, value in result.items()}
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form that from_dict restores exactly, for merging later"""
+        return {
+            'significant_bits': self.significant_bits,
+            'counts': {str(index): count for index, count in sorted(self.counts.items())},
+            'total': self.total,
+            'min_us': self.min_us,
+            'max_us': self.max_us,
+            'sum_us': self.sum_us
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls(data['significant_bits'])
+        histogram.counts = {int(index): count for index, count in data['counts'].items()}
+        histogram.total = data['total']
+        histogram.min_us = data['min_us']
+        histogram.max_us = data['max_us']
+        histogram.sum_us = data['sum_us']
+        return histogram
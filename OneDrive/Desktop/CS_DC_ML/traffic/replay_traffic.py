@@ -0,0 +1,189 @@
+"""
+Traffic Replay
+Re-issues requests recorded in the load balancer's request log, in timestamp order,
+keeping the original inter-arrival times or scaling them by a speed factor
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Optional
+
+from traffic_generator import TrafficGenerator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPLAY_COLUMNS = "timestamp, client_ip, method, path, is_malicious, prediction"
+
+def parse_time(value) -> Optional[int]:
+    """Epoch milliseconds from an epoch-ms number or an ISO timestamp (as the dashboard exports)"""
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+
+def log_tables(conn: sqlite3.Connection):
+    """Daily partitions in date order when the log is partitioned, else the requests table"""
+    partitions = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB 'requests_[0-9]*' ORDER BY name"
+    )]
+    return partitions or ["requests"]
+
+def iter_db(db_path: str, since: Optional[int] = None, until: Optional[int] = None,
+            batch_size: int = 1000) -> Iterator[Dict]:
+    """Request log rows in timestamp order, holding one batch in memory at a time"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        # Partitions are read one after another so each scan stays in index order
+        for table in log_tables(conn):
+            cursor = conn.execute(
+                f"SELECT {REPLAY_COLUMNS} FROM {table} WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+                (since or 0, until or 2 ** 62)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(["timestamp", "client_ip", "method", "path", "is_malicious", "prediction"], row))
+    finally:
+        conn.close()
+
+def iter_file(path: str, since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Dict]:
+    """Rows from a dashboard export (/api/requests/export?order=asc), NDJSON or CSV, read line by line"""
+    with open(path, newline="") as f:
+        records = csv.DictReader(f) if path.endswith(".csv") else (json.loads(line) for line in f if line.strip())
+        previous = None
+        for record in records:
+            timestamp = parse_time(record["timestamp"])
+            if previous is not None and timestamp < previous:
+                raise ValueError(f"{path} is not in timestamp order; export it with order=asc")
+            previous = timestamp
+            if (since and timestamp < since) or (until and timestamp >= until):
+                continue
+            record["timestamp"] = timestamp
+            record["is_malicious"] = str(record.get("is_malicious")).lower() in ("true", "1")
+            yield record
+
+async def replay(generator: TrafficGenerator, rows: Iterator[Dict], speed: float = 1.0,
+                 max_gap: Optional[float] = None, limit: Optional[int] = None) -> Dict:
+    """Send each row at its recorded offset from the first row, divided by speed
+
+    Scheduling is open-loop: a request goes out at its time whether or not
+    earlier ones have returned, and latency is measured from that time.
+    max_gap caps idle stretches (e.g. overnight) at that many recorded seconds.
+    """
+    generator.begin_phase("replay")
+    in_flight = set()
+    start = time.perf_counter()
+    offset = 0.0
+    first_timestamp = previous_timestamp = None
+    sent = 0
+    last_send = start
+    max_lag = 0.0
+
+    async def issue(request_data, intended_start):
+        generator.record_result(await generator.send_request(request_data, intended_start))
+
+    for row in rows:
+        if limit and sent >= limit:
+            break
+
+        timestamp = row["timestamp"]
+        if first_timestamp is None:
+            first_timestamp = previous_timestamp = timestamp
+        gap = (timestamp - previous_timestamp) / 1000
+        if max_gap is not None:
+            gap = min(gap, max_gap)
+        offset += gap / speed
+        previous_timestamp = timestamp
+
+        intended = start + offset
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+
+        request_type = "attack" if row["is_malicious"] else "normal"
+        request_data = {
+            "method": row["method"] or "GET",
+            "url": f"{generator.load_balancer_url}{row['path']}",
+            "headers": {"User-Agent": "traffic-replay", "X-Forwarded-For": row["client_ip"] or ""},
+            "body": None,
+            "type": request_type,
+            "attack_type": row["prediction"] or "none"
+        }
+        generator.stats["total_requests"] += 1
+        generator.stats[f"{request_type}_requests"] += 1
+
+        task = asyncio.create_task(issue(request_data, intended))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+        sent += 1
+        last_send = time.perf_counter()
+
+    if in_flight:
+        await asyncio.gather(*in_flight)
+
+    recorded_span = (previous_timestamp - first_timestamp) / 1000 if sent else 0.0
+    # Over the time sending really took, which exceeds the schedule when the replay falls behind
+    send_span = max(last_send - start, offset)
+    return {
+        "replayed": sent,
+        "recorded_span_s": recorded_span,
+        "replay_span_s": offset,
+        "achieved_rps": sent / send_span if send_span else 0.0,
+        "max_schedule_lag_ms": max_lag * 1000
+    }
+
+async def main(args):
+    since, until = parse_time(args.since), parse_time(args.until)
+    rows = iter_file(args.file, since, until) if args.file else iter_db(args.db, since, until)
+
+    async with TrafficGenerator(args.url, open_loop=True) as generator:
+        logger.info(f"Replaying {args.file or args.db} against {args.url} at {args.speed}x")
+        generator.stats["start_time"] = time.time()
+        summary = await replay(generator, rows, args.speed, args.max_gap, args.limit)
+        generator.stats["end_time"] = time.time()
+
+    logger.info(f"Replayed {summary['replayed']} requests: {summary['recorded_span_s']:.1f}s recorded in "
+                f"{summary['replay_span_s']:.1f}s, {summary['achieved_rps']:.1f} req/s, "
+                f"max schedule lag {summary['max_schedule_lag_ms']:.1f}ms")
+    generator.print_statistics()
+    for path in args.output:
+        generator.export_results(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded load balancer traffic")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", default=os.getenv("SQLITE_DB_PATH", "logs/load_balancer.db"),
+                        help="request log database")
+    source.add_argument("--file", default=None, help="NDJSON or CSV export (/api/requests/export?order=asc)")
+    parser.add_argument("--url", default=os.getenv("LOAD_BALANCER_URL", "http://localhost:8000"),
+                        help="load balancer URL")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed factor (10 = ten times faster)")
+    parser.add_argument("--max-gap", type=float, default=None, help="cap idle gaps at this many recorded seconds")
+    parser.add_argument("--since", default=None, help="first timestamp to replay (epoch ms or ISO)")
+    parser.add_argument("--until", default=None, help="stop before this timestamp (epoch ms or ISO)")
+    parser.add_argument("--limit", type=int, default=None, help="replay at most this many requests")
+    parser.add_argument("--output", nargs="*", default=[], help="write results (.json or .csv)")
+    args = parser.parse_args()
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("\nReplay stopped by user")
+    except ValueError as e:
+        raise SystemExit(str(e))
@@ -0,0 +1,161 @@
+"""
+Traffic Scenarios
+Loads declarative YAML load profiles (phases with rate curves, request mixes and
+payload sizes) and runs them on a TrafficGenerator
+"""
+
+import asyncio
+import bisect
+import math
+import random
+from typing import Callable, Dict
+
+import yaml
+
+PHASE_KEYS = {'name', 'duration', 'rate', 'arrival', 'attack_ratio', 'mix', 'bursts', 'pause'}
+MIX_KEYS = {'endpoints', 'methods', 'attacks', 'attack_patterns', 'payload_size'}
+
+def rate_curve(spec, duration: float) -> Callable[[float], float]:
+    """Requests per second as a function of seconds into the phase
+
+    spec is a number (constant rate), {from, to} (linear ramp over the phase)
+    or {points: [[t, rate], ...]} (piecewise linear, holding the last rate).
+    """
+    if isinstance(spec, (int, float)):
+        return lambda t: float(spec)
+    if 'from' in spec:
+        points = [(0.0, float(spec['from'])), (float(duration), float(spec['to']))]
+    elif 'points' in spec:
+        points = sorted((float(t), float(r)) for t, r in spec['points'])
+    else:
+        raise ValueError(f"Unknown rate {spec}: expected a number, {{from, to}} or {{points}}")
+
+    times = [t for t, _ in points]
+
+    def rate(t):
+        i = bisect.bisect_right(times, t)
+        if i == 0:
+            return points[0][1]
+        if i == len(points):
+            return points[-1][1]
+        (t0, r0), (t1, r1) = points[i - 1], points[i]
+        return r0 + (r1 - r0) * (t - t0) / (t1 - t0)
+
+    return rate
+
+def payload_sampler(spec: Dict) -> Callable[[], int]:
+    """Request body sizes in bytes: fixed {size}, uniform {min, max} or lognormal {median, sigma}, capped by max"""
+    distribution = spec.get('distribution', 'fixed')
+    cap = spec.get('max', math.inf)
+    if distribution == 'fixed':
+        sample = lambda: spec['size']
+    elif distribution == 'uniform':
+        sample = lambda: random.randint(spec['min'], spec['max'])
+    elif distribution == 'lognormal':
+        sample = lambda: random.lognormvariate(math.log(spec['median']), spec.get('sigma', 1.0))
+    else:
+        raise ValueError(f"Unknown payload size distribution {distribution}")
+    return lambda: int(min(sample(), cap))
+
+class Scenario:
+    """A parsed scenario file: a default request mix and a list of phases"""
+
+    def __init__(self, data: Dict):
+        self.name = data.get('name', 'scenario')
+        self.description = data.get('description', '')
+        self.mix = data.get('mix', {})
+        self.phases = data.get('phases', [])
+        self.validate()
+
+    def validate(self):
+        if not self.phases:
+            raise ValueError(f"Scenario {self.name} has no phases")
+        for mix in [self.mix] + [phase.get('mix', {}) for phase in self.phases]:
+            unknown = set(mix) - MIX_KEYS
+            if unknown:
+                raise ValueError(f"Unknown mix keys {sorted(unknown)}")
+        for index, phase in enumerate(self.phases):
+            unknown = set(phase) - PHASE_KEYS
+            if unknown:
+                raise ValueError(f"Phase {index + 1}: unknown keys {sorted(unknown)}")
+            if not any(key in phase for key in ('rate', 'bursts', 'pause')):
+                raise ValueError(f"Phase {index + 1}: needs a rate, bursts or pause")
+            if 'rate' in phase and 'duration' not in phase:
+                raise ValueError(f"Phase {index + 1}: a rate needs a duration")
+
+    @property
+    def duration(self) -> float:
+        """Planned length in seconds (bursts count their intervals)"""
+        total = 0.0
+        for phase in self.phases:
+            bursts = phase.get('bursts')
+            total += phase.get('duration', 0) + phase.get('pause', 0)
+            if bursts:
+                total += bursts.get('count', 1) * bursts.get('interval', 0)
+        return total
+
+def load_scenario(path: str) -> Scenario:
+    with open(path) as f:
+        return Scenario(yaml.safe_load(f))
+
+def snapshot_mix(generator) -> Dict:
+    """The generator's built-in request mix, restored before each phase's overrides"""
+    return {
+        'normal_endpoints': list(generator.normal_endpoints),
+        'normal_methods': list(generator.normal_methods),
+        'attack_patterns': dict(generator.attack_patterns)
+    }
+
+def apply_mix(generator, mix: Dict, base: Dict):
+    """Set the generator's endpoints, methods, attacks and payload sizes (with weights) from a mix"""
+    generator.normal_endpoints = list(mix.get('endpoints', base['normal_endpoints']))
+    generator.endpoint_weights = list(mix['endpoints'].values()) if 'endpoints' in mix else None
+    generator.normal_methods = list(mix.get('methods', base['normal_methods']))
+    generator.method_weights = list(mix['methods'].values()) if 'methods' in mix else None
+
+    generator.attack_patterns = {**base['attack_patterns'], **mix.get('attack_patterns', {})}
+    attacks = mix.get('attacks')
+    if attacks:
+        missing = set(attacks) - set(generator.attack_patterns)
+        if missing:
+            raise ValueError(f"Attack types {sorted(missing)} have no patterns; define them in attack_patterns")
+    generator.attack_weights = dict(attacks) if attacks else None
+    generator.payload_size = payload_sampler(mix['payload_size']) if 'payload_size' in mix else None
+
+def worker_share(total: int, worker: int, workers: int) -> int:
+    """Worker `worker`'s part of `total` requests split exactly across `workers` (may be 0)"""
+    return total // workers + (worker < total % workers)
+
+async def run_scenario(generator, scenario: Scenario, worker: int = 0, workers: int = 1, quiet: bool = False):
+    """Run every phase of a scenario as worker `worker` of `workers`, each sending its share of rates and bursts"""
+    say = (lambda *_: None) if quiet else print
+    share = 1.0 / workers
+    base = snapshot_mix(generator)
+    default_arrival = generator.arrival
+
+    say(f"\nScenario {scenario.name}: {len(scenario.phases)} phases, ~{scenario.duration:.0f}s")
+    for index, phase in enumerate(scenario.phases):
+        name = phase.get('name', f'phase-{index + 1}')
+        say(f"\nPhase {index + 1}: {name}")
+        generator.begin_phase(name)
+        apply_mix(generator, {**scenario.mix, **phase.get('mix', {})}, base)
+        generator.arrival = phase.get('arrival', default_arrival)
+        attack_ratio = phase.get('attack_ratio', 0.0)
+
+        if 'rate' in phase:
+            curve = rate_curve(phase['rate'], phase['duration'])
+            await generator.continuous_traffic(duration=phase['duration'],
+                                               requests_per_second=lambda t: curve(t) * share,
+                                               attack_ratio=attack_ratio)
+
+        bursts = phase.get('bursts')
+        if bursts:
+            for i in range(bursts.get('count', 1)):
+                say(f"  Burst {i + 1}/{bursts.get('count', 1)}")
+                await generator.generate_traffic_burst(worker_share(bursts['size'], worker, workers), attack_ratio)
+                await asyncio.sleep(bursts.get('interval', 0))
+
+        if phase.get('pause'):
+            await asyncio.sleep(phase['pause'])
+
+    generator.arrival = default_arrival
@@ -3,24 +3,49 @@ Traffic Generator for Load Balancer Testing
 Simulates both normal and attack traffic patterns
 """
 
+import argparse
 import asyncio
 import aiohttp
+import csv
+import os
 import time
 import random
 import json
 import logging
 from typing import List, Dict, Tuple
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import threading
 
+from latency_histogram import LatencyHistogram, PERCENTILES
+from scenario import load_scenario, run_scenario, worker_share
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def mean_rate(rate, duration: float, samples: int = 100) -> float:
+    """Average of a rate curve over a phase"""
+    return sum(rate(duration * (i + 0.5) / samples) for i in range(samples)) / samples
+
+def rate_label(requests_per_second, duration: float) -> str:
+    if callable(requests_per_second):
+        return f"{requests_per_second(0):.1f}..{requests_per_second(duration):.1f} (mean {mean_rate(requests_per_second, duration):.1f})"
+    return f"{requests_per_second}"
+
 class TrafficGenerator:
-    def __init__(self, load_balancer_url: str = "http://localhost:8000"):
+    def __init__(self, load_balancer_url: str = "http://localhost:8000", open_loop: bool = False,
+                 arrival: str = "constant", connection_limit: int = 100):
         self.load_balancer_url = load_balancer_url
+        self.open_loop = open_loop
+        self.arrival = arrival
+        self.connection_limit = connection_limit
         self.session = None
+        # phase -> group ("all", "normal", "attack", "attack:<type>") -> latency histogram of successful
+        # requests; failed ones (timeouts, connection errors) go to the "errors" group and are counted
+        # per group in self.errors, so they don't drag the percentiles towards the timeout
+        self.phase = "default"
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self.errors: Dict[str, Dict[str, int]] = {}
         self.stats = {
             'total_requests': 0,
             'successful_requests': 0,
@@ -40,6 +65,12 @@ class TrafficGenerator:
         ]
         
         self.normal_methods = ["GET", "POST"]
+        
+        # Optional weights and payload sizes, set by scenario files (None: uniform choice, built-in bodies)
+        self.endpoint_weights = None
+        self.method_weights = None
+        self.attack_weights = None
+        self.payload_size = None
         self.normal_headers = [
             {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"},
             {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"},
@@ -83,7 +114,15 @@ class TrafficGenerator:
         }
     
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        # Open-loop runs must not queue requests in the client's connection pool,
+        # or the generator itself would add latency
+        connector = aiohttp.TCPConnector(
+            limit=0 if self.open_loop else self.connection_limit,
+            limit_per_host=0,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -92,8 +131,8 @@ class TrafficGenerator:
     
     def generate_normal_request(self) -> Dict:
         """Generate a normal HTTP request"""
-        endpoint = random.choice(self.normal_endpoints)
-        method = random.choice(self.normal_methods)
+        endpoint = random.choices(self.normal_endpoints, weights=self.endpoint_weights)[0]
+        method = random.choices(self.normal_methods, weights=self.method_weights)[0]
         headers = random.choice(self.normal_headers).copy()
         
         # Add some random query parameters for variety
@@ -102,7 +141,11 @@ class TrafficGenerator:
         
         # Generate request body for POST requests
         body = None
-        if method == "POST":
+        if method == "POST" and self.payload_size:
+            size = self.payload_size()
+            body = json.dumps({"data": "x" * max(0, size - 12)})
+            headers["Content-Type"] = "application/json"
+        elif method == "POST":
             if 'orders' in endpoint:
                 body = json.dumps({
                     "user_id": random.randint(1, 9),
@@ -123,8 +166,10 @@ class TrafficGenerator:
     
     def generate_attack_request(self) -> Dict:
         """Generate a malicious HTTP request"""
-        attack_types = list(self.attack_patterns.keys())
-        attack_type = random.choice(attack_types)
+        if self.attack_weights:
+            attack_type = random.choices(list(self.attack_weights), weights=list(self.attack_weights.values()))[0]
+        else:
+            attack_type = random.choice(list(self.attack_patterns.keys()))
         
         if attack_type == 'suspicious_user_agents':
             headers = random.choice(self.attack_patterns[attack_type])
@@ -147,15 +192,68 @@ class TrafficGenerator:
             "attack_type": attack_type
         }
     
-    async def send_request(self, request_data: Dict) -> Dict:
-        """Send a single HTTP request"""
-        start_time = time.time()
+    def next_request(self, attack_ratio: float) -> Dict:
+        """Pick a normal or attack request and count it"""
+        if random.random() < attack_ratio:
+            request_data = self.generate_attack_request()
+            self.stats['attack_requests'] += 1
+        else:
+            request_data = self.generate_normal_request()
+            self.stats['normal_requests'] += 1
+        
+        self.stats['total_requests'] += 1
+        return request_data
+    
+    def begin_phase(self, name: str):
+        """Record latencies from now on under this phase name"""
+        self.phase = name
+        self.histograms.setdefault(name, {})
+    
+    def record_latency(self, result: Dict):
+        groups = ["all", result["request_type"]]
+        if result["request_type"] == "attack":
+            groups.append(f"attack:{result['attack_type']}")
+        
+        if not result["success"]:
+            phase_errors = self.errors.setdefault(self.phase, {})
+            for group in groups + ["errors"]:
+                phase_errors[group] = phase_errors.get(group, 0) + 1
+            groups = ["errors"]
+        
+        phase_histograms = self.histograms.setdefault(self.phase, {})
+        for group in groups:
+            if group not in phase_histograms:
+                phase_histograms[group] = LatencyHistogram()
+            phase_histograms[group].record(result["latency"])
+    
+    def record_result(self, result):
+        """Update statistics with a send_request result (or the exception it raised)"""
+        if isinstance(result, Exception):
+            self.stats['failed_requests'] += 1
+            return
+        
+        self.record_latency(result)
+        if result["success"]:
+            self.stats['successful_requests'] += 1
+        else:
+            self.stats['failed_requests'] += 1
+        
+        if result["blocked"]:
+            self.stats['blocked_requests'] += 1
+    
+    async def send_request(self, request_data: Dict, intended_start: float = None) -> Dict:
+        """Send a single HTTP request
+        
+        response_time is measured from when the request was actually sent;
+        latency from intended_start (a time.perf_counter() value) when the
+        request was scheduled for a given moment, which includes any time it
+        spent waiting to be sent.
+        """
+        start_time = time.perf_counter()
+        intended_start = intended_start or start_time
         
         try:
-            kwargs = {
-                "headers": request_data["headers"],
-                "timeout": aiohttp.ClientTimeout(total=10)
-            }
+            kwargs = {"headers": request_data["headers"]}
             
             if request_data["body"]:
                 kwargs["data"] = request_data["body"]
@@ -165,18 +263,22 @@ class TrafficGenerator:
                 request_data["url"],
                 **kwargs
             ) as response:
-                response_time = time.time() - start_time
-                response_text = await response.text()
+                body = await response.read()
+                end_time = time.perf_counter()
+                response_time = end_time - start_time
                 
-                # Try to parse JSON response
+                # Read the body once and parse it only if it is JSON
                 try:
-                    response_json = await response.json()
-                except:
-                    response_json = {"raw_response": response_text[:500]}
+                    if response.content_type != "application/json":
+                        raise ValueError
+                    response_json = json.loads(body)
+                except ValueError:
+                    response_json = {"raw_response": body[:500].decode(errors="replace")}
                 
                 return {
                     "status_code": response.status,
                     "response_time": response_time,
+                    "latency": end_time - intended_start,
                     "response": response_json,
                     "success": True,
                     "blocked": response.status == 403,
@@ -185,10 +287,11 @@ class TrafficGenerator:
                 }
                 
         except Exception as e:
-            response_time = time.time() - start_time
+            end_time = time.perf_counter()
             return {
                 "status_code": 0,
-                "response_time": response_time,
+                "response_time": end_time - start_time,
+                "latency": end_time - intended_start,
                 "response": {"error": str(e)},
                 "success": False,
                 "blocked": False,
@@ -198,49 +301,41 @@ class TrafficGenerator:
     
     async def generate_traffic_burst(self, num_requests: int, attack_ratio: float = 0.3):
         """Generate a burst of traffic with specified attack ratio"""
-        tasks = []
-        
-        for i in range(num_requests):
-            if random.random() < attack_ratio:
-                request_data = self.generate_attack_request()
-                self.stats['attack_requests'] += 1
-            else:
-                request_data = self.generate_normal_request()
-                self.stats['normal_requests'] += 1
-            
-            self.stats['total_requests'] += 1
-            tasks.append(self.send_request(request_data))
+        tasks = [self.send_request(self.next_request(attack_ratio)) for _ in range(num_requests)]
         
         # Execute all requests concurrently
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Update statistics
         for result in results:
-            if isinstance(result, Exception):
-                self.stats['failed_requests'] += 1
-            else:
-                if result["success"]:
-                    self.stats['successful_requests'] += 1
-                else:
-                    self.stats['failed_requests'] += 1
-                
-                if result["blocked"]:
-                    self.stats['blocked_requests'] += 1
+            self.record_result(result)
         
         return results
     
-    async def continuous_traffic(self, duration: int, requests_per_second: int = 10, attack_ratio: float = 0.2):
-        """Generate continuous traffic for specified duration"""
-        logger.info(f"Starting continuous traffic generation: {duration}s, {requests_per_second} req/s, {attack_ratio*100}% attacks")
+    async def continuous_traffic(self, duration: int, requests_per_second=10, attack_ratio: float = 0.2):
+        """Generate continuous traffic for specified duration
+        
+        requests_per_second is a number or a function of the seconds elapsed
+        in the phase, for ramps and other rate curves.
+        """
+        if self.open_loop:
+            return await self.open_loop_traffic(duration, requests_per_second, attack_ratio)
         
-        end_time = time.time() + duration
-        interval = 1.0 / requests_per_second
+        rate = requests_per_second if callable(requests_per_second) else (lambda _: requests_per_second)
+        logger.info(f"Starting continuous traffic generation: {duration}s, {rate_label(requests_per_second, duration)} req/s, {attack_ratio*100}% attacks")
+        
+        start_time = time.time()
+        end_time = start_time + duration
         
         while time.time() < end_time:
             batch_start = time.time()
+            current_rate = rate(batch_start - start_time)
+            if current_rate <= 0:
+                await asyncio.sleep(0.1)
+                continue
+            interval = 1.0 / current_rate
             
             # Generate a batch of requests
-            batch_size = min(requests_per_second, 5)  # Limit batch size for better control
+            batch_size = max(1, min(int(current_rate), 5))  # Limit batch size for better control
             await self.generate_traffic_burst(batch_size, attack_ratio)
             
             # Wait for next interval
@@ -248,6 +343,92 @@ class TrafficGenerator:
             if elapsed < interval:
                 await asyncio.sleep(interval - elapsed)
     
+    def next_interarrival(self, requests_per_second: float) -> float:
+        """Seconds until the next scheduled request"""
+        if self.arrival == "poisson":
+            return random.expovariate(requests_per_second)
+        return 1.0 / requests_per_second
+    
+    async def open_loop_traffic(self, duration: int, requests_per_second=10, attack_ratio: float = 0.2) -> Dict:
+        """Send requests on a fixed timeline, whatever the responses are doing
+        
+        Start times follow constant or Poisson arrivals at the target rate and
+        never wait for earlier requests, so a slow load balancer builds up
+        in-flight requests instead of slowing the generator down. Latency is
+        measured from each request's intended start, so a stall counts against
+        every request scheduled during it (no coordinated omission).
+        """
+        logger.info(f"Starting open-loop traffic: {duration}s, {rate_label(requests_per_second, duration)} req/s {self.arrival} arrivals, {attack_ratio*100}% attacks")
+        rate = requests_per_second if callable(requests_per_second) else (lambda _: requests_per_second)
+        
+        latencies = LatencyHistogram()
+        failed = 0
+        in_flight = set()
+        
+        async def issue(request_data, intended_start):
+            nonlocal failed
+            result = await self.send_request(request_data, intended_start)
+            self.record_result(result)
+            if result["success"]:
+                latencies.record(result["latency"])
+            else:
+                failed += 1
+        
+        start = time.perf_counter()
+        end = start + duration
+        intended = start
+        sent = 0
+        last_send = start
+        max_lag = 0.0
+        while True:
+            current_rate = rate(intended - start)
+            if current_rate <= 0:
+                # Nothing scheduled at this point of the curve; look again shortly
+                intended += 0.05
+                if intended >= end:
+                    break
+                continue
+            intended += self.next_interarrival(current_rate)
+            if intended >= end:
+                break
+            
+            delay = intended - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                # Behind schedule: send now, the lag is already part of its latency
+                max_lag = max(max_lag, -delay)
+            
+            task = asyncio.create_task(issue(self.next_request(attack_ratio), intended))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+            sent += 1
+            last_send = time.perf_counter()
+        
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        drained = time.perf_counter()
+        
+        # Rates over the real elapsed time: a generator that fell behind sends the
+        # whole schedule late, so sent / duration would always equal the target
+        summary = {
+            "target_rps": mean_rate(rate, duration),
+            "achieved_rps": sent / max(last_send - start, duration),
+            "throughput_rps": latencies.total / (drained - start),
+            "completed": latencies.total,
+            "errors": failed,
+            "drain_seconds": max(0.0, drained - end),
+            "max_schedule_lag_ms": max_lag * 1000,
+            **latencies.summary()
+        }
+        logger.info(
+            f"Target {summary['target_rps']:.1f} req/s, offered {summary['achieved_rps']:.1f} req/s, "
+            f"completed {summary['throughput_rps']:.1f} req/s, {failed} errors; "
+            f"latency p50 {summary['p50_ms']:.1f}ms p99 {summary['p99_ms']:.1f}ms max {summary['max_ms']:.1f}ms; "
+            f"max schedule lag {summary['max_schedule_lag_ms']:.1f}ms"
+        )
+        return summary
+    
     def print_statistics(self):
         """Print traffic generation statistics"""
         if self.stats['start_time'] and self.stats['end_time']:
@@ -279,48 +460,165 @@ class TrafficGenerator:
             print(f"Attack Rate:        {attack_rate:.2f}%")
         
         print("="*60)
+        self.print_latency_report()
+    
+    def to_dict(self) -> Dict:
+        """Counters and histograms, for merging results from several worker processes"""
+        return {
+            "stats": self.stats,
+            "histograms": {phase: {group: h.to_dict() for group, h in groups.items()}
+                           for phase, groups in self.histograms.items()},
+            "errors": self.errors
+        }
+    
+    def merge_results(self, result: Dict):
+        """Add another generator's to_dict() results to this one"""
+        for key, value in result["stats"].items():
+            if key == "start_time":
+                self.stats[key] = min(filter(None, [self.stats[key], value]), default=None)
+            elif key == "end_time":
+                self.stats[key] = max(filter(None, [self.stats[key], value]), default=None)
+            else:
+                self.stats[key] += value
+        
+        for phase, groups in result["histograms"].items():
+            phase_histograms = self.histograms.setdefault(phase, {})
+            for group, data in groups.items():
+                histogram = LatencyHistogram.from_dict(data)
+                if group in phase_histograms:
+                    phase_histograms[group].merge(histogram)
+                else:
+                    phase_histograms[group] = histogram
+        
+        for phase, groups in result.get("errors", {}).items():
+            phase_errors = self.errors.setdefault(phase, {})
+            for group, count in groups.items():
+                phase_errors[group] = phase_errors.get(group, 0) + count
+    
+    def latency_rows(self) -> List[Dict]:
+        """One summary row per phase and request group, with its failed-request count"""
+        rows = []
+        for phase in {**self.histograms, **self.errors}:
+            groups = self.histograms.get(phase, {})
+            errors = self.errors.get(phase, {})
+            # A group whose requests all failed still gets a row, with an empty histogram
+            for group in sorted({*groups, *errors}, key=lambda g: (g == "errors", g != "all", g)):
+                rows.append({"phase": phase, "group": group,
+                             **groups.get(group, LatencyHistogram()).summary(), "errors": errors.get(group, 0)})
+        return rows
+    
+    def print_latency_report(self):
+        """Print latency percentiles per phase and request group"""
+        columns = [f"p{q:g}_ms" for q in PERCENTILES] + ["max_ms"]
+        print("\nLATENCY (ms)")
+        print(f"{'phase':<14} {'group':<32} {'count':>7} {'errors':>7} " + " ".join(f"{c[:-3]:>9}" for c in columns))
+        print("-" * (63 + 10 * len(columns)))
+        for row in self.latency_rows():
+            print(f"{row['phase']:<14} {row['group']:<32} {row['count']:>7} {row['errors']:>7} "
+                  + " ".join(f"{row[c]:>9.1f}" for c in columns))
+    
+    def export_results(self, path: str):
+        """Write results as JSON (with mergeable histograms) or as a CSV of summary rows"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if path.endswith(".csv"):
+            rows = self.latency_rows()
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["phase", "group"])
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            with open(path, "w") as f:
+                json.dump({
+                    "target": self.load_balancer_url,
+                    "open_loop": self.open_loop,
+                    "arrival": self.arrival,
+                    "latency": self.latency_rows(),
+                    **self.to_dict()
+                }, f, indent=2)
+        print(f"Results saved to {path}")
 
-async def main():
-    """Main traffic generation function"""
-    # Configuration
-    LOAD_BALANCER_URL = "http://localhost:8000"
+async def run_phases(generator: TrafficGenerator, worker: int = 0, workers: int = 1, quiet: bool = False):
+    """The standard load profile, as worker `worker` of `workers`, each sending its share of rates and bursts"""
+    say = (lambda *_: None) if quiet else print
+    share = 1.0 / workers
     
-    print("AI-Powered Secure Load Balancer - Traffic Generator")
-    print("=" * 60)
+    # Phase 1: Normal traffic warm-up
+    say("\nPhase 1: Normal traffic warm-up (30 seconds)")
+    generator.begin_phase("warm-up")
+    await generator.continuous_traffic(duration=30, requests_per_second=5 * share, attack_ratio=0.0)
+    
+    # Phase 2: Mixed traffic with moderate attacks
+    say("\nPhase 2: Mixed traffic with moderate attacks (60 seconds)")
+    generator.begin_phase("mixed")
+    await generator.continuous_traffic(duration=60, requests_per_second=10 * share, attack_ratio=0.2)
     
-    async with TrafficGenerator(LOAD_BALANCER_URL) as generator:
+    # Phase 3: High attack intensity
+    say("\nPhase 3: High attack intensity (30 seconds)")
+    generator.begin_phase("high-attack")
+    await generator.continuous_traffic(duration=30, requests_per_second=15 * share, attack_ratio=0.5)
+    
+    # Phase 4: Burst attack simulation
+    say("\nPhase 4: Burst attack simulation")
+    generator.begin_phase("bursts")
+    for i in range(5):
+        say(f"  Burst {i+1}/5")
+        await generator.generate_traffic_burst(worker_share(50, worker, workers), attack_ratio=0.8)
+        await asyncio.sleep(2)
+    
+    # Phase 5: Return to normal traffic
+    say("\nPhase 5: Return to normal traffic (30 seconds)")
+    generator.begin_phase("cool-down")
+    await generator.continuous_traffic(duration=30, requests_per_second=8 * share, attack_ratio=0.1)
+
+async def run_generator(args, worker: int = 0, workers: int = 1, quiet: bool = False,
+                        start_at: float = None) -> TrafficGenerator:
+    """Run the phases in this process and return the generator with its results"""
+    async with TrafficGenerator(args.url, open_loop=args.open_loop, arrival=args.arrival,
+                                connection_limit=args.connections) as generator:
+        if start_at:
+            # Workers start together so their phases line up
+            await asyncio.sleep(max(0.0, start_at - time.time()))
         generator.stats['start_time'] = time.time()
         
         try:
-            # Phase 1: Normal traffic warm-up
-            print("\nPhase 1: Normal traffic warm-up (30 seconds)")
-            await generator.continuous_traffic(duration=30, requests_per_second=5, attack_ratio=0.0)
-            
-            # Phase 2: Mixed traffic with moderate attacks
-            print("\nPhase 2: Mixed traffic with moderate attacks (60 seconds)")
-            await generator.continuous_traffic(duration=60, requests_per_second=10, attack_ratio=0.2)
-            
-            # Phase 3: High attack intensity
-            print("\nPhase 3: High attack intensity (30 seconds)")
-            await generator.continuous_traffic(duration=30, requests_per_second=15, attack_ratio=0.5)
-            
-            # Phase 4: Burst attack simulation
-            print("\nPhase 4: Burst attack simulation")
-            for i in range(5):
-                print(f"  Burst {i+1}/5")
-                await generator.generate_traffic_burst(50, attack_ratio=0.8)
-                await asyncio.sleep(2)
-            
-            # Phase 5: Return to normal traffic
-            print("\nPhase 5: Return to normal traffic (30 seconds)")
-            await generator.continuous_traffic(duration=30, requests_per_second=8, attack_ratio=0.1)
-            
-        except KeyboardInterrupt:
+            if args.scenario:
+                await run_scenario(generator, load_scenario(args.scenario), worker, workers, quiet)
+            else:
+                await run_phases(generator, worker, workers, quiet)
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print("\nTraffic generation interrupted by user")
-        
         finally:
             generator.stats['end_time'] = time.time()
-            generator.print_statistics()
+    return generator
+
+def worker_process(args, index: int, workers: int, start_at: float) -> Dict:
+    """One --workers process: its own event loop and connection pool at 1/workers of the rate"""
+    if index > 0:
+        logging.getLogger().setLevel(logging.WARNING)
+    generator = asyncio.run(run_generator(args, index, workers, quiet=index > 0, start_at=start_at))
+    return generator.to_dict()
+
+def main(args):
+    """Main traffic generation function"""
+    print("AI-Powered Secure Load Balancer - Traffic Generator")
+    print("=" * 60)
+    
+    workers = args.workers or os.cpu_count()
+    if workers > 1:
+        print(f"Running {workers} worker processes")
+        start_at = time.time() + 2.0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(worker_process, [args] * workers, range(workers),
+                                        [workers] * workers, [start_at] * workers))
+        generator = TrafficGenerator(args.url, open_loop=args.open_loop, arrival=args.arrival)
+        for result in results:
+            generator.merge_results(result)
+    else:
+        generator = asyncio.run(run_generator(args))
+    
+    generator.print_statistics()
+    for path in args.output:
+        generator.export_results(path)
 
 if __name__ == "__main__":
     # Check if load balancer is running
@@ -336,8 +634,25 @@ if __name__ == "__main__":
             pass
         return False
     
+    parser = argparse.ArgumentParser(description="Generate normal and attack traffic against the load balancer")
+    parser.add_argument("--url", default=os.getenv("LOAD_BALANCER_URL", "http://localhost:8000"),
+                        help="load balancer URL")
+    parser.add_argument("--open-loop", action="store_true",
+                        help="schedule requests on a fixed timeline and measure latency from intended start")
+    parser.add_argument("--arrival", choices=["constant", "poisson"], default="constant",
+                        help="open-loop inter-arrival times")
+    parser.add_argument("--scenario", default=None,
+                        help="YAML scenario file (see config/scenarios/) instead of the built-in phases")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="generator processes sharing the target rate (0: one per CPU)")
+    parser.add_argument("--connections", type=int, default=100,
+                        help="connection pool size per worker in closed-loop mode")
+    parser.add_argument("--output", nargs="*", default=[],
+                        help="write results to these files (.json keeps the histograms, .csv the percentiles)")
+    args = parser.parse_args()
+    
     # Run traffic generation
     try:
-        asyncio.run(main())
+        main(args)
     except KeyboardInterrupt:
         print("\nTraffic generation stopped by user")